@@ -1,74 +1,160 @@
 
 
-import requests
 import csv
 import sys
 import os
 import datetime
+import tempfile
+
+import requests
+from dotenv import load_dotenv
 
+# .env may hold REDASH_API_KEY and friends; load before reading config
+load_dotenv()
 
-REDASH_URL = "https://redash.businessnext.com"
-API_KEY = "dBGaJVGwbgkKzt0hukVEWnelw0vdCme746veXuNJ"
-QUERY_ID = 305
+from core.config import (
+    INSIGHTS_BACKEND,
+    REDASH_URL,
+    REDASH_API_KEY,
+    REDASH_QUERY_ID,
+    REDASH_TIMEOUT,
+    REDASH_CSV,
+    REDASH_LOG,
+)
 
-DATA_DIR = "/home/user/Auto-MPR-Dashboard/data"
-OUTPUT_FILE = os.path.join(DATA_DIR, "redash_latest.csv")
-LOG_FILE = os.path.join(DATA_DIR, "redash_cron.log")
+CHUNK_SIZE = 1024 * 1024  # 1 MB per streamed read
 
 
 def log(msg):
-    with open(LOG_FILE, "a") as f:
+    with open(REDASH_LOG, "a") as f:
         f.write(f"{datetime.datetime.now()} | {msg}\n")
 
-# =========================
-# ENSURE DIRECTORY
-# =========================
-os.makedirs(DATA_DIR, exist_ok=True)
 
 # =========================
-# FETCH DATA
+# STREAM TO TEMP FILE
 # =========================
-url = f"{REDASH_URL}/api/queries/{QUERY_ID}/results.json"
+def download_csv(url, headers, dest_dir):
+    """
+    Streams the Redash CSV export into a temp file next to the target,
+    so memory stays flat regardless of result size.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=dest_dir, prefix=".redash_", suffix=".csv.tmp")
 
-headers = {
-    "Authorization": f"Key {API_KEY}",
-    "Content-Type": "application/json"
-}
+    try:
+        with os.fdopen(fd, "wb") as f, requests.get(
+            url, headers=headers, timeout=REDASH_TIMEOUT, stream=True
+        ) as response:
+            if response.status_code != 200:
+                raise RuntimeError(
+                    f"Failed to fetch data | Status {response.status_code} | {response.text[:500]}"
+                )
 
-try:
-    response = requests.get(url, headers=headers, timeout=30)
-except Exception as e:
-    log(f"Request failed: {e}")
-    sys.exit(1)
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                f.write(chunk)
 
-if response.status_code != 200:
-    log(f"Failed to fetch data | Status {response.status_code} | {response.text}")
-    sys.exit(1)
+            f.flush()
+            os.fsync(f.fileno())
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
 
-data = response.json()
+    # mkstemp creates 0600 files; keep the CSV readable like before
+    os.chmod(tmp_path, 0o644)
 
-rows = data.get("query_result", {}).get("data", {}).get("rows", [])
+    return tmp_path
 
-if not rows:
-    log("No data returned from query")
-    sys.exit(0)
 
-log(f"Rows fetched: {len(rows)}")
+def count_rows(path):
+    with open(path, newline="", encoding="utf-8-sig", errors="replace") as f:
+        reader = csv.reader(f)
+        next(reader, None)  # header
+        return sum(1 for _ in reader)
+
 
 # =========================
-# DELETE OLD FILE
+# SYNC
 # =========================
-if os.path.exists(OUTPUT_FILE):
-    os.remove(OUTPUT_FILE)
+def sync():
+    """
+    Refreshes REDASH_CSV atomically: readers always see either the old
+    complete file or the new complete file, never a partial one.
+    Returns the number of rows written (0 means the old file was kept).
+    """
+    if not REDASH_API_KEY:
+        raise RuntimeError("REDASH_API_KEY is not set")
+
+    os.makedirs(REDASH_CSV.parent, exist_ok=True)
+
+    url = f"{REDASH_URL}/api/queries/{REDASH_QUERY_ID}/results.csv"
+
+    headers = {
+        "Authorization": f"Key {REDASH_API_KEY}",
+    }
+
+    tmp_path = download_csv(url, headers, REDASH_CSV.parent)
+
+    rows = count_rows(tmp_path)
+
+    if not rows:
+        os.unlink(tmp_path)
+        log("No data returned from query")
+        return 0
+
+    log(f"Rows fetched: {rows}")
+
+    os.replace(tmp_path, REDASH_CSV)
+
+    log(f"CSV updated successfully: {REDASH_CSV}")
+    return rows
+
 
 # =========================
-# WRITE CSV (overwrite)
+# DERIVED DATA
 # =========================
-with open(OUTPUT_FILE, "w", newline="", encoding="utf-8") as f:
-    writer = csv.DictWriter(f, fieldnames=rows[0].keys())
-    writer.writeheader()
-    writer.writerows(rows)
+def refresh_derived(index=True):
+    """
+    Brings the case index and insights store up to date with the freshly
+    replaced REDASH_CSV. A failing step is logged as a sync error and does
+    not stop the next one. Returns False if any step failed.
+    """
+    ok = True
+
+    # Embed only new/changed cases into the live case index
+    if index:
+        try:
+            from services.case_delta import apply_delta
+
+            stats = apply_delta(REDASH_CSV)
+            log(f"Case index delta: {stats}")
+        except Exception as e:
+            log(f"Sync failed: case index delta: {e}")
+            ok = False
+
+    # Rebuild the insights store here, so no reader pays for it
+    if INSIGHTS_BACKEND == "sqlite":
+        try:
+            from services.case_store import build_store
+
+            log(f"Case store rebuilt: {build_store(REDASH_CSV)}")
+        except Exception as e:
+            log(f"Sync failed: case store rebuild: {e}")
+            ok = False
+
+    return ok
 
-log(f"CSV updated successfully: {OUTPUT_FILE}")
 
-print("✅ Redash CSV refreshed successfully")
+# =========================
+# ENTRY POINT
+# =========================
+if __name__ == "__main__":
+    try:
+        rows = sync()
+    except Exception as e:
+        log(f"Sync failed: {e}")
+        sys.exit(1)
+
+    if rows:
+        print("✅ Redash CSV refreshed successfully")
+
+        if not refresh_derived(index="--no-index" not in sys.argv):
+            sys.exit(1)
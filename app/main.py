@@ -13,24 +13,24 @@ if ROOT_DIR not in sys.path:
 # Imports
 # =========================
 import streamlit as st
-import pickle
-import faiss
-from sentence_transformers import SentenceTransformer
 
 from services.user_insights import (
+    data_version,
     get_user_or_case_insights,
-    get_pending_cases,
-    get_overdue_cases,
-    get_critical_cases
+    get_case_buckets,
+    is_case_id,
+    suggest_owners
 )
 
 from services.retriever import (
+    case_index_version,
     find_similar_cases,
-    retrieve_context,
-    format_context
+    related_cases,
 )
 
-from services.agent import pdf_agent
+from services.agent import NOT_FOUND, build_prompt, stream_chat
+from services import telemetry
+from services.warmup import start_heartbeat, warm_up
 
 # =========================
 # Streamlit UI Config
@@ -44,14 +44,64 @@ st.set_page_config(
 # =========================
 # Load Custom CSS
 # =========================
+@st.cache_data(show_spinner=False)
+def read_css(path: str, mtime: float) -> str:
+    with open(path) as f:
+        return f.read()
+
+
 def load_css():
     css_path = Path(__file__).parent.parent / "styles" / "ui.css"
     if css_path.exists():
-        with open(css_path) as f:
-            st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
+        css = read_css(str(css_path), css_path.stat().st_mtime)
+        st.markdown(f"<style>{css}</style>", unsafe_allow_html=True)
 
 load_css()
 
+
+# =========================
+# Warm-up (once per server process)
+# =========================
+@st.cache_resource(show_spinner="Warming up models...")
+def warm_models():
+    timings = warm_up()
+    start_heartbeat()
+    return timings
+
+warm_models()
+
+# =========================
+# Cached data (keyed by input + data version)
+# =========================
+@st.cache_data(show_spinner=False, max_entries=512)
+def cached_insights(user_input: str, version: str):
+    return get_user_or_case_insights(user_input)
+
+
+@st.cache_data(show_spinner=False, max_entries=512)
+def cached_buckets(owner: str, version: str):
+    return get_case_buckets(owner)
+
+
+@st.cache_data(show_spinner=False, max_entries=1024)
+def cached_owner_suggestions(text: str, version: str):
+    return suggest_owners(text)
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def cached_similar_cases(query: str, version: str):
+    return sorted(
+        find_similar_cases(query),
+        key=lambda x: x.get("confidence", 0),
+        reverse=True
+    )
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def cached_related_cases(caseid: int, version: str):
+    return related_cases(caseid)
+
+
 # =========================
 # Header
 # =========================
@@ -70,169 +120,203 @@ with radio_col:
         label_visibility="collapsed"
     )
 
-
-# =========================
-# Reset session on mode change
-# =========================
-if "last_query_mode" not in st.session_state:
-    st.session_state.last_query_mode = query_mode
-
-if st.session_state.last_query_mode != query_mode:
-    st.session_state.user_summary = None
-    st.session_state.active_owner = None
-    st.session_state.last_query_mode = query_mode
-
 # =========================
-# Load FAISS + Model
+# Defaults (results survive mode switches)
 # =========================
-@st.cache_resource
-def load_resources():
-    BASE_DIR = Path(__file__).resolve().parents[1]
-    DATA_DIR = BASE_DIR / "data"
-
-    index_path = DATA_DIR / "pdf_index.faiss"
-    meta_path = DATA_DIR / "pdf_meta.pkl"
-
-    if not index_path.exists():
-        raise FileNotFoundError(f"FAISS index not found: {index_path}")
-
-    if not meta_path.exists():
-        raise FileNotFoundError(f"Metadata file not found: {meta_path}")
+st.session_state.setdefault("mpr_result", None)
+st.session_state.setdefault("user_view", None)
 
-    model = SentenceTransformer("all-MiniLM-L6-v2")
-    index = faiss.read_index(str(index_path))
-
-    with open(meta_path, "rb") as f:
-        metadata = pickle.load(f)
-
-    return model, index, metadata
-
-model, index, metadata = load_resources()
 
 # =========================
-# User Inputs
+# GENERAL MPR FLOW
 # =========================
-if query_mode == "General MPR Issue":
+def render_cases(results, title="🔍 Similar Historical Cases"):
+    st.subheader(title)
+
+    for i, r in enumerate(results, 1):
+
+        confidence = round(r.get("confidence", 0), 2)
+        label = "🟢 Best Match" if i == 1 else ""
+
+        with st.expander(f"Case {i} {label} — Match Confidence: {confidence}%"):
+
+            members = r.get("member_caseids") or []
+            if len(members) > 1:
+                shown = ", ".join(f"#{m}" for m in members[:10])
+                more = f" and {len(members) - 10} more" if len(members) > 10 else ""
+                st.caption(f"Represents {len(members)} near-identical cases: {shown}{more}")
+
+            for k, v in r.items():
+
+                if k in ("confidence", "member_caseids") or not v:
+                    continue
+
+                if k.lower() in ["resolution", "solution", "answer"]:
+                    st.markdown(
+                        f"""
+                        <div style="
+                            background:#f1f8f4;
+                            padding:12px;
+                            border-left:4px solid #2e7d32;
+                            margin:10px 0;
+                        ">
+                            <b>✅ Solution</b><br>
+                            {v}
+                        </div>
+                        """,
+                        unsafe_allow_html=True
+                    )
+                else:
+                    st.write(f"**{k}**: {v}")
+
+
+@telemetry.span("agent")
+def stream_solution(query):
+    """
+    Writes the answer token by token as the LLM produces it and returns
+    the full text.
+    """
+    with st.spinner("Generating recommended solution..."):
+        prompt = build_prompt(query)
+
+    if prompt is None:
+        st.write(NOT_FOUND)
+        return NOT_FOUND
+
+    try:
+        return st.write_stream(stream_chat(prompt))
+    except Exception as e:
+        message = f"LLM Error: {str(e)}"
+        st.write(message)
+        return message
+
+
+@st.fragment
+def general_mpr_view():
+    """
+    Runs as a fragment: typing and Run only re-run this block.
+    """
     query = st.text_area(
         "Enter MPR Issue",
         height=120,
         placeholder="Describe the issue..."
     )
-else:
-    user_id = st.text_input(
-        "Enter CaseID or User Name",
-        placeholder="e.g. Kumar Sanu"
-    )
 
-run_clicked = st.button("Run")
-
-# =========================
-# Defaults
-# =========================
-st.session_state.setdefault("user_summary", None)
-st.session_state.setdefault("active_owner", None)
+    if st.button("Run", key="run_mpr"):
+        if not query.strip():
+            st.warning("Please enter an MPR issue.")
+            return
+        st.session_state.mpr_result = {"query": query, "cases": None, "solution": None}
 
+    result = st.session_state.mpr_result
+    if result is None:
+        return
 
-# =========================
-# GENERAL MPR FLOW
-# =========================
-if run_clicked and query_mode == "General MPR Issue":
+    # Solution sits above the cases but is filled last: cases are
+    # ready in milliseconds, the LLM answer streams in afterwards
+    solution_box = st.container()
+    solution_box.markdown("### ✅ Recommended Solution")
 
-    if not query.strip():
-        st.warning("Please enter an MPR issue.")
-
-    else:
-
-        # -------- Generate Recommendation --------
-        with st.spinner("Generating recommended solution..."):
-            recommended_solution = pdf_agent(query)
-
-        st.markdown("### ✅ Recommended Solution")
-        st.write(recommended_solution)
-
-        # -------- Similar Cases --------
+    if result["cases"] is None:
         with st.spinner("Searching similar past MPRs..."):
+            result["cases"] = cached_similar_cases(result["query"], case_index_version())
 
-            results = find_similar_cases(query)
-
+    with telemetry.span("ui.render.cases", results=len(result["cases"])):
+        render_cases(result["cases"])
 
-        results = sorted(
-            results,
-            key=lambda x: x.get("confidence", 0),
-            reverse=True
-        )
-
-        st.subheader("🔍 Similar Historical Cases")
+    with solution_box, telemetry.span("ui.render.solution"):
+        if result["solution"] is None:
+            result["solution"] = stream_solution(result["query"])
+        else:
+            st.write(result["solution"])
 
-        for i, r in enumerate(results, 1):
 
-            confidence = round(r.get("confidence", 0), 2)
-            label = "🟢 Best Match" if i == 1 else ""
+# =========================
+# USER SPECIFIC FLOW
+# =========================
+def render_user_summary(summary):
+    owner = summary["owner"]
 
-            with st.expander(f"Case {i} {label} — Match Confidence: {confidence}%"):
+    st.subheader(f"👤 User Summary — {owner}")
 
-                for k, v in r.items():
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Total Cases", summary["total_cases"])
+    c2.metric("Pending", summary["pending_cases"])
+    c3.metric("Overdue (>7d)", summary["overdue_cases"])
+    c4.metric("Critical (>21d)", summary["critical_cases"])
 
-                    if k == "confidence" or not v:
-                        continue
+    st.json(summary["status_breakdown"])
 
-                    if k.lower() in ["resolution", "solution", "answer"]:
-                        st.markdown(
-                            f"""
-                            <div style="
-                                background:#f1f8f4;
-                                padding:12px;
-                                border-left:4px solid #2e7d32;
-                                margin:10px 0;
-                            ">
-                                <b>✅ Solution</b><br>
-                                {v}
-                            </div>
-                            """,
-                            unsafe_allow_html=True
-                        )
-                    else:
-                        st.write(f"**{k}**: {v}")
+    buckets = cached_buckets(owner, data_version())
 
+    for col, (title, key) in zip(
+        st.columns(3),
+        [("⏳ Pending", "pending"), ("⚠️ Overdue", "overdue"), ("🔥 Critical", "critical")]
+    ):
+        with col:
+            st.markdown(f"**{title}**")
+            if not buckets[key]:
+                st.caption("None")
+            for case in buckets[key]:
+                st.write(f"#{case['caseid']} — {case['aging']} D — {case['statuscode']}")
 
-# =========================
-# USER SPECIFIC FLOW
-# =========================
-if run_clicked and query_mode == "User-Specific View":
 
-    if not user_id.strip():
-        st.warning("Please enter a caseID or full name.")
+@st.fragment
+def user_specific_view():
+    user_id = st.text_input(
+        "Enter CaseID or User Name",
+        placeholder="e.g. Kumar Sanu"
+    )
+    entry = user_id.strip()
+
+    # Names resolve through the typeahead, so only known owners are queried
+    target = entry
+    if entry and not is_case_id(entry):
+        matches = cached_owner_suggestions(entry, data_version())
+        if matches:
+            target = st.selectbox(
+                "Matching owners",
+                [m["owner"] for m in matches],
+                format_func=lambda name: next(
+                    f"{name} ({m['cases']} cases)" for m in matches if m["owner"] == name
+                ),
+            )
+        else:
+            target = None
+            st.caption(f"No owner matches “{entry}”.")
+
+    if st.button("Run", key="run_user"):
+        if not entry:
+            st.warning("Please enter a caseID or full name.")
+            return
+        if target is None:
+            st.error("No data found for the given input.")
+            return
 
-    else:
-        insights = get_user_or_case_insights(user_id)
+        insights = cached_insights(target, data_version())
+        st.session_state.user_view = insights if insights["data"] is not None else None
 
         if insights["data"] is None:
             st.error("No data found for the given input.")
+            return
 
-        else:
-            if insights["type"] == "case":
-                case = insights["data"]
-                st.subheader(f"📄 Case Details — {case['caseid']}")
-                st.json(case)
-
-            else:
-                st.session_state.user_summary = insights["data"]
-                st.session_state.active_owner = insights["data"]["owner"]
-
-# =========================
-# USER SUMMARY VIEW
-# =========================
-if st.session_state.user_summary:
+    insights = st.session_state.user_view
+    if insights is None:
+        return
 
-    summary = st.session_state.user_summary
-    owner = st.session_state.active_owner
+    if insights["type"] == "case":
+        case = insights["data"]
+        st.subheader(f"📄 Case Details — {case['caseid']}")
+        st.json(case)
 
-    st.subheader(f"👤 User Summary — {owner}")
+        related = cached_related_cases(int(case["caseid"]), case_index_version())
+        if related:
+            render_cases(related, "🔗 Related Cases")
+    else:
+        render_user_summary(insights["data"])
 
-    c1, c2, c3, c4 = st.columns(4)
-    c1.metric("Total Cases", summary["total_cases"])
-    c2.metric("Pending", summary["pending_cases"])
-    c3.metric("Overdue (>7d)", summary["overdue_cases"])
-    c4.metric("Critical (>21d)", summary["critical_cases"])
 
-    st.json(summary["status_breakdown"])
+if query_mode == "General MPR Issue":
+    general_mpr_view()
+else:
+    user_specific_view()
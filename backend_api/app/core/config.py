@@ -1,3 +1,15 @@
 import os
+import sys
+from pathlib import Path
 
 ENV = os.getenv("ENV", "local")
+
+# Repo root on sys.path so the shared `services` package is importable
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+# Search / recommend worker pool (per uvicorn worker process)
+SEARCH_THREADS = int(os.getenv("SEARCH_THREADS", "4"))
+# Requests waiting for a pool thread beyond this are rejected with 503
+SEARCH_MAX_PENDING = int(os.getenv("SEARCH_MAX_PENDING", "64"))
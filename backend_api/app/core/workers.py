@@ -0,0 +1,48 @@
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from fastapi import HTTPException
+
+from app.core.config import SEARCH_MAX_PENDING, SEARCH_THREADS
+
+
+class WorkerPool:
+    """
+    Bounded thread pool for the CPU-bound encode/search calls, so they
+    never block the event loop. FAISS and torch release the GIL, so the
+    threads run in parallel.
+
+    Calls beyond the threads plus max_pending waiting are rejected with
+    503 instead of queueing without bound.
+    """
+
+    def __init__(self, threads: int = SEARCH_THREADS, max_pending: int = SEARCH_MAX_PENDING):
+        self.threads = threads
+        self.max_pending = max_pending
+        self.in_flight = 0  # only touched from the event loop thread
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="search")
+
+    async def run(self, fn, *args, **kwargs):
+        if self.in_flight >= self.threads + self.max_pending:
+            raise HTTPException(
+                status_code=503,
+                detail="Search workers busy, retry shortly",
+                headers={"Retry-After": "1"},
+            )
+
+        self.in_flight += 1
+        try:
+            # Copy the context so telemetry spans nest under the request span
+            context = contextvars.copy_context()
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, partial(context.run, fn, *args, **kwargs))
+        finally:
+            self.in_flight -= 1
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+POOL = WorkerPool()
@@ -1,10 +1,45 @@
-from fastapi import FastAPI
-from app.routers import health , users
+import asyncio
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
+from app.core.workers import POOL
+from app.routers import health , users, cases, metrics, search
+from services import telemetry
+from services.warmup import start_heartbeat, warm_up
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Index, encoder and LLM load once per worker process, in the
+    # background: /health answers right away, searches wait on the load
+    warming = asyncio.create_task(POOL.run(warm_up))
+    start_heartbeat()
+    yield
+    warming.cancel()
+    POOL.shutdown()
+
 
 app = FastAPI(
     title="Auto MPR Backend API",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan,
 )
 
 app.include_router(health.router)
 app.include_router(users.router)
+app.include_router(cases.router)
+app.include_router(metrics.router)
+app.include_router(search.router)
+
+
+@app.middleware("http")
+async def request_span(request: Request, call_next):
+    """
+    Root span per request, named after the matched route template so
+    /cases/1 and /cases/2 aggregate together.
+    """
+    with telemetry.span("http") as span:
+        response = await call_next(request)
+        route = request.scope.get("route")
+        span.name = f"http {request.method} {getattr(route, 'path', request.url.path)}"
+    return response
@@ -0,0 +1,6 @@
+from pydantic import BaseModel, Field
+
+
+class RecommendRequest(BaseModel):
+    question: str = Field(..., min_length=1)
+    cases: int = Field(5, ge=0, le=50, description="similar cases to return alongside the answer")
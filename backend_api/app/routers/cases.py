@@ -0,0 +1,21 @@
+from typing import List
+
+from fastapi import APIRouter, HTTPException
+
+import app.core.config  # noqa: F401  (puts the shared services on sys.path)
+from services.user_insights import get_case_details, get_cases_details
+
+router = APIRouter(prefix="/cases", tags=["cases"])
+
+
+@router.get("/{caseid}")
+def get_case(caseid: int):
+    case = get_case_details(caseid)
+    if case is None:
+        raise HTTPException(status_code=404, detail=f"Case {caseid} not found")
+    return case
+
+
+@router.post("/lookup")
+def lookup_cases(caseids: List[int]):
+    return get_cases_details(caseids)
@@ -0,0 +1,23 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+import app.core.config  # noqa: F401  (puts the shared services on sys.path)
+from services import telemetry
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """
+    Prometheus scrape endpoint: per-stage latency summaries.
+    """
+    return PlainTextResponse(
+        telemetry.REGISTRY.prometheus(),
+        media_type="text/plain; version=0.0.4",
+    )
+
+
+@router.get("/metrics/summary")
+def metrics_summary():
+    return telemetry.summary()
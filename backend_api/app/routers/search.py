@@ -0,0 +1,84 @@
+import asyncio
+import json
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+
+import app.core.config  # noqa: F401  (puts the shared services on sys.path)
+from app.core.workers import POOL
+from app.models.search import RecommendRequest
+from core.config import TOP_K
+from services.agent import NOT_FOUND, build_prompt, stream_chat
+from services.llm_gateway import LLMBusy
+from services.reranker import get_reranker
+from services.retriever import cite, find_similar_cases, related_cases, retrieve_chunks
+
+router = APIRouter(tags=["search"])
+
+
+@router.get("/search/cases")
+async def search_cases(
+    q: str = Query(..., min_length=1),
+    top_k: int = Query(5, ge=1, le=50),
+):
+    return jsonable_encoder(await POOL.run(find_similar_cases, q, top_k))
+
+
+@router.get("/search/cases/{caseid}/related")
+async def search_related_cases(caseid: int, top_k: int = Query(5, ge=1, le=50)):
+    """
+    Cases most similar to an indexed case, from the precomputed kNN
+    graph when one was built. 404 when the case is not in the index.
+    """
+    cases = await POOL.run(related_cases, caseid, top_k)
+    if not cases:
+        raise HTTPException(status_code=404, detail=f"No related cases for case {caseid}")
+    return jsonable_encoder(cases)
+
+
+@router.get("/search/docs")
+async def search_docs(
+    q: str = Query(..., min_length=1),
+    top_k: int = Query(TOP_K, ge=1, le=50),
+    rerank: bool = True,
+):
+    reranker = get_reranker() if rerank else None
+    chunks = await POOL.run(retrieve_chunks, q, top_k, reranker)
+    return [{"citation": cite(chunk), **chunk} for chunk in chunks]
+
+
+def _event(kind: str, **fields) -> str:
+    return json.dumps({"type": kind, **jsonable_encoder(fields)}) + "\n"
+
+
+@router.post("/recommend")
+async def recommend(request: RecommendRequest):
+    """
+    NDJSON stream: one "cases" event with the similar cases, "token"
+    events as the answer is generated, then "done" (or "error").
+    503 when the LLM gateway turns the request away.
+    """
+    cases, prompt = await asyncio.gather(
+        POOL.run(find_similar_cases, request.question, request.cases) if request.cases else asyncio.sleep(0, []),
+        POOL.run(build_prompt, request.question),
+    )
+
+    try:
+        tokens = stream_chat(prompt) if prompt is not None else iter([NOT_FOUND])
+    except LLMBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+
+    def events():
+        yield _event("cases", cases=cases)
+
+        try:
+            for token in tokens:
+                yield _event("token", text=token)
+        except Exception as e:
+            yield _event("error", detail=f"LLM Error: {str(e)}")
+            return
+
+        yield _event("done")
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
@@ -1,18 +1,46 @@
-from fastapi import APIRouter
+from functools import lru_cache
+from typing import Optional
+
+from fastapi import APIRouter, Query
 from app.services.user_summary_service import UserSummaryService
+from services.user_insights import get_case_trend, suggest_owners
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 CSV_PATH = "data/cases_training.csv"
 
 
+@lru_cache(maxsize=1)
+def get_service() -> UserSummaryService:
+    # One per process: with INSIGHTS_BACKEND=sqlite it holds the opened store
+    return UserSummaryService(CSV_PATH)
+
+
+@router.get("/suggest")
+def suggest_users(q: str = Query(..., min_length=1), limit: int = Query(10, ge=1, le=50)):
+    """
+    Owner-name typeahead: prefix matches, then fuzzy matches for typos.
+    """
+    return suggest_owners(q, limit)
+
+
+@router.get("/trend")
+def get_trend(
+    owner: Optional[str] = None,
+    period: str = Query("month", pattern="^(year|month|day)$"),
+    since: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}-\d{2}$"),
+):
+    """
+    Cases reported / closed per period, for one owner or everyone.
+    """
+    return get_case_trend(owner, period, since)
+
+
 @router.get("/{username}/summary")
 def get_user_summary(username: str):
-    service = UserSummaryService(CSV_PATH)
-    return service.compute_user_summary(username)
+    return get_service().compute_user_summary(username)
 
 @router.get("/{username}/cases")
 def get_user_cases(username: str, type: str):
-    service = UserSummaryService(CSV_PATH)
-    return service.get_user_cases(username, type)
+    return get_service().get_user_cases(username, type)
 
@@ -1,5 +1,10 @@
 import pandas as pd
 
+import app.core.config  # noqa: F401  (puts the shared services on sys.path)
+from core.config import INSIGHTS_BACKEND
+from services.case_store import AGING_NUM, OWNER_KEY, get_store
+from services.ingest import load_cases
+
 
 class UserSummaryService:
     # Logical mappings for CSV schema
@@ -7,22 +12,21 @@ class UserSummaryService:
     STATUS_COLUMN = "statuscode"
     AGING_COLUMN = "aging"
 
+    CLOSED_STATUSES = ("resolved", "invalid", "closed")
+
+    # Lowercased status, "nan" when missing (as astype(str).str.lower())
+    STATUS_SQL = "COALESCE(lower(statuscode), 'nan')"
+
     def __init__(self, csv_path: str):
         self.csv_path = csv_path
+        # INSIGHTS_BACKEND=sqlite: answer from the indexed store instead
+        self.store = get_store(csv_path) if INSIGHTS_BACKEND == "sqlite" else None
 
     def _load_csv(self):
         """
-        Loads the CSV file using multiple encoding fallbacks.
+        Loads the CSV through the shared typed ingestion (binary cached).
         """
-        encodings = ["utf-8", "utf-8-sig", "cp1252", "latin1"]
-
-        for encoding in encodings:
-            try:
-                return pd.read_csv(self.csv_path, encoding=encoding)
-            except UnicodeDecodeError:
-                continue
-
-        raise ValueError(f"Unable to read CSV with supported encodings: {self.csv_path}")
+        return load_cases(self.csv_path)
 
     def get_user_rows(self, username: str) -> pd.DataFrame:
         """
@@ -40,6 +44,9 @@ class UserSummaryService:
         """
         Computes summary metrics for a given user.
         """
+        if self.store is not None:
+            return self._sql_user_summary(username)
+
         user_df = self.get_user_rows(username)
 
         if user_df.empty:
@@ -95,6 +102,9 @@ class UserSummaryService:
         Returns case-level data for a user based on case type.
         case_type: pending | overdue | critical
         """
+        if self.store is not None:
+            return self._sql_user_cases(username, case_type)
+
         user_df = self.get_user_rows(username)
 
         if user_df.empty:
@@ -127,3 +137,44 @@ class UserSummaryService:
         return filtered[
             ["caseid", self.STATUS_COLUMN, self.AGING_COLUMN, "category"]
         ].to_dict(orient="records")
+
+    # ---- SQLite backend: same results as SQL ----
+    def _open_condition(self) -> str:
+        closed = ", ".join(f"'{status}'" for status in self.CLOSED_STATUSES)
+        return f"{self.STATUS_SQL} NOT IN ({closed})"
+
+    def _sql_user_summary(self, username: str) -> dict:
+        is_open = self._open_condition()
+
+        totals = self.store.query(f"""
+            SELECT COUNT(*) AS total_cases,
+                   COALESCE(SUM({is_open}), 0) AS pending,
+                   COALESCE(SUM({is_open} AND {AGING_NUM} > 7), 0) AS overdue,
+                   COALESCE(SUM({is_open} AND {AGING_NUM} > 21), 0) AS critical
+            FROM cases WHERE {OWNER_KEY} = ?
+        """, (username.lower(),))[0]
+
+        statuses = self.store.query(f"""
+            SELECT {self.STATUS_SQL} AS status, COUNT(*) AS n FROM cases
+            WHERE {OWNER_KEY} = ? GROUP BY status ORDER BY n DESC
+        """, (username.lower(),))
+
+        return {
+            "username": username,
+            **totals,
+            "status_breakdown": {row["status"]: row["n"] for row in statuses},
+        }
+
+    def _sql_user_cases(self, username: str, case_type: str):
+        conditions = {
+            "pending": self._open_condition(),
+            "overdue": f"{self._open_condition()} AND {AGING_NUM} > 7",
+            "critical": f"{self._open_condition()} AND {AGING_NUM} > 21",
+        }
+        condition = conditions.get(case_type, "1")
+
+        return self.store.query(f"""
+            SELECT caseid, {self.STATUS_SQL} AS {self.STATUS_COLUMN}, {AGING_NUM} AS {self.AGING_COLUMN}, category
+            FROM cases WHERE {OWNER_KEY} = ? AND {condition}
+            ORDER BY rowid
+        """, (username.lower(),))
@@ -1,3 +1,4 @@
+import hashlib
 import os
 from pathlib import Path
 
@@ -14,21 +15,155 @@ PDF_DIR = DATA_DIR / "pdfs"
 PDF_INDEX = DATA_DIR / "pdf_index.faiss"
 PDF_META = DATA_DIR / "pdf_meta.pkl"
 PDF_REGISTRY = DATA_DIR / "index_registry.json"
+PDF_BM25 = DATA_DIR / "pdf_bm25.npz"
+
+# PDF chunking, in whitespace tokens
+PDF_CHUNK_TOKENS = int(os.getenv("PDF_CHUNK_TOKENS", "500"))
+PDF_CHUNK_OVERLAP = int(os.getenv("PDF_CHUNK_OVERLAP", "50"))
+
+# Case indexes are built per data scale: data/case_index_<scale>.faiss
+CASE_DATA_FILES = {
+    "2k": "cases_training.csv",
+    "25k": "cases_training_25k.csv",
+    "live": "redash_latest.csv",
+    # scripts/generate_cases.py output, for load tests
+    "100k": "cases_synthetic_100k.parquet",
+    "1m": "cases_synthetic_1m.parquet",
+    "10m": "cases_synthetic_10m.parquet",
+}
+CASE_SCALE = os.getenv("CASE_SCALE", "2k")
+
+# Case table behind the user/case insights (a CASE_DATA_FILES scale)
+INSIGHTS_SCALE = os.getenv("INSIGHTS_SCALE", "2k")
+
+# Insights backend: "pandas" (the cases file in memory, per process) or
+# "sqlite" (an indexed store built from it, shared across processes)
+INSIGHTS_BACKEND = os.getenv("INSIGHTS_BACKEND", "pandas")
+
+
+def case_store_path(source):
+    # Same-named cases files in other directories get their own store
+    source = Path(source).resolve()
+    path_hash = hashlib.md5(str(source).encode("utf-8")).hexdigest()[:8]
+    return DATA_DIR / f"case_store_{source.stem}-{path_hash}.sqlite"
+
+
+# Collapse exact/near-duplicate cases into one vector at index build time
+CASE_DEDUP = os.getenv("CASE_DEDUP", "1") == "1"
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.8"))  # MinHash Jaccard estimate
+DEDUP_NUM_PERM = int(os.getenv("DEDUP_NUM_PERM", "64"))
+DEDUP_BANDS = int(os.getenv("DEDUP_BANDS", "16"))
+
+
+def case_index_paths(scale: str):
+    return (
+        DATA_DIR / f"case_index_{scale}.faiss",
+        DATA_DIR / f"case_meta_{scale}.pkl",
+    )
+
+
+def case_bm25_path(scale: str):
+    return DATA_DIR / f"case_bm25_{scale}.npz"
+
+
+def case_snapshot_path(scale: str):
+    return DATA_DIR / f"case_snapshot_{scale}.npz"
+
+
+# Sharded case index: "" (one index), "year" / "quarter" / "month" (by
+# reportedon) or "caseid" (ranges of CASE_SHARD_SPAN ids)
+CASE_SHARD_BY = os.getenv("CASE_SHARD_BY", "")
+CASE_SHARD_SPAN = int(os.getenv("CASE_SHARD_SPAN", "100000"))
+CASE_SHARD_THREADS = int(os.getenv("CASE_SHARD_THREADS", "0"))  # 0 = one per shard, up to CPU count
+
+
+def case_shard_dir(scale: str):
+    return DATA_DIR / f"case_shards_{scale}"
+
+
+# Precomputed "related cases" graph: neighbours per case (0 = not built)
+# and query batch size while building it
+CASE_KNN = int(os.getenv("CASE_KNN", "0"))
+CASE_KNN_BATCH = int(os.getenv("CASE_KNN_BATCH", "4096"))
+
+
+def case_knn_path(scale: str):
+    return DATA_DIR / f"case_knn_{scale}.npz"
+
+
+# ---------------------------
+# Case data ingestion
+# ---------------------------
+CACHE_DIR = DATA_DIR / ".cache"
+
+# "c" (default) or "pyarrow" when installed
+CSV_ENGINE = os.getenv("CSV_ENGINE", "c")
+
+# ---------------------------
+# Redash sync (Casedata.py)
+# ---------------------------
+REDASH_URL = os.getenv("REDASH_URL", "https://redash.businessnext.com")
+REDASH_API_KEY = os.getenv("REDASH_API_KEY", "")
+REDASH_QUERY_ID = int(os.getenv("REDASH_QUERY_ID", "305"))
+REDASH_TIMEOUT = int(os.getenv("REDASH_TIMEOUT", "30"))
+
+REDASH_CSV = Path(os.getenv("REDASH_CSV", str(DATA_DIR / "redash_latest.csv")))
+REDASH_LOG = REDASH_CSV.parent / "redash_cron.log"
 
 # ---------------------------
 # Models & Retrieval config
 # ---------------------------
 EMBED_MODEL = os.getenv("EMBED_MODEL", "all-MiniLM-L6-v2")
 
+# Content-addressed embedding cache shared by all index builders
+EMBED_CACHE = os.getenv("EMBED_CACHE", "1") == "1"
+EMBED_CACHE_DIR = DATA_DIR / ".cache" / "embeddings"
+
+# Embedding worker processes for index builds; threads per worker (0 = auto)
+EMBED_WORKERS = int(os.getenv("EMBED_WORKERS", "1"))
+EMBED_THREADS = int(os.getenv("EMBED_THREADS", "0"))
+
+# Padded tokens per embedding batch (batch size = budget / longest text)
+EMBED_TOKEN_BUDGET = int(os.getenv("EMBED_TOKEN_BUDGET", "8192"))
+EMBED_MAX_BATCH = int(os.getenv("EMBED_MAX_BATCH", "256"))
+
 # LLM (generation only, NOT embeddings)
 OLLAMA_MODEL = os.getenv("OLLAMA_LLM_MODEL", "llama3.1:8b")
 
+# LLM gateway in front of Ollama: concurrent generations, waiting requests
+# beyond which callers are turned away, and end-to-end deadlines (queue
+# wait included) for interactive and batch callers
+LLM_MAX_IN_FLIGHT = int(os.getenv("LLM_MAX_IN_FLIGHT", "2"))
+LLM_QUEUE_SIZE = int(os.getenv("LLM_QUEUE_SIZE", "16"))
+LLM_TIMEOUT_S = float(os.getenv("LLM_TIMEOUT_S", "60"))
+LLM_BATCH_TIMEOUT_S = float(os.getenv("LLM_BATCH_TIMEOUT_S", "600"))
+
+# Warm-up and keep-alive: how long Ollama keeps the model loaded after a
+# request, and a heartbeat (0 = off) that re-arms it during business hours
+WARMUP_LLM = os.getenv("WARMUP_LLM", "1") == "1"
+LLM_KEEP_ALIVE = os.getenv("LLM_KEEP_ALIVE", "30m")
+LLM_HEARTBEAT_S = int(os.getenv("LLM_HEARTBEAT_S", "600"))
+LLM_BUSINESS_HOURS = os.getenv("LLM_BUSINESS_HOURS", "08:00-20:00")
+LLM_BUSINESS_DAYS = os.getenv("LLM_BUSINESS_DAYS", "0-4")  # Mon=0 .. Sun=6
+
 TOP_K = int(os.getenv("TOP_K", "3"))
 
+# Hybrid retrieval: BM25 + FAISS candidates merged by reciprocal-rank fusion
+HYBRID_SEARCH = os.getenv("HYBRID_SEARCH", "1") == "1"
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "20"))
+RRF_K = int(os.getenv("RRF_K", "60"))
+
+# Optional cross-encoder re-rank of the fused candidates ("" = off),
+# e.g. cross-encoder/ms-marco-MiniLM-L-6-v2
+RERANK_MODEL = os.getenv("RERANK_MODEL", "")
+RERANK_CANDIDATES = int(os.getenv("RERANK_CANDIDATES", "20"))
+RERANK_BUDGET_MS = int(os.getenv("RERANK_BUDGET_MS", "250"))
+RERANK_CACHE_SIZE = int(os.getenv("RERANK_CACHE_SIZE", "4096"))
+
 # ---------------------------
-# Safety logs (optional but useful)
+# Telemetry
 # ---------------------------
-print(f"[CONFIG] EMBED_MODEL = {EMBED_MODEL}")
-print(f"[CONFIG] OLLAMA_MODEL = {OLLAMA_MODEL}")
-print(f"[CONFIG] TOP_K = {TOP_K}")
-
+# Span sinks: "log" (one line per request), "otel" (needs opentelemetry-api).
+# The in-process registry behind /metrics is always on.
+TELEMETRY_SINKS = [s.strip() for s in os.getenv("TELEMETRY_SINKS", "log").split(",") if s.strip()]
+TELEMETRY_WINDOW = int(os.getenv("TELEMETRY_WINDOW", "1024"))  # samples per stage for percentiles
@@ -0,0 +1,102 @@
+"""
+Embedding throughput on our corpus: case texts (as indexer.py builds
+them) plus PDF chunks (as indexer_pdf.py builds them).
+
+Compares fixed batches of 32 in corpus order, a single
+encode(batch_size=32) call, and token-budget buckets.
+
+Usage: python scripts/bench_embedding.py [--scale 2k] [--budget 8192] [--repeat 3]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from sentence_transformers import SentenceTransformer
+
+from core.config import CASE_DATA_FILES, DATA_DIR, EMBED_MODEL, EMBED_TOKEN_BUDGET, PDF_DIR
+from services.embedding import encode_bucketed, make_buckets, token_lengths
+from services.indexer import build_case_texts, find_case_columns, prepare_case_frame
+from services.ingest import load_cases
+
+
+def load_corpus(scale: str):
+    df = prepare_case_frame(load_cases(DATA_DIR / CASE_DATA_FILES[scale]))
+    texts = build_case_texts(df, find_case_columns(df)).tolist()
+
+    try:
+        from services.indexer_pdf import extract_text_chunks
+        for pdf in sorted(PDF_DIR.glob("*.pdf")):
+            texts.extend(extract_text_chunks(pdf))
+    except ImportError:
+        print("PyMuPDF not installed, benchmarking case texts only")
+
+    return texts
+
+
+def padding_efficiency(lengths, batches) -> float:
+    real = sum(int(lengths[b].sum()) for b in batches)
+    padded = sum(int(lengths[b].max()) * len(b) for b in batches)
+    return real / padded
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", default="2k", choices=sorted(CASE_DATA_FILES))
+    parser.add_argument("--budget", type=int, default=EMBED_TOKEN_BUDGET)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    texts = load_corpus(args.scale)
+    model = SentenceTransformer(EMBED_MODEL)
+    lengths = token_lengths(model, texts)
+
+    print(f"Corpus: {len(texts)} texts | tokens min/median/max: "
+          f"{lengths.min()}/{int(np.median(lengths))}/{lengths.max()}")
+
+    positions = np.arange(len(texts))
+    fixed_batches = [positions[i:i + 32] for i in range(0, len(texts), 32)]
+    budget_batches = make_buckets(lengths, args.budget)
+
+    def fixed_in_order():
+        for batch in fixed_batches:
+            model.encode([texts[i] for i in batch], batch_size=32, show_progress_bar=False)
+
+    def single_call():
+        model.encode(texts, batch_size=32, show_progress_bar=False)
+
+    def bucketed():
+        encode_bucketed(model, texts, token_budget=args.budget)
+
+    runs = [
+        ("fixed 32, corpus order", fixed_in_order, padding_efficiency(lengths, fixed_batches)),
+        ("encode(batch_size=32)", single_call, None),
+        (f"bucketed, budget {args.budget}", bucketed, padding_efficiency(lengths, budget_batches)),
+    ]
+
+    baseline = None
+    for name, fn, efficiency in runs:
+        seconds = timed(fn, args.repeat)
+        rate = len(texts) / seconds
+        baseline = baseline or rate
+        eff = f"{efficiency:.0%}" if efficiency is not None else "n/a"
+        print(f"{name:<28} {rate:9.1f} sentences/s  x{rate / baseline:.2f}  padding efficiency {eff}")
+
+
+if __name__ == "__main__":
+    main()
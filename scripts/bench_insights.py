@@ -0,0 +1,223 @@
+"""
+Pandas vs SQLite insights backend on a large cases file.
+
+Builds the SQLite store, then runs each backend in a fresh interpreter
+(INSIGHTS_SCALE / INSIGHTS_BACKEND set in its environment) over the same
+sampled owners and caseids. Reports first-call cost (pandas: load +
+owner frames; sqlite: open), per-call latency of each insight function,
+peak RSS, and whether both backends returned the same answers.
+
+Usage: python scripts/bench_insights.py [1m] [--owners 200] [--cases 500] [--out results.json]
+       (1m data: python scripts/generate_cases.py 1m)
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from core.config import CASE_DATA_FILES, DATA_DIR
+
+RESULTS_DIR = DATA_DIR / "bench"
+BACKENDS = ("pandas", "sqlite")
+
+
+def plain(value):
+    """
+    JSON-comparable form: the SQL backend returns dates as ISO strings
+    and flags as 0/1 where pandas has Timestamps, booleans and NaN.
+    """
+    if isinstance(value, dict):
+        return {str(k): plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [plain(v) for v in value]
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.date().isoformat()
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, bool):
+        return int(value)
+    return value
+
+
+def peak_rss_mb() -> float:
+    """
+    This process's peak RSS. VmHWM starts over at exec; ru_maxrss on
+    Linux also counts the parent's memory from before the fork.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def timed_calls(fn, args_list):
+    """
+    (results, per-call seconds) for fn(*args) over args_list.
+    """
+    results, seconds = [], []
+    for args in args_list:
+        start = time.perf_counter()
+        results.append(fn(*args))
+        seconds.append(time.perf_counter() - start)
+    return results, seconds
+
+
+def child(sample_path: Path, out_path: Path):
+    """
+    Runs in the fresh interpreter; writes timings + answers as JSON.
+    """
+    sample = json.loads(sample_path.read_text())
+
+    start = time.perf_counter()
+    from services import user_insights
+    result = {"import_s": round(time.perf_counter() - start, 3)}
+
+    start = time.perf_counter()
+    user_insights.get_user_summary(sample["owners"][0])
+    result["first_call_s"] = round(time.perf_counter() - start, 3)
+
+    calls = {
+        "get_case_details": (user_insights.get_case_details, [(c,) for c in sample["caseids"]]),
+        "get_user_summary": (user_insights.get_user_summary, [(o,) for o in sample["owners"]]),
+        "get_case_buckets": (user_insights.get_case_buckets, [(o,) for o in sample["owners"]]),
+        "suggest_owners": (user_insights.suggest_owners, [(p,) for p in sample["prefixes"]]),
+        "get_case_trend(owner)": (user_insights.get_case_trend, [(o,) for o in sample["owners"]]),
+        "get_case_trend(all)": (user_insights.get_case_trend, [(None, "month", s) for s in sample["since"]]),
+    }
+
+    result["latency_ms"], result["answers"] = {}, {}
+    for name, (fn, args_list) in calls.items():
+        answers, seconds = timed_calls(fn, args_list)
+        ms = np.array(seconds) * 1000
+        result["latency_ms"][name] = {
+            "p50": round(float(np.percentile(ms, 50)), 3),
+            "p95": round(float(np.percentile(ms, 95)), 3),
+        }
+        result["answers"][name] = plain(answers)
+
+    result["max_rss_mb"] = peak_rss_mb()
+    out_path.write_text(json.dumps(result))
+
+
+def run(scale: str, backend: str, sample_path: Path) -> dict:
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
+        out_path = Path(f.name)
+
+    env = {**os.environ, "INSIGHTS_SCALE": scale, "INSIGHTS_BACKEND": backend}
+    try:
+        subprocess.run(
+            [sys.executable, __file__, "--child", str(sample_path), str(out_path)],
+            env=env, cwd=ROOT_DIR, check=True, stdout=subprocess.DEVNULL,
+        )
+        return json.loads(out_path.read_text())
+    finally:
+        out_path.unlink(missing_ok=True)
+
+
+def make_sample(source: Path, n_owners: int, n_cases: int, seed: int) -> dict:
+    from services.ingest import load_cases
+
+    df = load_cases(source)
+    rng = np.random.default_rng(seed)
+
+    owners = df["currentowner"].dropna().astype(str).unique()
+    owners = rng.choice(owners, min(n_owners, len(owners)), replace=False).tolist()
+    caseids = rng.choice(df["caseid"].to_numpy(), min(n_cases, len(df)), replace=False).tolist()
+    reported = df["reportedon"].dropna()
+
+    return {
+        "rows": len(df),
+        # Unknown owner / caseids take the not-found paths too
+        "owners": owners + ["No Such Owner"],
+        "caseids": [str(c) for c in caseids] + ["1", "not-a-caseid"],
+        "prefixes": [o[:3] for o in owners[:50]],
+        "since": [None] + [d.date().isoformat() for d in reported.sample(4, random_state=seed)],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("scale", nargs="?", default="1m", choices=sorted(CASE_DATA_FILES))
+    parser.add_argument("--owners", type=int, default=200)
+    parser.add_argument("--cases", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--child", nargs=2, type=Path, help=argparse.SUPPRESS)
+    parser.add_argument("--out", type=Path, default=None)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child)
+        return
+
+    from services.case_store import build_store
+
+    source = DATA_DIR / CASE_DATA_FILES[args.scale]
+    if not source.exists():
+        sys.exit(f"{source} not found (python scripts/generate_cases.py {args.scale})")
+
+    sample = make_sample(source, args.owners, args.cases, args.seed)
+    report = {"scale": args.scale, "rows": sample["rows"], "results": {}}
+
+    start = time.perf_counter()
+    store_path = build_store(source)
+    report["store_build_s"] = round(time.perf_counter() - start, 2)
+    report["store_mb"] = round(store_path.stat().st_size / (1024 * 1024), 1)
+    print(f"{args.scale}: {sample['rows']} rows, store built in {report['store_build_s']}s ({report['store_mb']} MB)\n")
+
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+        json.dump(sample, f)
+        sample_path = Path(f.name)
+
+    try:
+        for backend in BACKENDS:
+            report["results"][backend] = run(args.scale, backend, sample_path)
+    finally:
+        sample_path.unlink(missing_ok=True)
+
+    results = report["results"]
+    for backend in BACKENDS:
+        r = results[backend]
+        print(f"{backend:<7} first call {r['first_call_s']:.2f}s  peak RSS {r['max_rss_mb']:.0f} MB")
+
+    print(f"\n{'function':<24}" + "".join(f"{b + ' p50/p95 ms':>24}" for b in BACKENDS) + "  parity")
+    mismatches = {}
+    for name in results["pandas"]["latency_ms"]:
+        cells = "".join(
+            f"{results[b]['latency_ms'][name]['p50']:>13.3f} / {results[b]['latency_ms'][name]['p95']:<8.3f}"
+            for b in BACKENDS
+        )
+        expected, actual = (results[b]["answers"][name] for b in BACKENDS)
+        mismatches[name] = sum(a != b for a, b in zip(expected, actual))
+        print(f"{name:<24}{cells}  {'ok' if not mismatches[name] else f'{mismatches[name]} differ'}")
+
+    report["mismatches"] = mismatches
+    for r in results.values():
+        r.pop("answers")
+
+    out = args.out or RESULTS_DIR / f"insights_{args.scale}_{datetime.now():%Y%m%d_%H%M%S}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2))
+    print(f"\nSaved: {out}")
+
+
+if __name__ == "__main__":
+    main()
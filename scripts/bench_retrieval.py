@@ -0,0 +1,283 @@
+"""
+Retrieval evaluation + latency benchmark for services.retriever.
+
+find_similar_cases: queries are case subjects, the expected hit is the
+case itself (or any case with identical category/details/status, which
+the index cannot tell apart). Runs per scale: 2k, 25k and synthetic
+scales built from a base index plus N perturbed distractor vectors.
+
+retrieve_context: labelled MPR questions (data/eval/mpr_questions.jsonl),
+a hit is any chunk from the expected PDF.
+
+Reports recall@k, MRR, p50/p95/p99 latency and throughput, and writes
+everything to JSON; --baseline diffs against a previous run.
+
+Usage: python scripts/bench_retrieval.py [--scales 2k,25k] [--synthetic 100000,1000000]
+                                         [--queries 200] [--threads 4] [--baseline old.json]
+"""
+import argparse
+import json
+import pickle
+import shutil
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import faiss
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from core.config import CASE_DATA_FILES, DATA_DIR, TOP_K, case_bm25_path, case_index_paths, case_shard_dir
+from services import retriever
+from services.indexer import find_case_columns, new_case_index, prepare_case_frame, save_case_index
+from services.ingest import load_cases
+
+KS = (1, 3, 5, 10)
+QUESTIONS = DATA_DIR / "eval" / "mpr_questions.jsonl"
+RESULTS_DIR = DATA_DIR / "bench"
+
+
+# ---------------------------
+# Query sets
+# ---------------------------
+def case_queries(scale: str, n: int, seed: int = 42):
+    """
+    (subject, relevant caseids) pairs sampled from the scale's CSV.
+    """
+    df = prepare_case_frame(load_cases(DATA_DIR / CASE_DATA_FILES[scale]))
+    cols = find_case_columns(df)
+
+    subject_col = next((c for c in df.columns if c.lower() == "subject"), cols["summary"])
+    ids = df[cols["case"]].astype("int64")
+    signature = (
+        df[cols["category"]].astype(str) + "|"
+        + df[cols["summary"]].astype(str) + "|"
+        + df[cols["resolution"]].astype(str)
+    )
+    same_text = ids.groupby(signature).agg(set)
+
+    df = df[df[subject_col].astype(str).str.strip() != ""]
+    sample = df.sample(n=min(n, len(df)), random_state=seed)
+
+    return [
+        (str(row[subject_col]), same_text[signature[idx]])
+        for idx, row in sample.iterrows()
+    ]
+
+
+def doc_queries(path: Path = QUESTIONS):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+# ---------------------------
+# Metrics
+# ---------------------------
+def first_hit(ranked, relevant) -> int:
+    for rank, item in enumerate(ranked, start=1):
+        if item in relevant:
+            return rank
+    return 0
+
+
+def quality(ranks) -> dict:
+    ranks = np.array(ranks)
+    found = ranks > 0
+    out = {f"recall@{k}": round(float(np.mean(found & (ranks <= k))), 4) for k in KS}
+    out["mrr"] = round(float(np.mean(np.where(found, 1.0 / np.maximum(ranks, 1), 0.0))), 4)
+    return out
+
+
+def timing(fn, queries, threads: int) -> dict:
+    """
+    Per-query latency (sequential) and throughput with `threads` callers.
+    """
+    for query in queries[:5]:
+        fn(query)  # warm caches / lazy index loads
+
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(fn, queries))
+    wall = time.perf_counter() - start
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {
+        "queries": len(queries),
+        "p50_ms": round(float(p50), 2),
+        "p95_ms": round(float(p95), 2),
+        "p99_ms": round(float(p99), 2),
+        "mean_ms": round(float(np.mean(latencies)), 2),
+        "qps_sequential": round(len(queries) / (sum(latencies) / 1000), 1),
+        f"qps_{threads}_threads": round(len(queries) / wall, 1),
+    }
+
+
+# ---------------------------
+# Synthetic scales
+# ---------------------------
+def build_synthetic_scale(base_scale: str, n_total: int, noise: float, seed: int = 7) -> str:
+    """
+    Base index plus perturbed copies of its vectors under fresh caseids,
+    up to n_total vectors. Distractors carry stub metadata and no BM25
+    text, so they only compete on the vector side.
+    """
+    scale = f"synth{n_total}"
+    index_path, meta_path = case_index_paths(scale)
+    base_index_path, base_meta_path = case_index_paths(base_scale)
+
+    if index_path.exists() and index_path.stat().st_mtime > base_index_path.stat().st_mtime:
+        return scale
+
+    base = faiss.read_index(str(base_index_path))
+    with open(base_meta_path, "rb") as f:
+        metadata = pickle.load(f)
+
+    ids = faiss.vector_to_array(base.id_map).astype("int64")
+    vectors = np.vstack([base.reconstruct(int(i)) for i in ids]).astype("float32")
+
+    index = new_case_index(vectors.shape[1])
+    index.add_with_ids(vectors, ids)
+
+    rng = np.random.default_rng(seed)
+    next_id = int(ids.max()) + 1
+    sigma = noise / np.sqrt(vectors.shape[1])
+
+    remaining = max(0, n_total - len(ids))
+    while remaining:
+        size = min(remaining, 100_000)
+        src = rng.integers(0, len(ids), size)
+        block = vectors[src] + rng.normal(0, sigma, (size, vectors.shape[1])).astype("float32")
+        block_ids = np.arange(next_id, next_id + size, dtype="int64")
+
+        index.add_with_ids(block, block_ids)
+        for cid, s in zip(block_ids.tolist(), src.tolist()):
+            metadata[cid] = {"caseid": cid, "synthetic": True, "source_caseid": int(ids[s])}
+
+        next_id += size
+        remaining -= size
+
+    save_case_index(index, metadata, index_path, meta_path)
+    shutil.copyfile(case_bm25_path(base_scale), case_bm25_path(scale))
+    return scale
+
+
+# ---------------------------
+# Benchmarks
+# ---------------------------
+def bench_cases(scale: str, queries, threads: int) -> dict:
+    retriever.set_case_scale(scale)
+    depth = max(KS)
+
+    def search(query):
+        return retriever.find_similar_cases(query, top_k=depth)
+
+    ranks = []
+    for query, relevant in queries:
+        hits = [int(case.get("caseid", -1)) for case in search(query)]
+        ranks.append(first_hit(hits, relevant))
+
+    case_index, _, _ = retriever._load_case_index()
+    result = {"index_size": int(case_index.ntotal), **quality(ranks)}
+    result.update(timing(search, [q for q, _ in queries], threads))
+    return result
+
+
+def bench_docs(threads: int) -> dict:
+    questions = doc_queries()
+
+    ranks = []
+    for item in questions:
+        sources = [m.get("source") for m in retriever.retrieve_chunks(item["question"], max(KS))]
+        ranks.append(first_hit(sources, {item["source"]}))
+
+    result = {"chunks": int(retriever.INDEX.ntotal), "top_k": TOP_K, **quality(ranks)}
+    result.update(timing(retriever.retrieve_context, [q["question"] for q in questions], threads))
+    return result
+
+
+def print_row(name: str, r: dict):
+    print(
+        f"{name:<22} recall@1 {r['recall@1']:.2f}  recall@5 {r['recall@5']:.2f}  "
+        f"MRR {r['mrr']:.3f}  p50 {r['p50_ms']:.1f}  p95 {r['p95_ms']:.1f}  "
+        f"p99 {r['p99_ms']:.1f} ms  {r['qps_sequential']:.0f} q/s"
+    )
+
+
+def compare(current: dict, baseline: dict):
+    print("\nvs baseline:")
+    for name, r in current["results"].items():
+        old = baseline.get("results", {}).get(name)
+        if not old:
+            continue
+        deltas = []
+        for key in ("recall@5", "mrr", "p95_ms", "qps_sequential"):
+            if key in r and key in old and old[key]:
+                deltas.append(f"{key} {100 * (r[key] - old[key]) / old[key]:+.1f}%")
+        print(f"{name:<22} " + "  ".join(deltas))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scales", default="2k", help="comma-separated case scales with a built index")
+    parser.add_argument("--synthetic", default="", help="comma-separated total index sizes, e.g. 100000,1000000")
+    parser.add_argument("--synthetic-base", default="2k")
+    parser.add_argument("--noise", type=float, default=0.5, help="expected L2 offset of a distractor from its source")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--out", type=Path, default=None)
+    parser.add_argument("--baseline", type=Path, default=None)
+    args = parser.parse_args()
+
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "queries": args.queries,
+        "threads": args.threads,
+        "results": {},
+    }
+
+    runs = []
+    for scale in filter(None, args.scales.split(",")):
+        if not case_index_paths(scale)[0].exists() and not (case_shard_dir(scale) / "manifest.json").exists():
+            print(f"Skipping {scale}: no index (python services/indexer.py {scale})")
+            continue
+        runs.append((scale, scale))
+
+    synthetic = [int(n) for n in filter(None, args.synthetic.split(","))]
+    if synthetic:
+        for n in synthetic:
+            print(f"Preparing synthetic scale of {n} vectors...")
+            runs.append((f"synth{n}", build_synthetic_scale(args.synthetic_base, n, args.noise)))
+
+    for name, scale in runs:
+        query_scale = args.synthetic_base if scale.startswith("synth") else scale
+        queries = case_queries(query_scale, args.queries)
+        result = bench_cases(scale, queries, args.threads)
+        report["results"][f"cases/{name}"] = result
+        print_row(f"cases/{name}", result)
+
+    result = bench_docs(args.threads)
+    report["results"]["docs"] = result
+    print_row("docs", result)
+
+    out = args.out or RESULTS_DIR / f"retrieval_{datetime.now():%Y%m%d_%H%M%S}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2))
+    print(f"\nSaved: {out}")
+
+    if args.baseline:
+        compare(report, json.loads(args.baseline.read_text()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Process start-up cost per entry point, from `python -X importtime`.
+
+Each target is imported in a fresh interpreter (best of --repeat runs).
+Reports wall time, the slowest top-level imports by cumulative time,
+and which heavy dependencies (torch, sentence_transformers, faiss,
+fitz, ollama) got pulled in at import.
+
+Usage: python scripts/bench_startup.py [--targets insights,api] [--repeat 3] [--top 8]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from core.config import DATA_DIR
+
+RESULTS_DIR = DATA_DIR / "bench"
+HEAVY = ("torch", "sentence_transformers", "faiss", "fitz", "ollama")
+
+# name -> (working directory, import statement)
+TARGETS = {
+    "config": (ROOT_DIR, "import core.config"),
+    "insights": (ROOT_DIR, "import services.user_insights"),
+    "retriever": (ROOT_DIR, "import services.retriever"),
+    "agent": (ROOT_DIR, "import services.agent"),
+    "api": (ROOT_DIR / "backend_api", "import app.main"),
+}
+
+
+def parse_importtime(stderr: str):
+    """
+    [(module, self_us, cumulative_us, depth)] from -X importtime output.
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def measure(name: str, repeat: int) -> dict:
+    cwd, statement = TARGETS[name]
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(ROOT_DIR), os.environ.get("PYTHONPATH")]))}
+
+    best, stderr = None, ""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", statement],
+            cwd=cwd, env=env, capture_output=True, text=True,
+        )
+        wall = time.perf_counter() - start
+        if run.returncode != 0:
+            raise RuntimeError(f"{name}: {statement!r} failed:\n{run.stderr[-2000:]}")
+        if best is None or wall < best:
+            best, stderr = wall, run.stderr
+
+    rows = parse_importtime(stderr)
+    top_level = sorted((r for r in rows if r[3] <= 1), key=lambda r: -r[2])
+    loaded = {r[0] for r in rows}
+
+    return {
+        "wall_s": round(best, 3),
+        "import_s": round(sum(r[1] for r in rows) / 1e6, 3),
+        "heavy": [m for m in HEAVY if m in loaded],
+        "slowest": [{"module": r[0], "cumulative_ms": round(r[2] / 1000, 1)} for r in top_level],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--targets", default=",".join(TARGETS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=8)
+    parser.add_argument("--out", type=Path, default=None)
+    args = parser.parse_args()
+
+    report = {"python": sys.version.split()[0], "results": {}}
+
+    for name in filter(None, args.targets.split(",")):
+        r = measure(name, args.repeat)
+        r["slowest"] = r["slowest"][:args.top]
+        report["results"][name] = r
+
+        heavy = ", ".join(r["heavy"]) or "none"
+        print(f"{name:<10} {r['wall_s']:.2f}s wall, {r['import_s']:.2f}s imports, heavy: {heavy}")
+        for item in r["slowest"]:
+            print(f"    {item['cumulative_ms']:>8.1f} ms  {item['module']}")
+
+    out = args.out or RESULTS_DIR / f"startup_{datetime.now():%Y%m%d_%H%M%S}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2))
+    print(f"\nSaved: {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Cold vs warm first-query latency.
+
+Each mode runs in a fresh interpreter, so import/model-load costs are
+real. Both modes first unload the LLM from Ollama (keep_alive=0) unless
+--keep-llm is given.
+
+  cold: import -> first query -> second query
+  warm: import -> warm_up() -> first query -> second query
+
+A query is similar-case search + pdf_agent answer, as the dashboard does.
+
+Usage: python scripts/bench_warmup.py [--query "..."] [--keep-llm] [--out results.json]
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from core.config import DATA_DIR
+
+RESULTS_DIR = DATA_DIR / "bench"
+DEFAULT_QUERY = "How do I allocate a resource to a project?"
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return round(time.perf_counter() - start, 3)
+
+
+def child(mode: str, query: str, keep_llm: bool):
+    """
+    Runs in the fresh interpreter; prints one JSON line.
+    """
+    result = {"mode": mode}
+
+    if not keep_llm:
+        import ollama
+        from core.config import OLLAMA_MODEL
+
+        ollama.generate(model=OLLAMA_MODEL, prompt="", keep_alive=0)
+
+    start = time.perf_counter()
+    from services.agent import pdf_agent
+    from services.retriever import find_similar_cases
+    from services.warmup import warm_up
+    result["import_s"] = round(time.perf_counter() - start, 3)
+
+    if mode == "warm":
+        result["warmup_s"] = timed(warm_up)
+
+    def query_once():
+        find_similar_cases(query)
+        pdf_agent(query)
+
+    result["first_query_s"] = timed(query_once)
+    result["second_query_s"] = timed(query_once)
+    print(json.dumps(result))
+
+
+def run(mode: str, query: str, keep_llm: bool) -> dict:
+    args = [sys.executable, __file__, "--child", mode, "--query", query]
+    if keep_llm:
+        args.append("--keep-llm")
+    out = subprocess.run(args, capture_output=True, text=True, check=True, cwd=ROOT_DIR)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--query", default=DEFAULT_QUERY)
+    parser.add_argument("--keep-llm", action="store_true", help="don't unload the LLM before each run")
+    parser.add_argument("--child", choices=["cold", "warm"], help=argparse.SUPPRESS)
+    parser.add_argument("--out", type=Path, default=None)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.query, args.keep_llm)
+        return
+
+    report = {"query": args.query, "results": {}}
+    for mode in ("cold", "warm"):
+        r = run(mode, args.query, args.keep_llm)
+        report["results"][mode] = r
+        warmup = f"  warm-up {r['warmup_s']:.2f}s" if "warmup_s" in r else ""
+        print(
+            f"{mode:<5} import {r['import_s']:.2f}s{warmup}  "
+            f"first query {r['first_query_s']:.2f}s  second query {r['second_query_s']:.2f}s"
+        )
+
+    cold, warm = report["results"]["cold"], report["results"]["warm"]
+    print(f"\nFirst query: {cold['first_query_s']:.2f}s cold -> {warm['first_query_s']:.2f}s warm")
+
+    out = args.out or RESULTS_DIR / f"warmup_{datetime.now():%Y%m%d_%H%M%S}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2))
+    print(f"Saved: {out}")
+
+
+if __name__ == "__main__":
+    main()
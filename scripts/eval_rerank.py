@@ -0,0 +1,92 @@
+"""
+Offline evaluation of the cross-encoder re-rank stage on labelled MPR
+questions (data/eval/mpr_questions.jsonl: question -> expected PDF).
+
+For each question the fused BM25 + FAISS candidates are ranked with and
+without re-ranking; reports hit@k, MRR, prompt size at TOP_K and the
+re-rank latency (cold cache, no budget).
+
+Usage: python scripts/eval_rerank.py [--model cross-encoder/ms-marco-MiniLM-L-6-v2] [--candidates 20]
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from core.config import DATA_DIR, RERANK_CANDIDATES, RERANK_MODEL, TOP_K
+from services.reranker import Reranker
+from services.retriever import retrieve_chunks
+
+QUESTIONS = DATA_DIR / "eval" / "mpr_questions.jsonl"
+KS = (1, 3, 5)
+
+
+def load_questions(path: Path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def first_hit(ranking, source) -> int:
+    """
+    1-based rank of the first chunk from the expected PDF, 0 if none.
+    """
+    for rank, meta in enumerate(ranking, start=1):
+        if meta.get("source") == source:
+            return rank
+    return 0
+
+
+def summarize(name, ranks, context_chars):
+    ranks = np.array(ranks)
+    hits = "  ".join(f"hit@{k} {np.mean((ranks > 0) & (ranks <= k)):.2f}" for k in KS)
+    mrr = np.mean(np.where(ranks > 0, 1.0 / np.maximum(ranks, 1), 0.0))
+    print(f"{name:<12} {hits}  MRR {mrr:.3f}  context@{TOP_K} {np.mean(context_chars):.0f} chars")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=RERANK_MODEL or "cross-encoder/ms-marco-MiniLM-L-6-v2")
+    parser.add_argument("--candidates", type=int, default=RERANK_CANDIDATES)
+    parser.add_argument("--questions", type=Path, default=QUESTIONS)
+    args = parser.parse_args()
+
+    questions = load_questions(args.questions)
+    reranker = Reranker(args.model, budget_ms=None)
+    reranker.model  # load outside the timed calls
+
+    base_ranks, base_chars = [], []
+    rerank_ranks, rerank_chars = [], []
+    latencies = []
+
+    for item in questions:
+        query, source = item["question"], item["source"]
+
+        ranking = retrieve_chunks(query, args.candidates)
+        base_ranks.append(first_hit(ranking, source))
+        base_chars.append(sum(len(m["text"]) for m in ranking[:TOP_K]))
+
+        start = time.perf_counter()
+        ranking = retrieve_chunks(query, args.candidates, reranker)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        rerank_ranks.append(first_hit(ranking, source))
+        rerank_chars.append(sum(len(m["text"]) for m in ranking[:TOP_K]))
+
+    print(f"{len(questions)} questions | {args.candidates} candidates | re-ranker {args.model}")
+    summarize("fused", base_ranks, base_chars)
+    summarize("re-ranked", rerank_ranks, rerank_chars)
+
+    p50, p95 = np.percentile(latencies, [50, 95])
+    print(f"retrieve + re-rank latency: p50 {p50:.1f} ms  p95 {p95:.1f} ms  "
+          f"({reranker.ms_per_pair:.2f} ms/pair)")
+
+
+if __name__ == "__main__":
+    main()
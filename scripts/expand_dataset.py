@@ -1,32 +1,18 @@
-import pandas as pd
+import sys
+from pathlib import Path
 
-INPUT_PATH = "data/cases_training.csv"
-OUTPUT_PATH = "data/cases_training_25k.csv"
-TARGET_ROWS = 25000
-
-# Try common enterprise encodings
-encodings_to_try = ["utf-8", "latin-1", "cp1252"]
-
-df = None
-for enc in encodings_to_try:
-    try:
-        df = pd.read_csv(INPUT_PATH, encoding=enc)
-        print(f"Loaded CSV using encoding: {enc}")
-        break
-    except UnicodeDecodeError:
-        print(f"Failed with encoding: {enc}")
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
 
-if df is None:
-    raise ValueError("Could not decode CSV with known encodings")
+from scripts.generate_cases import generate
 
-original_rows = len(df)
-multiplier = (TARGET_ROWS // original_rows) + 1
-
-df_large = pd.concat([df] * multiplier, ignore_index=True)
-df_large = df_large.iloc[:TARGET_ROWS]
+OUTPUT_PATH = ROOT_DIR / "data" / "cases_training_25k.csv"
+TARGET_ROWS = 25000
 
-df_large.to_csv(OUTPUT_PATH, index=False)
+# Varied synthetic cases fitted on cases_training.csv (not copies of it),
+# so 25k-scale FAISS and dedup numbers mean something
+generate(TARGET_ROWS, OUTPUT_PATH, chunk_size=TARGET_ROWS)
 
-print(f"Original rows: {original_rows}")
-print(f"New rows: {len(df_large)}")
+print(f"New rows: {TARGET_ROWS}")
 print(f"Saved expanded dataset to: {OUTPUT_PATH}")
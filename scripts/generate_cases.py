@@ -0,0 +1,569 @@
+"""
+Synthetic cases for load tests (100k - 10M rows), fitted on the seed
+CSV instead of replicating it:
+
+- categoricals/flags/efforts come from a sampled seed row, so their
+  joint mix stays realistic; efforts get a per-row jitter
+- subjects/details are varied per row: subject tails and detail
+  sentences recombined across seeds of the same category, modules /
+  customers / roles / regions swapped from templates, fresh numbers and
+  requester names, month tags that match reportedon, synonym swaps;
+  each chunk must keep MIN_DISTINCT_TEXT_RATIO distinct texts
+- fresh, increasing caseids; reportedon follows the seed's weekday mix
+  with steady growth over the date range
+- open statuses only on recent cases, closedate/expclosedate drawn from
+  the seed's resolution and SLA times, aging = days to the as-of date
+- owners: the seed owners plus a Zipf tail of new ones as volume grows
+
+Rows are produced and written chunk by chunk (CSV in the seed's raw
+format, or typed Parquet), so memory is bounded by --chunk.
+
+Usage: python scripts/generate_cases.py 1m [--out data/cases_synthetic_1m.parquet]
+                                            [--chunk 100000] [--days 730] [--seed 42]
+"""
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from core.config import CASE_DATA_FILES, DATA_DIR
+from services.ingest import AGING_COLUMNS, BOOL_COLUMNS, DATE_COLUMNS, FLOAT_COLUMNS, load_cases
+
+SEED_CSV = DATA_DIR / CASE_DATA_FILES["2k"]
+
+# Cases stay open this long at most; younger closed cases may still be open
+MAX_OPEN_DAYS = 45
+RECENT_DAYS = 7
+
+FIRST_NAMES = [
+    "Aarav", "Aditi", "Akash", "Ananya", "Arjun", "Bhavna", "Chetan", "Divya",
+    "Gaurav", "Isha", "Karan", "Kavya", "Manish", "Meera", "Neha", "Nikhil",
+    "Pooja", "Rahul", "Ritika", "Rohan", "Sakshi", "Shreya", "Tanvi", "Varun",
+]
+LAST_NAMES = [
+    "Agarwal", "Bansal", "Chopra", "Desai", "Iyer", "Jain", "Joshi", "Kapoor",
+    "Mehta", "Mishra", "Nair", "Patel", "Rao", "Reddy", "Saxena", "Shah",
+    "Sharma", "Singh", "Tiwari", "Yadav",
+]
+
+# Matched case-insensitively as whole words; the replacement takes the
+# matched text's case (UPDATE -> MODIFY, Update -> Modify)
+SYNONYMS = {
+    "update": ["modify", "change", "update"],
+    "credentials": ["login", "access", "credentials"],
+    "kindly": ["please", "kindly"],
+    "unable": ["not able", "unable"],
+    "issue": ["problem", "issue"],
+    "user creation": ["user creation", "new user creation", "create user"],
+    "new joiners": ["new joiners", "new joinees", "new hires"],
+    "attached": ["attached", "enclosed"],
+    "required": ["required", "needed"],
+    "error": ["error", "failure"],
+}
+
+# Template slots: a term from a slot found in a case's text is swapped
+# for another term of the same slot (the same one in subject and details)
+ENTITIES = {
+    "module": [
+        "Timesheet", "Project", "Travel", "Milestone", "Billing", "Allocation",
+        "Helpdesk", "Dashboard", "Layout", "Workflow", "Escalation", "Approval",
+        "Notification", "Portfolio", "Leave", "Expense", "Attendance", "Invoice",
+    ],
+    "customer": [
+        "SBI", "PNB", "KLI", "AMC", "Extraco", "Foothill", "HDFC", "ICICI",
+        "Axis Bank", "Kotak", "Canara Bank", "Bank of Baroda", "IDFC", "Yes Bank",
+    ],
+    "role": [
+        "Finance Auditor", "Project Manager", "Consultant", "Team Lead",
+        "Delivery Manager", "Test Engineer", "Support Engineer", "Business Analyst",
+    ],
+    "region": ["North America", "EMEA", "APAC", "Middle East", "UK"],
+}
+
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+NUMBER_RE = re.compile(r"\d{3,}")
+MONTH_TAG_RE = re.compile(r"\b(?:%s)'\d{2}\b" % "|".join(MONTHS))
+TRAILING_NAME_RE = re.compile(r"(- )[A-Z][a-z]+(?: [A-Z][a-z]+){0,2}$")
+SYNONYM_RE = re.compile(
+    r"\b(?:" + "|".join(sorted(map(re.escape, SYNONYMS), key=len, reverse=True)) + r")\b",
+    re.IGNORECASE,
+)
+ENTITY_RES = {
+    slot: re.compile(r"\b(?:" + "|".join(sorted(map(re.escape, terms), key=len, reverse=True)) + r")\b")
+    for slot, terms in ENTITIES.items()
+}
+# Appended to subjects; short bare ones ("User Creation") always get the
+# requester name (the first entry)
+QUALIFIERS = [" - {name}", " - {customer}", " ({region})", " for {role}", " | {module}"]
+REPLY_PREFIXES = ["Re: ", "RE: ", "Fw: ", "FW: ", "Fwd: "]
+REPLY_PREFIX_RE = re.compile(r"^(?:(?:re|fw|fwd)\s*:\s*)+", re.IGNORECASE)
+
+# "Head : tail", "Head - tail", "Head | tail": the tail is what varies
+SUBJECT_SEPARATOR_RE = re.compile(r"\s(?:-|:|\|)\s|:\s")
+# "... in <phrase>", "... for <phrase>": the closing phrase is swapped
+# for one that followed the same word in another seed subject
+PHRASE_RE = re.compile(r"\s(for|in|on|of|to|from|with)\s(?=\S)", re.IGNORECASE)
+SENTENCE_RE = re.compile(r"(?<=[.!?])\s+|\s*[\r\n]+\s*")
+
+# A chunk with fewer distinct (subject, details) texts than this is an error
+MIN_DISTINCT_TEXT_RATIO = 0.85
+
+
+def parse_rows(value: str) -> int:
+    """
+    "250000", "100k", "1m", "10M" -> row count.
+    """
+    value = value.strip().lower()
+    scale = {"k": 1_000, "m": 1_000_000}.get(value[-1:], 1)
+    return int(float(value.rstrip("km")) * scale)
+
+
+def rows_label(n: int) -> str:
+    if n % 1_000_000 == 0:
+        return f"{n // 1_000_000}m"
+    if n % 1_000 == 0:
+        return f"{n // 1_000}k"
+    return str(n)
+
+
+# ---------------------------
+# Seed profile
+# ---------------------------
+class CaseProfile:
+    """
+    Distributions fitted once from the seed cases.
+    """
+
+    def __init__(self, seed: pd.DataFrame, n_rows: int, n_owners: int = None, days: int = 730):
+        self.columns = list(seed.columns)
+        self.templates = seed.reset_index(drop=True)
+
+        age_days = lambda col: (seed[col] - seed["reportedon"]).dt.days
+
+        closed_share = seed.groupby("statuscode", observed=True)["closedate"].apply(lambda s: s.notna().mean())
+        status_counts = seed["statuscode"].value_counts()
+        self.closed_statuses = closed_share[closed_share >= 0.5].index.tolist()
+        self.open_statuses = closed_share[closed_share < 0.5].index.tolist()
+        self.closed_weights = _weights(status_counts.reindex(self.closed_statuses))
+        self.open_weights = _weights(status_counts.reindex(self.open_statuses))
+
+        # Negative spans in the seed are day/month swaps; keep the sane ones
+        resolve = age_days("closedate").dropna()
+        self.resolve_days = resolve[resolve >= 0].to_numpy() if (resolve >= 0).any() else np.array([3])
+        sla = age_days("expclosedate").dropna()
+        self.sla_days = sla[sla > 0].to_numpy() if (sla > 0).any() else np.array([7])
+
+        weekday = seed["reportedon"].dt.dayofweek.value_counts().reindex(range(7), fill_value=0)
+        self.weekday_weights = _weights(weekday + 1)
+
+        self.as_of = seed["reportedon"].max().normalize()
+        self.start = self.as_of - pd.Timedelta(days=days)
+        self.first_caseid = int(seed["caseid"].max()) + 1
+
+        self.owners, self.owner_weights = self._owners(seed, n_owners or max(seed["currentowner"].nunique(), n_rows // 5_000))
+        self.subject_tails, self.phrases, self.sentences = self._text_pools(seed)
+
+    @staticmethod
+    def _text_pools(seed: pd.DataFrame):
+        """
+        Per category: subject tails (after the first separator), closing
+        phrases by the word before them, and detail sentences, for
+        recombining texts across seed cases.
+        """
+        tails, phrases, sentences = {}, {}, {}
+        category = seed["category"].astype(str) if "category" in seed.columns else pd.Series("", index=seed.index)
+        for cat, group in seed.groupby(category, sort=False):
+            cat_tails, cat_phrases = set(), {}
+            for subject in group.get("subject", pd.Series(dtype=object)).dropna():
+                match = SUBJECT_SEPARATOR_RE.search(subject)
+                if match and len(subject) - match.end() >= 4:
+                    cat_tails.add(subject[match.end():].strip())
+                for word in PHRASE_RE.finditer(subject):
+                    phrase = subject[word.end():].strip()
+                    if 3 <= len(phrase) <= 60:
+                        cat_phrases.setdefault(word.group(1).lower(), set()).add(phrase)
+
+            cat_sentences = set()
+            for details in group.get("details", pd.Series(dtype=object)).dropna():
+                cat_sentences.update(
+                    part for part in SENTENCE_RE.split(details)
+                    if len(part) >= 20 and not part.rstrip().endswith(",")
+                )
+
+            tails[cat] = sorted(cat_tails)
+            phrases[cat] = {word: sorted(found) for word, found in cat_phrases.items()}
+            sentences[cat] = sorted(cat_sentences)
+        return tails, phrases, sentences
+
+    @staticmethod
+    def _owners(seed: pd.DataFrame, n_owners: int):
+        counts = seed["currentowner"].value_counts()
+        counts = counts[counts > 0]
+        names = counts.index.astype(str).tolist()
+        weights = counts.to_numpy(dtype="float64")
+
+        # New owners continue the seed's rank/frequency curve (Zipf tail)
+        extra = [f"{first} {last}" for last in LAST_NAMES for first in FIRST_NAMES]
+        extra = [name for name in extra if name not in set(names)]
+        np.random.default_rng(0).shuffle(extra)
+        m = len(names)
+        for rank in range(m + 1, n_owners + 1):
+            name = extra[(rank - m - 1) % len(extra)]
+            if rank - m - 1 >= len(extra):
+                name = f"{name} {(rank - m - 1) // len(extra) + 1}"
+            names.append(name)
+            weights = np.append(weights, weights[m - 1] * m / rank)
+
+        return np.array(names, dtype=object), weights / weights.sum()
+
+    def calendar(self):
+        """
+        (days, cdf) over the date range: weekday mix from the seed,
+        case volume growing 2x from start to as-of.
+        """
+        days = pd.date_range(self.start, self.as_of, freq="D")
+        weights = self.weekday_weights[days.dayofweek] * np.linspace(1.0, 2.0, len(days))
+        cdf = np.cumsum(weights)
+        return days, cdf / cdf[-1]
+
+
+def _weights(counts) -> np.ndarray:
+    w = np.asarray(counts, dtype="float64")
+    w = np.nan_to_num(w)
+    return w / w.sum() if w.sum() else np.full(len(w), 1.0 / max(len(w), 1))
+
+
+# ---------------------------
+# Text perturbation
+# ---------------------------
+def _match_case(template: str, text: str) -> str:
+    if template.isupper():
+        return text.upper()
+    if template.istitle():
+        return text.title()
+    if template[:1].isupper():
+        return text[:1].upper() + text[1:]
+    return text
+
+
+class TextPerturber:
+    """
+    Rewrites one case's subject and details together: a number, term or
+    requester name that appears in both gets the same replacement, and
+    details that repeat the subject keep repeating it.
+    """
+
+    def __init__(self, rng: np.random.Generator, profile: CaseProfile):
+        self.rng = rng
+        self.subject_tails = profile.subject_tails
+        self.phrases = profile.phrases
+        self.sentences = profile.sentences
+
+    def _pick(self, options):
+        return options[self.rng.integers(len(options))]
+
+    def _name(self) -> str:
+        parts = [self._pick(FIRST_NAMES)]
+        if self.rng.random() < 0.4:
+            parts.append(self._pick(FIRST_NAMES))  # middle name
+        parts.append(self._pick(LAST_NAMES))
+        return " ".join(parts)
+
+    def _synonym(self, match):
+        if self.rng.random() < 0.5:
+            return match.group(0)
+        return _match_case(match.group(0), self._pick(SYNONYMS[match.group(0).lower()]))
+
+    def _recombine_subject(self, subject: str, category: str) -> str:
+        tails = self.subject_tails.get(category)
+        match = SUBJECT_SEPARATOR_RE.search(subject)
+        if match is not None:
+            tail = self._pick(tails) if tails and self.rng.random() < 0.6 else subject[match.end():]
+            if REPLY_PREFIX_RE.match(tail):
+                tail = REPLY_PREFIX_RE.sub(self._pick(REPLY_PREFIXES), tail)
+            subject = subject[:match.end()] + tail
+
+        # Swap the closing phrase after the last "for/in/on/..."
+        words = list(PHRASE_RE.finditer(subject))
+        pool = words and self.phrases.get(category, {}).get(words[-1].group(1).lower())
+        if pool and self.rng.random() < 0.6:
+            subject = subject[:words[-1].end()] + self._pick(pool)
+        return subject
+
+    def _qualifier(self, subject: str, name: str) -> str:
+        """
+        Suffix for the subject: short bare subjects get who it is for,
+        and often one more detail; others often get one detail.
+        """
+        qualifiers = []
+        if SUBJECT_SEPARATOR_RE.search(subject) is None and len(subject) < 40:
+            qualifiers.append(QUALIFIERS[0])
+            if self.rng.random() < 0.5:
+                qualifiers.append(self._pick(QUALIFIERS[1:]))
+        elif self.rng.random() < 0.7:
+            qualifiers.append(self._pick(QUALIFIERS[1:]))
+
+        suffix = "".join(
+            q.format(name=name, **{slot: self._pick(terms) for slot, terms in ENTITIES.items()})
+            for q in qualifiers
+        )
+        return suffix.upper() if subject.isupper() else suffix
+
+    def _recombine_details(self, details: str, category: str) -> str:
+        pool = self.sentences.get(category)
+        if not pool:
+            return details
+
+        # The first part is usually the greeting or the gist: kept.
+        # One-liners ("Email Syndication") stay as they are.
+        parts = [p for p in SENTENCE_RE.split(details) if p]
+        if len(parts) < 2:
+            return details
+        for i in range(1, len(parts)):
+            if self.rng.random() < 0.35:
+                parts[i] = self._pick(pool)
+        if self.rng.random() < 0.5:
+            parts.insert(max(len(parts) - 1, 1), self._pick(pool))
+        return " ".join(parts)
+
+    def __call__(self, texts, reported: pd.Timestamp, category: str = ""):
+        subject, details = texts
+        repeats = isinstance(details, str) and details.strip() == str(subject).strip()
+        name = self._name()
+        qualifier = ""
+
+        if isinstance(subject, str) and subject:
+            subject = self._recombine_subject(subject, category)
+            qualifier = self._qualifier(subject, name)
+        if repeats:
+            details = subject
+        elif isinstance(details, str) and details:
+            details = self._recombine_details(details, category)
+
+        numbers, terms = {}, {}
+        month_tag = f"{MONTHS[reported.month - 1]}'{reported.year % 100:02d}"
+
+        def number(match):
+            old = match.group(0)
+            if old not in numbers:
+                numbers[old] = str(self.rng.integers(10 ** (len(old) - 1), 10 ** len(old)))
+            return numbers[old]
+
+        def entity(slot):
+            def swap(match):
+                old = match.group(0)
+                if old not in terms:
+                    terms[old] = self._pick(ENTITIES[slot]) if self.rng.random() < 0.7 else old
+                return terms[old]
+            return swap
+
+        out = []
+        for text in (subject, details):
+            if isinstance(text, str) and text:
+                text = NUMBER_RE.sub(number, text)
+                text = MONTH_TAG_RE.sub(month_tag, text)
+                for slot, pattern in ENTITY_RES.items():
+                    text = pattern.sub(entity(slot), text)
+                text = TRAILING_NAME_RE.sub(lambda m: m.group(1) + name, text)
+                text = SYNONYM_RE.sub(self._synonym, text)
+            out.append(text)
+
+        # After the name swap, so the qualifier's name is not replaced
+        out[0] = out[0] + qualifier if qualifier else out[0]
+        if repeats:
+            out[1] += qualifier
+        return out
+
+
+# ---------------------------
+# Generator
+# ---------------------------
+def generate_chunks(profile: CaseProfile, n_rows: int, chunk_size: int = 100_000, seed: int = 42):
+    """
+    Yields typed DataFrames of up to chunk_size rows, caseids and
+    reportedon increasing across chunks.
+    """
+    rng = np.random.default_rng(seed)
+    days, cdf = profile.calendar()
+    perturb = TextPerturber(rng, profile)
+    text_cols = [c for c in ("subject", "details") if c in profile.columns]
+    effort_cols = [c for c in FLOAT_COLUMNS if c in profile.columns]
+
+    next_caseid = profile.first_caseid
+
+    for start in range(0, n_rows, chunk_size):
+        size = min(chunk_size, n_rows - start)
+
+        chunk = profile.templates.iloc[rng.integers(0, len(profile.templates), size)].reset_index(drop=True)
+
+        # Ids and dates: quantile position of each row in the whole run
+        gaps = rng.geometric(0.7, size)
+        chunk["caseid"] = next_caseid + np.cumsum(gaps) - gaps[0]
+        next_caseid = int(chunk["caseid"].iloc[-1]) + 1
+
+        u = (start + np.arange(size) + rng.random(size)) / n_rows
+        reported = days[np.minimum(np.searchsorted(cdf, u), len(days) - 1)]
+        chunk["reportedon"] = reported
+        age = (profile.as_of - reported).days.to_numpy()
+
+        # Status consistent with age
+        status = chunk["statuscode"].astype(object).to_numpy()
+        is_open = np.isin(status, profile.open_statuses)
+
+        reclose = is_open & (age > MAX_OPEN_DAYS)
+        status[reclose] = rng.choice(profile.closed_statuses, reclose.sum(), p=profile.closed_weights)
+
+        reopen = ~is_open & (age < RECENT_DAYS) & (rng.random(size) < 0.6)
+        if profile.open_statuses:
+            status[reopen] = rng.choice(profile.open_statuses, reopen.sum(), p=profile.open_weights)
+        chunk["statuscode"] = status
+
+        closed = np.isin(status, profile.closed_statuses)
+        resolve = np.minimum(rng.choice(profile.resolve_days, size), age)
+        chunk["closedate"] = pd.Series(reported + pd.to_timedelta(resolve, unit="D")).where(closed)
+        chunk["expclosedate"] = reported + pd.to_timedelta(rng.choice(profile.sla_days, size), unit="D")
+        chunk["aging"] = pd.array(age, dtype="Int32")
+
+        chunk["currentowner"] = rng.choice(profile.owners, size, p=profile.owner_weights)
+
+        jitter = rng.lognormal(0.0, 0.35, size).astype("float32")
+        for col in effort_cols:
+            chunk[col] = (chunk[col].astype("float32") * jitter).round(2)
+
+        if text_cols == ["subject", "details"]:
+            categories = chunk["category"].astype(str) if "category" in chunk.columns else [""] * size
+            rows = [
+                perturb(texts, ts, cat)
+                for texts, ts, cat in zip(chunk[text_cols].to_numpy(), reported, categories)
+            ]
+            chunk[text_cols] = pd.DataFrame(rows, columns=text_cols, dtype=object)
+            check_text_variety(chunk[text_cols])
+
+        yield chunk[profile.columns]
+
+
+def check_text_variety(texts: pd.DataFrame):
+    """
+    Raises when a chunk repeats too many (subject, details) pairs: the
+    load-test data would then dedup to a fraction of its size.
+    """
+    if len(texts) < 100:
+        return
+    ratio = (~texts.astype(str).duplicated()).mean()
+    if ratio < MIN_DISTINCT_TEXT_RATIO:
+        raise RuntimeError(
+            f"Only {ratio:.0%} distinct subject/details texts in a chunk of {len(texts)} "
+            f"(minimum {MIN_DISTINCT_TEXT_RATIO:.0%})"
+        )
+
+
+# ---------------------------
+# Writers
+# ---------------------------
+def to_raw_csv_frame(chunk: pd.DataFrame) -> pd.DataFrame:
+    """
+    Typed chunk -> the seed CSV's text format (dd-mm-yyyy, "189 D", Yes/No).
+    """
+    out = chunk.copy()
+    for col in DATE_COLUMNS:
+        if col in out.columns:
+            out[col] = out[col].dt.strftime("%d-%m-%Y")
+    for col in AGING_COLUMNS:
+        if col in out.columns:
+            out[col] = out[col].astype("string") + " D"
+    for col in BOOL_COLUMNS:
+        if col in out.columns:
+            out[col] = out[col].map({True: "Yes", False: "No"})
+    return out
+
+
+class CsvWriter:
+    def __init__(self, path: Path):
+        self.path = path
+        self._f = open(path, "w", encoding="utf-8", newline="")
+        self._header = True
+
+    def write(self, chunk: pd.DataFrame):
+        to_raw_csv_frame(chunk).to_csv(self._f, index=False, header=self._header)
+        self._header = False
+
+    def close(self):
+        self._f.close()
+
+
+class ParquetWriter:
+    """
+    One row group per chunk; categoricals are written as plain strings
+    so every chunk shares the first chunk's schema.
+    """
+
+    def __init__(self, path: Path):
+        import pyarrow  # noqa: F401
+
+        self.path = path
+        self._writer = None
+
+    def write(self, chunk: pd.DataFrame):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        chunk = chunk.astype({c: "string" for c in chunk.columns if isinstance(chunk[c].dtype, pd.CategoricalDtype) or chunk[c].dtype == object})
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.path, table.schema)
+        else:
+            table = table.cast(self._writer.schema)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def generate(n_rows: int, out: Path, chunk_size: int = 100_000, seed: int = 42, days: int = 730, n_owners: int = None, seed_csv: Path = SEED_CSV):
+    out = Path(out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+
+    profile = CaseProfile(load_cases(seed_csv), n_rows, n_owners, days)
+    tmp = out.with_name(out.name + ".tmp")
+    writer = ParquetWriter(tmp) if out.suffix == ".parquet" else CsvWriter(tmp)
+
+    start_time = time.time()
+    written = 0
+    try:
+        for chunk in generate_chunks(profile, n_rows, chunk_size, seed):
+            writer.write(chunk)
+            written += len(chunk)
+            print(f"[generate_cases] {written}/{n_rows} rows ({written / max(time.time() - start_time, 1e-9):.0f} rows/s)")
+    finally:
+        writer.close()
+
+    tmp.replace(out)
+    print(f"[generate_cases] Saved {written} rows, {len(profile.owners)} owners to {out} "
+          f"in {time.time() - start_time:.1f}s")
+    return out
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic cases")
+    parser.add_argument("rows", help="row count, e.g. 250000, 100k, 1m, 10m")
+    parser.add_argument("--out", type=Path, default=None, help=".csv or .parquet (default data/cases_synthetic_<rows>.parquet)")
+    parser.add_argument("--chunk", type=int, default=100_000)
+    parser.add_argument("--days", type=int, default=730, help="reportedon range ending at the seed's last date")
+    parser.add_argument("--owners", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    n_rows = parse_rows(args.rows)
+    out = args.out or DATA_DIR / f"cases_synthetic_{rows_label(n_rows)}.parquet"
+    generate(n_rows, out, args.chunk, args.seed, args.days, args.owners)
@@ -0,0 +1,164 @@
+"""
+Load test for the backend_api search endpoints.
+
+Fires queries at /search/cases, /search/docs and /recommend from N
+concurrent clients and reports latency percentiles, throughput and
+errors (503 = worker pool saturated) per concurrency level. For
+/recommend, time to the first answer token is reported alongside the
+full stream time.
+
+Start the API first (cd backend_api && uvicorn app.main:app --workers 2).
+
+Usage: python scripts/load_test_api.py [--url http://127.0.0.1:8000] [--concurrency 1,4,16]
+                                       [--requests 200] [--endpoints cases,docs,recommend]
+                                       [--out results.json]
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import requests
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from core.config import DATA_DIR
+
+QUESTIONS = DATA_DIR / "eval" / "mpr_questions.jsonl"
+RESULTS_DIR = DATA_DIR / "bench"
+
+CASE_QUERIES = [
+    "unable to login to the portal",
+    "resource not visible in allocation",
+    "user creation request for new joiner",
+    "project code missing in timesheet",
+    "access denied while approving request",
+    "report export is failing",
+]
+
+_local = threading.local()
+
+
+def session() -> requests.Session:
+    if not hasattr(_local, "session"):
+        _local.session = requests.Session()
+    return _local.session
+
+
+# ---------------------------
+# Calls (each returns (status, seconds, first-token seconds or None))
+# ---------------------------
+def call_cases(url: str, query: str):
+    start = time.perf_counter()
+    r = session().get(f"{url}/search/cases", params={"q": query, "top_k": 5}, timeout=60)
+    return r.status_code, time.perf_counter() - start, None
+
+
+def call_docs(url: str, query: str):
+    start = time.perf_counter()
+    r = session().get(f"{url}/search/docs", params={"q": query}, timeout=60)
+    return r.status_code, time.perf_counter() - start, None
+
+
+def call_recommend(url: str, query: str):
+    start = time.perf_counter()
+    first = None
+    with session().post(f"{url}/recommend", json={"question": query}, stream=True, timeout=300) as r:
+        if r.status_code != 200:
+            return r.status_code, time.perf_counter() - start, None
+        for line in r.iter_lines():
+            if first is None and line and json.loads(line)["type"] == "token":
+                first = time.perf_counter() - start
+    return r.status_code, time.perf_counter() - start, first
+
+
+ENDPOINTS = {
+    "cases": call_cases,
+    "docs": call_docs,
+    "recommend": call_recommend,
+}
+
+
+# ---------------------------
+# Runner
+# ---------------------------
+def run(fn, url: str, queries, n_requests: int, concurrency: int) -> dict:
+    work = [queries[i % len(queries)] for i in range(n_requests)]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda q: fn(url, q), work))
+    wall = time.perf_counter() - start
+
+    ok = [(sec, first) for status, sec, first in results if status == 200]
+    statuses = {}
+    for status, _, _ in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    out = {
+        "concurrency": concurrency,
+        "requests": n_requests,
+        "ok": len(ok),
+        "statuses": statuses,
+        "qps": round(len(ok) / wall, 1),
+    }
+    if ok:
+        ms = np.array([sec for sec, _ in ok]) * 1000
+        p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+        out.update(p50_ms=round(float(p50), 1), p95_ms=round(float(p95), 1), p99_ms=round(float(p99), 1))
+
+        firsts = [first for _, first in ok if first is not None]
+        if firsts:
+            out["ttft_p50_ms"] = round(float(np.percentile(firsts, 50) * 1000), 1)
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", default="1,4,16")
+    parser.add_argument("--requests", type=int, default=200, help="requests per endpoint and concurrency level")
+    parser.add_argument("--endpoints", default="cases,docs")
+    parser.add_argument("--out", type=Path, default=None)
+    args = parser.parse_args()
+
+    url = args.url.rstrip("/")
+    requests.get(f"{url}/health", timeout=10).raise_for_status()
+
+    with open(QUESTIONS, encoding="utf-8") as f:
+        doc_questions = [json.loads(line)["question"] for line in f if line.strip()]
+    queries = {"cases": CASE_QUERIES, "docs": doc_questions, "recommend": doc_questions}
+
+    report = {"url": url, "results": {}}
+
+    for name in filter(None, args.endpoints.split(",")):
+        fn = ENDPOINTS[name]
+        fn(url, queries[name][0])  # warm up
+
+        report["results"][name] = []
+        for concurrency in [int(c) for c in args.concurrency.split(",")]:
+            r = run(fn, url, queries[name], args.requests, concurrency)
+            report["results"][name].append(r)
+
+            line = f"{name:<10} c={concurrency:<3} {r['qps']:>7.1f} req/s  ok {r['ok']}/{r['requests']}"
+            if "p50_ms" in r:
+                line += f"  p50 {r['p50_ms']:.0f}  p95 {r['p95_ms']:.0f}  p99 {r['p99_ms']:.0f} ms"
+            if "ttft_p50_ms" in r:
+                line += f"  ttft p50 {r['ttft_p50_ms']:.0f} ms"
+            print(line)
+
+    out = args.out or RESULTS_DIR / f"api_load_{datetime.now():%Y%m%d_%H%M%S}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2))
+    print(f"\nSaved: {out}")
+
+
+if __name__ == "__main__":
+    main()
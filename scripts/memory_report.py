@@ -0,0 +1,51 @@
+"""
+Compares the memory footprint of the legacy cases frame (read_csv +
+fillna("")) with the compact schema produced by services.ingest.
+
+Usage: python scripts/memory_report.py [path/to/cases.csv]
+"""
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from services.ingest import detect_encoding, load_cases
+
+INPUT_PATH = Path(sys.argv[1]) if len(sys.argv) > 1 else ROOT_DIR / "data" / "cases_training.csv"
+
+
+def load_legacy(path: Path) -> pd.DataFrame:
+    encoding = detect_encoding(path.read_bytes())
+    return pd.read_csv(path, encoding=encoding).fillna("")
+
+
+def _mb(n_bytes) -> float:
+    return round(n_bytes / (1024 * 1024), 3)
+
+
+legacy = load_legacy(INPUT_PATH)
+compact = load_cases(INPUT_PATH)
+
+legacy_mem = legacy.memory_usage(deep=True, index=False)
+compact_mem = compact.memory_usage(deep=True, index=False)
+
+report = pd.DataFrame({
+    "legacy_dtype": legacy.dtypes.astype(str),
+    "compact_dtype": compact.dtypes.astype(str),
+    "legacy_mb": legacy_mem.map(_mb),
+    "compact_mb": compact_mem.map(_mb),
+})
+report["saving_pct"] = (
+    100 * (1 - compact_mem / legacy_mem.where(legacy_mem > 0))
+).round(1)
+
+pd.set_option("display.width", 160)
+print(f"Rows: {len(legacy)} | Source: {INPUT_PATH}")
+print(report.to_string())
+print(f"\nTotal legacy:  {_mb(legacy_mem.sum())} MB")
+print(f"Total compact: {_mb(compact_mem.sum())} MB")
+print(f"Reduction:     {round(legacy_mem.sum() / compact_mem.sum(), 2)}x")
@@ -1,25 +1,49 @@
-import ollama
 from core.config import OLLAMA_MODEL
+from services import telemetry
+from services.llm_gateway import INTERACTIVE, get_gateway
 from services.retriever import retrieve_context
 
+NOT_FOUND = "Not found in documents"
 
-def pdf_agent(question: str) -> str:
 
-    print("STEP 1: Agent started")
+def stream_chat(prompt: str, priority: int = INTERACTIVE):
+    """
+    Iterator over the reply as it is generated, through the LLM gateway
+    (concurrency limit, priority queue, deadline). Raises LLMBusy when
+    the request is turned away.
+    """
+    return get_gateway().stream(
+        OLLAMA_MODEL,
+        [{"role": "user", "content": prompt}],
+        options={
+            "num_predict": 250,
+            "temperature": 0.2
+        },
+        priority=priority,
+    )
 
-    context = retrieve_context(question)
+
+def _chat(prompt: str, priority: int = INTERACTIVE) -> str:
+    return "".join(stream_chat(prompt, priority)).strip()
+
+
+def build_prompt(question: str):
+    """
+    Retrieves context for the question and wraps it in the answer
+    prompt; None when the documents have nothing relevant.
+    """
+    with telemetry.span("agent.retrieve"):
+        context = retrieve_context(question)
 
     # 🔥 Limit context size
     MAX_CONTEXT = 500
     context = context[:MAX_CONTEXT]
 
-    print("STEP 2: Context retrieved")
-    print("Context length:", len(context))
-
     if not context.strip():
-        return "Not found in documents"
+        return None
 
-    prompt = f"""
+    with telemetry.span("agent.prompt", context_chars=len(context)):
+        prompt = f"""
 Use the context to answer the question.
 
 Context:
@@ -31,19 +55,19 @@ Question:
 Answer:
 """.strip()
 
+    return prompt
+
+
+@telemetry.span("agent")
+def pdf_agent(question: str, priority: int = INTERACTIVE) -> str:
+
+    prompt = build_prompt(question)
+
+    if prompt is None:
+        return NOT_FOUND
+
     try:
-        response = ollama.chat(
-            model=OLLAMA_MODEL,
-            messages=[{"role": "user", "content": prompt}],
-            options={
-                "num_predict": 250,
-                "temperature": 0.2
-            }
-        )
-
-        print("STEP 3: LLM responded")
-
-        return response["message"]["content"].strip()
+        return _chat(prompt, priority)
 
     except Exception as e:
         return f"LLM Error: {str(e)}"
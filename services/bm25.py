@@ -0,0 +1,152 @@
+import re
+from pathlib import Path
+
+import numpy as np
+
+TOKEN_RE = re.compile(r"[a-z0-9_]+")
+
+
+def tokenize(text: str):
+    """
+    Lowercased alphanumeric runs, so module names, error codes and
+    field names ("expclosedate", "err_1023") survive as whole terms.
+    """
+    return TOKEN_RE.findall(str(text).lower())
+
+
+# ---------------------------
+# Inverted index
+# ---------------------------
+class BM25Index:
+    """
+    Okapi BM25 over a fixed document set, stored as flat numpy arrays:
+    postings for term t are doc_ids/tfs[offsets[t]:offsets[t + 1]].
+    `ids` maps document positions to external ids (caseid, chunk pos).
+    """
+
+    def __init__(self, vocab, offsets, doc_ids, tfs, doc_len, ids, k1=1.2, b=0.75):
+        self.vocab = vocab
+        self.offsets = offsets
+        self.doc_ids = doc_ids
+        self.tfs = tfs
+        self.doc_len = doc_len
+        self.ids = ids
+        self.k1 = k1
+        self.b = b
+
+        n_docs = len(doc_len)
+        df = np.diff(offsets)
+        self.idf = np.log(1 + (n_docs - df + 0.5) / (df + 0.5)).astype("float32")
+        avgdl = doc_len.mean() if n_docs else 1.0
+        self._norm = (k1 * (1 - b + b * doc_len / max(avgdl, 1e-9))).astype("float32")
+
+    def __len__(self):
+        return len(self.doc_len)
+
+    @classmethod
+    def build(cls, texts, ids=None):
+        postings = {}
+        doc_len = np.zeros(len(texts), dtype="int32")
+
+        for doc, text in enumerate(texts):
+            terms = tokenize(text)
+            doc_len[doc] = len(terms)
+            counts = {}
+            for term in terms:
+                counts[term] = counts.get(term, 0) + 1
+            for term, tf in counts.items():
+                postings.setdefault(term, []).append((doc, tf))
+
+        vocab = {term: i for i, term in enumerate(sorted(postings))}
+        offsets = np.zeros(len(vocab) + 1, dtype="int64")
+        doc_ids, tfs = [], []
+
+        for term, i in vocab.items():
+            plist = postings[term]
+            offsets[i + 1] = offsets[i] + len(plist)
+            doc_ids.extend(d for d, _ in plist)
+            tfs.extend(tf for _, tf in plist)
+
+        if ids is None:
+            ids = np.arange(len(texts), dtype="int64")
+
+        return cls(
+            vocab,
+            offsets,
+            np.array(doc_ids, dtype="int32"),
+            np.minimum(np.array(tfs, dtype="int64"), np.iinfo("uint16").max).astype("uint16"),
+            doc_len,
+            np.asarray(ids, dtype="int64"),
+        )
+
+    def search(self, query: str, k: int = 10):
+        """
+        Returns (ids, scores) of the top-k documents, best first.
+        """
+        scores = np.zeros(len(self.doc_len), dtype="float32")
+
+        for term in set(tokenize(query)):
+            t = self.vocab.get(term)
+            if t is None:
+                continue
+            lo, hi = self.offsets[t], self.offsets[t + 1]
+            docs = self.doc_ids[lo:hi]
+            tf = self.tfs[lo:hi].astype("float32")
+            scores[docs] += self.idf[t] * tf * (self.k1 + 1) / (tf + self._norm[docs])
+
+        hits = np.flatnonzero(scores)
+        if not len(hits):
+            return np.empty(0, dtype="int64"), np.empty(0, dtype="float32")
+
+        if len(hits) > k:
+            hits = hits[np.argpartition(-scores[hits], k - 1)[:k]]
+        hits = hits[np.argsort(-scores[hits], kind="stable")]
+
+        return self.ids[hits], scores[hits]
+
+    # ---------------------------
+    # Persistence
+    # ---------------------------
+    def save(self, path: Path):
+        path = Path(path)
+        tmp_path = path.with_suffix(".tmp.npz")
+        terms = np.array(sorted(self.vocab, key=self.vocab.get), dtype=object)
+
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                terms=terms.astype(str),
+                offsets=self.offsets,
+                doc_ids=self.doc_ids,
+                tfs=self.tfs,
+                doc_len=self.doc_len,
+                ids=self.ids,
+            )
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path: Path):
+        data = np.load(path)
+        vocab = {term: i for i, term in enumerate(data["terms"].tolist())}
+        return cls(vocab, data["offsets"], data["doc_ids"], data["tfs"], data["doc_len"], data["ids"])
+
+
+def load_bm25(path: Path):
+    path = Path(path)
+    return BM25Index.load(path) if path.exists() else None
+
+
+# ---------------------------
+# Rank fusion
+# ---------------------------
+def reciprocal_rank_fusion(rankings, k: int = 60, limit: int = None):
+    """
+    Merges ranked id lists: score(id) = sum over lists of 1 / (k + rank).
+    """
+    scores = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+
+    fused = sorted(scores, key=scores.get, reverse=True)
+    return fused[:limit] if limit else fused
@@ -0,0 +1,269 @@
+import os
+import pickle
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import faiss
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from core.config import (
+    CASE_SHARD_BY,
+    EMBED_MODEL,
+    REDASH_CSV,
+    case_bm25_path,
+    case_index_paths,
+    case_knn_path,
+    case_shard_dir,
+    case_snapshot_path,
+)
+from services.bm25 import BM25Index
+from services.case_graph import KnnGraph, build_knn_graph, member_aliases, update_knn_graph
+from services.case_shards import MANIFEST, read_manifest
+from services.embed_cache import cached_encode
+from services.embedding import load_encoder
+from services.ingest import load_cases
+from services.indexer import (
+    build_case_texts,
+    build_knn,
+    build_shards,
+    case_ids,
+    case_metadata,
+    collapse_duplicates,
+    find_case_columns,
+    first_row_per_case,
+    new_case_index,
+    prepare_case_frame,
+    save_case_index,
+    save_snapshot,
+    text_hashes,
+)
+
+# ---------------------------
+# Delta settings
+# ---------------------------
+# Cases in these statuses are removed (tombstoned) from the live index.
+# Resolved cases stay: their resolutions are what similar-case search surfaces.
+TOMBSTONE_STATUSES = {
+    s.strip().lower()
+    for s in os.getenv("DELTA_TOMBSTONE_STATUSES", "closed,invalid").split(",")
+    if s.strip()
+}
+
+
+# ---------------------------
+# Helpers
+# ---------------------------
+def collapse_cases(df: pd.DataFrame, cols: dict):
+    """
+    One row per caseid, the same row build_index embeds, with its text
+    and the hash the snapshot compares.
+    """
+    cases, ids = first_row_per_case(df, case_ids(df, cols))
+    cases["combined_text"] = build_case_texts(cases, cols)
+    cases.index = ids
+
+    return cases, text_hashes(cases["combined_text"])
+
+
+def load_snapshot(scale: str):
+    """
+    caseid -> text hash of the last build or delta, None if there is
+    no snapshot to diff against.
+    """
+    path = case_snapshot_path(scale)
+    if not path.exists():
+        return None
+
+    data = np.load(path)
+    return pd.Series(data["hashes"], index=data["ids"])
+
+
+def diff_snapshots(previous: pd.Series, current: pd.Series) -> dict:
+    """
+    Compares caseid -> content hash maps from two pulls.
+    """
+    prev_ids = previous.index
+    cur_ids = current.index
+
+    inserted = cur_ids.difference(prev_ids)
+    deleted = prev_ids.difference(cur_ids)
+
+    common = cur_ids.intersection(prev_ids)
+    changed = common[
+        current.loc[common].to_numpy() != previous.loc[common].to_numpy()
+    ]
+
+    return {
+        "inserted": inserted.to_numpy(dtype="int64"),
+        "changed": changed.to_numpy(dtype="int64"),
+        "deleted": deleted.to_numpy(dtype="int64"),
+    }
+
+
+# ---------------------------
+# Index updates
+# ---------------------------
+def update_single(scale: str, live: pd.DataFrame, cols: dict, model, rebuild: bool) -> dict:
+    """
+    Reconciles the single-file index with the live cases: one vector per
+    duplicate cluster (services/dedup.py), so a changed representative or
+    member moves the cluster's vector instead of dropping it or adding a
+    second one.
+
+    Only embedding scales with the delta. Clustering (MinHash over every
+    distinct live text) and BM25 are recomputed over all live cases on
+    each call, since a single case can merge or split clusters anywhere
+    in its LSH buckets and BM25 statistics are corpus-wide.
+    """
+    index_path, meta_path = case_index_paths(scale)
+
+    if rebuild:
+        # Nothing to diff against: whatever index is on disk is not
+        # known to match, so start over from this pull
+        index, metadata = None, {}
+    else:
+        index = faiss.read_index(str(index_path))
+        with open(meta_path, "rb") as f:
+            metadata = pickle.load(f)
+
+    live_df, live_ids, members = collapse_duplicates(live, cols, live.index.to_numpy(dtype="int64"))
+    target = case_metadata(live_df, live_ids, members)
+
+    # Vectors whose caseid left the index or whose text changed
+    stale = {
+        cid for cid, record in metadata.items()
+        if cid not in target or record.get("combined_text") != target[cid]["combined_text"]
+    }
+    removed_ids = np.array(sorted(stale), dtype="int64")
+    upsert_ids = np.array([cid for cid in target if cid not in metadata or cid in stale], dtype="int64")
+
+    # -----------------------------
+    # Remove stale vectors, embed + add only new ones
+    # -----------------------------
+    if index is not None and len(removed_ids):
+        index.remove_ids(removed_ids)
+
+    if len(upsert_ids):
+        model = model or load_encoder(EMBED_MODEL, workers=1)
+        vectors = cached_encode(
+            model,
+            [target[cid]["combined_text"] for cid in upsert_ids.tolist()],
+            model_name=EMBED_MODEL,
+            show_progress_bar=True
+        )
+
+        if index is None:
+            index = new_case_index(vectors.shape[1])
+        index.add_with_ids(vectors, upsert_ids)
+
+    if index is None:
+        return {"index_size": 0}
+
+    # Unchanged vectors still get fresh records (status, members)
+    metadata = target
+    save_case_index(index, metadata, index_path, meta_path)
+
+    # BM25 statistics are global, so rebuild it (cheap, no model)
+    BM25Index.build(
+        [record.get("combined_text", "") for record in metadata.values()],
+        list(metadata.keys()),
+    ).save(case_bm25_path(scale))
+
+    # Related-cases graph, if one was built: patch the touched rows
+    knn_path = case_knn_path(scale)
+    if knn_path.exists() and rebuild:
+        graph = build_knn_graph(index, KnnGraph.load(knn_path).k, member_aliases(metadata))
+        graph.save(knn_path)
+    elif knn_path.exists():
+        graph = update_knn_graph(
+            KnnGraph.load(knn_path), index,
+            added=upsert_ids, removed=removed_ids, aliases=member_aliases(metadata),
+        )
+        graph.save(knn_path)
+
+    return {"embedded": len(upsert_ids), "removed": len(removed_ids), "index_size": index.ntotal}
+
+
+def update_shards(scale: str, live: pd.DataFrame, cols: dict, model, shard_by: str) -> dict:
+    """
+    Sharded layout: build_shards re-embeds only the shards whose cases
+    changed (unchanged ones stay frozen by digest); texts embedded
+    before come from the embedding cache.
+    """
+    model = model or load_encoder(EMBED_MODEL, workers=1)
+    build_shards(scale, live, cols, live.index.to_numpy(dtype="int64"), model, shard_by)
+
+    # Neighbours can cross shards, so the graph is rebuilt over all of them
+    knn_path = case_knn_path(scale)
+    if knn_path.exists():
+        build_knn(scale, KnnGraph.load(knn_path).k, shard_by)
+
+    shards = read_manifest(case_shard_dir(scale))["shards"]
+    return {"index_size": sum(shard["vectors"] for shard in shards.values())}
+
+
+# ---------------------------
+# Delta pipeline
+# ---------------------------
+def apply_delta(csv_path=REDASH_CSV, scale: str = "live", model=None, shard_by: str = CASE_SHARD_BY) -> dict:
+    """
+    Diffs a fresh pull against the previous snapshot and updates the
+    configured case index layout (single file, or shards when shard_by
+    is set): only new or changed cases are embedded, deleted and
+    tombstoned cases are removed. Any delta still re-clusters and
+    re-scores (BM25) every live case; see update_single.
+    """
+    start_time = time.time()
+    index_path, meta_path = case_index_paths(scale)
+
+    df = prepare_case_frame(load_cases(csv_path))
+    cols = find_case_columns(df)
+
+    cases, hashes = collapse_cases(df, cols)
+    current = pd.Series(hashes, index=cases.index)
+
+    previous = load_snapshot(scale)
+    if shard_by:
+        rebuild = previous is None or not (case_shard_dir(scale) / MANIFEST).exists()
+    else:
+        rebuild = previous is None or not (index_path.exists() and meta_path.exists())
+
+    delta = diff_snapshots(pd.Series(dtype="uint64") if rebuild else previous, current)
+
+    touched = np.concatenate([delta["inserted"], delta["changed"]])
+    status = cases[cols["resolution"]].astype(str).str.strip().str.lower()
+    tombstone = status.isin(TOMBSTONE_STATUSES).to_numpy()
+    tombstoned = np.intersect1d(touched, cases.index[tombstone])
+
+    update = {}
+    if rebuild or len(touched) or len(delta["deleted"]):
+        live = cases[~tombstone]
+        if shard_by:
+            update.update(update_shards(scale, live, cols, model, shard_by))
+        else:
+            update.update(update_single(scale, live, cols, model, rebuild))
+
+    save_snapshot(scale, current.index.to_numpy(dtype="int64"), hashes)
+
+    stats = {
+        "inserted": len(delta["inserted"]),
+        "changed": len(delta["changed"]),
+        "deleted": len(delta["deleted"]),
+        "tombstoned": len(tombstoned),
+        **update,
+        "rebuilt": rebuild,
+        "seconds": round(time.time() - start_time, 2),
+    }
+
+    print(f"[case_delta] {stats}")
+    return stats
+
+
+if __name__ == "__main__":
+    apply_delta(Path(sys.argv[1]) if len(sys.argv) > 1 else REDASH_CSV)
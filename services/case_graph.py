@@ -0,0 +1,223 @@
+import numpy as np
+
+from core.config import CASE_KNN_BATCH
+
+
+# ---------------------------
+# Graph
+# ---------------------------
+class KnnGraph:
+    """
+    Precomputed nearest neighbours of every indexed case.
+
+    ids: sorted int64 caseids (one node per index vector)
+    neighbors: int32 (n, k) node positions, nearest first, -1 padded
+    distances: float16 (n, k) squared L2, as FAISS reports it
+    alias_ids / alias_pos: caseids collapsed into another case's vector
+    (near duplicates) -> the node that represents them
+    """
+
+    def __init__(self, ids, neighbors, distances, alias_ids=None, alias_pos=None):
+        self.ids = np.asarray(ids, dtype="int64")
+        self.neighbors = np.asarray(neighbors, dtype="int32")
+        self.distances = np.asarray(distances, dtype="float16")
+        self.alias_ids = np.asarray(alias_ids if alias_ids is not None else [], dtype="int64")
+        self.alias_pos = np.asarray(alias_pos if alias_pos is not None else [], dtype="int32")
+
+    @property
+    def k(self) -> int:
+        return self.neighbors.shape[1]
+
+    def position(self, caseid: int):
+        for keys, values in ((self.ids, None), (self.alias_ids, self.alias_pos)):
+            pos = int(np.searchsorted(keys, caseid))
+            if pos < len(keys) and keys[pos] == caseid:
+                return pos if values is None else int(values[pos])
+        return None
+
+    def related(self, caseid: int, limit: int = None):
+        """
+        [(caseid, distance)] nearest first; [] for unknown caseids.
+        """
+        pos = self.position(int(caseid))
+        if pos is None:
+            return []
+
+        row = self.neighbors[pos][:limit]
+        valid = row >= 0
+        return list(zip(
+            self.ids[row[valid]].tolist(),
+            self.distances[pos][:limit][valid].astype("float32").tolist(),
+        ))
+
+    def save(self, path):
+        tmp_path = path.with_suffix(".tmp.npz")
+        np.savez(
+            tmp_path,
+            ids=self.ids,
+            neighbors=self.neighbors,
+            distances=self.distances,
+            alias_ids=self.alias_ids,
+            alias_pos=self.alias_pos,
+        )
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data["ids"], data["neighbors"], data["distances"], data["alias_ids"], data["alias_pos"])
+
+
+# ---------------------------
+# Building
+# ---------------------------
+def index_vectors(index):
+    """
+    (caseids, vectors) stored in an IndexIDMap2(IndexFlat) or in every
+    shard of a ShardedCaseIndex.
+    """
+    import faiss
+
+    parts = index.shards.values() if hasattr(index, "shards") else [index]
+    ids, vectors = [], []
+    for part in parts:
+        if part.ntotal:
+            ids.append(faiss.vector_to_array(part.id_map).astype("int64"))
+            vectors.append(part.index.reconstruct_n(0, part.ntotal))
+
+    if not ids:
+        return np.empty(0, dtype="int64"), np.empty((0, index.d), dtype="float32")
+    return np.concatenate(ids), np.vstack(vectors).astype("float32")
+
+
+def _search_neighbors(index, ids: np.ndarray, vectors: np.ndarray, k: int, batch: int = CASE_KNN_BATCH):
+    """
+    k nearest other caseids per vector, by batched index search.
+    Returns caseid (-1 padded) and distance (inf padded) arrays.
+    """
+    n = len(ids)
+    neighbor_ids = np.full((n, k), -1, dtype="int64")
+    distances = np.full((n, k), np.inf, dtype="float32")
+
+    for start in range(0, n, batch):
+        block = slice(start, min(start + batch, n))
+        dist, found = index.search(np.ascontiguousarray(vectors[block]), k + 1)
+
+        # Drop the query case itself, keep the first k of the rest
+        keep = (found >= 0) & (found != ids[block, None])
+        order = np.argsort(~keep, axis=1, kind="stable")[:, :k]
+        found = np.take_along_axis(found, order, axis=1)
+        dist = np.take_along_axis(dist, order, axis=1)
+        valid = np.take_along_axis(keep, order, axis=1)
+
+        width = found.shape[1]
+        neighbor_ids[block, :width] = np.where(valid, found, -1)
+        distances[block, :width] = np.where(valid, dist, np.inf)
+
+    return neighbor_ids, distances
+
+
+def _to_graph(ids: np.ndarray, neighbor_ids: np.ndarray, distances: np.ndarray, aliases: dict) -> KnnGraph:
+    """
+    Caseid-space arrays -> compact graph (positions, float16).
+    """
+    order = np.argsort(ids)
+    ids, neighbor_ids, distances = ids[order], neighbor_ids[order], distances[order]
+
+    known = set(ids.tolist())
+    valid = np.isin(neighbor_ids, ids)
+    neighbors = np.where(valid, np.searchsorted(ids, neighbor_ids), -1).astype("int32")
+
+    alias = {cid: rep for cid, rep in aliases.items() if cid not in known and rep in known}
+    alias_ids = np.array(sorted(alias), dtype="int64")
+    alias_pos = np.searchsorted(ids, np.array([alias[cid] for cid in alias_ids.tolist()], dtype="int64"))
+
+    return KnnGraph(ids, neighbors, np.where(valid, distances, np.inf), alias_ids, alias_pos)
+
+
+def member_aliases(metadata: dict) -> dict:
+    """
+    member caseid -> representative caseid, from the index metadata.
+    """
+    return {
+        member: cid
+        for cid, record in metadata.items()
+        for member in record.get("member_caseids") or []
+        if member != cid
+    }
+
+
+def build_knn_graph(index, k: int, aliases: dict = None, batch: int = CASE_KNN_BATCH) -> KnnGraph:
+    ids, vectors = index_vectors(index)
+    neighbor_ids, distances = _search_neighbors(index, ids, vectors, k, batch)
+    return _to_graph(ids, neighbor_ids, distances, aliases or {})
+
+
+def update_knn_graph(graph: KnnGraph, index, added=(), removed=(), aliases: dict = None) -> KnnGraph:
+    """
+    Incremental update after cases were added to / removed from `index`
+    (which must already reflect the change):
+
+    - removed nodes are dropped, and rows that pointed at them are
+      searched again;
+    - added nodes get a fresh search, and are offered as neighbours to
+      every node they found (the reverse edges), replacing that node's
+      farthest neighbour when closer.
+
+    `aliases` (member -> representative) replaces the graph's own when
+    duplicate clusters changed.
+    """
+    k = graph.k
+    added = np.unique(np.asarray(added, dtype="int64"))
+    removed = np.unique(np.asarray(removed, dtype="int64"))
+
+    # Back to caseid space
+    ids = graph.ids
+    neighbor_ids = np.where(graph.neighbors >= 0, ids[graph.neighbors], -1)
+    distances = graph.distances.astype("float32")
+
+    # Re-added (changed) cases are treated as removed, then added
+    gone = np.union1d(removed, added)
+    stale_rows = np.isin(neighbor_ids, gone).any(axis=1)
+    keep_rows = ~np.isin(ids, gone)
+    ids, neighbor_ids, distances = ids[keep_rows], neighbor_ids[keep_rows], distances[keep_rows]
+    stale_rows = stale_rows[keep_rows]
+
+    # Rows that lost a neighbour: search again
+    if stale_rows.any():
+        stale_ids = ids[stale_rows]
+        stale_vectors = np.vstack([index.reconstruct(int(cid)) for cid in stale_ids.tolist()]).astype("float32")
+        neighbor_ids[stale_rows], distances[stale_rows] = _search_neighbors(index, stale_ids, stale_vectors, k)
+
+    # New nodes: forward search, then reverse edges into existing rows
+    if len(added):
+        added_vectors = np.vstack([index.reconstruct(int(cid)) for cid in added.tolist()]).astype("float32")
+        added_neighbors, added_distances = _search_neighbors(index, added, added_vectors, k)
+
+        row_of = {cid: row for row, cid in enumerate(ids.tolist())}
+        for new_id, found, dist in zip(added.tolist(), added_neighbors, added_distances):
+            for cid, d in zip(found.tolist(), dist.tolist()):
+                row = row_of.get(cid)
+                if row is None or new_id in neighbor_ids[row]:
+                    continue
+                worst = int(np.argmax(distances[row]))
+                if d < distances[row, worst]:
+                    neighbor_ids[row, worst] = new_id
+                    distances[row, worst] = d
+
+        order = np.argsort(distances, axis=1, kind="stable")
+        neighbor_ids = np.take_along_axis(neighbor_ids, order, axis=1)
+        distances = np.take_along_axis(distances, order, axis=1)
+
+        ids = np.concatenate([ids, added])
+        neighbor_ids = np.vstack([neighbor_ids, added_neighbors])
+        distances = np.vstack([distances, added_distances])
+
+    if aliases is None:
+        gone = set(gone.tolist())
+        aliases = {
+            cid: int(graph.ids[pos])
+            for cid, pos in zip(graph.alias_ids.tolist(), graph.alias_pos.tolist())
+            if int(graph.ids[pos]) not in gone
+        }
+    return _to_graph(ids, neighbor_ids, distances, aliases)
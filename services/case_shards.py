@@ -0,0 +1,167 @@
+import hashlib
+import heapq
+import json
+import os
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from core.config import CASE_SHARD_SPAN, CASE_SHARD_THREADS
+
+MANIFEST = "manifest.json"
+
+PERIOD_FORMATS = {
+    "year": lambda d: d.dt.strftime("%Y"),
+    "quarter": lambda d: d.dt.year.astype("Int64").astype(str) + "Q" + d.dt.quarter.astype("Int64").astype(str),
+    "month": lambda d: d.dt.strftime("%Y-%m"),
+}
+
+
+# ---------------------------
+# Partitioning
+# ---------------------------
+def shard_labels(df: pd.DataFrame, ids: np.ndarray, shard_by: str) -> np.ndarray:
+    """
+    Shard name per row: the reportedon period ("2025", "2025Q3",
+    "2025-07"; "undated" when missing) or a caseid range ("ids_0500000").
+    """
+    if shard_by == "caseid":
+        start = (ids // CASE_SHARD_SPAN) * CASE_SHARD_SPAN
+        return np.array([f"ids_{s:07d}" for s in start.tolist()], dtype=object)
+
+    if shard_by not in PERIOD_FORMATS:
+        raise ValueError(f"Unknown shard_by {shard_by!r}: use year, quarter, month or caseid")
+    if "reportedon" not in df.columns:
+        raise ValueError("Sharding by period needs a reportedon column")
+
+    reported = df["reportedon"]
+    dates = pd.to_datetime(reported.where(reported != "", None), errors="coerce")
+    labels = PERIOD_FORMATS[shard_by](dates)
+    return labels.where(dates.notna(), "undated").to_numpy(dtype=object)
+
+
+def shard_digest(ids: np.ndarray, texts) -> str:
+    """
+    Content hash of a shard's input, so unchanged periods are skipped.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(np.asarray(ids, dtype="int64").tobytes())
+    for text in texts:
+        h.update(text.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+# ---------------------------
+# Files
+# ---------------------------
+def read_manifest(shard_dir: Path) -> dict:
+    path = Path(shard_dir) / MANIFEST
+    if not path.exists():
+        return {"shards": {}}
+    return json.loads(path.read_text())
+
+
+def write_manifest(shard_dir: Path, manifest: dict):
+    """
+    Written last: readers reload when the manifest changes, so they
+    never see a half-updated set of shards.
+    """
+    path = Path(shard_dir) / MANIFEST
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    tmp.replace(path)
+
+
+def shard_paths(shard_dir: Path, label: str):
+    return Path(shard_dir) / f"{label}.faiss", Path(shard_dir) / f"{label}.pkl"
+
+
+def load_sharded(shard_dir: Path):
+    """
+    (ShardedCaseIndex, merged caseid -> record metadata) for the shards
+    listed in the manifest.
+    """
+    import faiss
+
+    shards, metadata = {}, {}
+    for label in sorted(read_manifest(shard_dir)["shards"]):
+        index_path, meta_path = shard_paths(shard_dir, label)
+        shards[label] = faiss.read_index(str(index_path))
+        with open(meta_path, "rb") as f:
+            metadata.update(pickle.load(f))
+
+    return ShardedCaseIndex(shards), metadata
+
+
+# ---------------------------
+# Scatter-gather search
+# ---------------------------
+class ShardedCaseIndex:
+    """
+    Read-side view over per-shard IndexIDMap2 indexes with the subset of
+    the FAISS API the retriever uses: search(), reconstruct(), ntotal.
+
+    search() queries every shard on a thread pool (FAISS releases the
+    GIL) and merges the per-shard top-k lists with a heap.
+    """
+
+    def __init__(self, shards: dict, threads: int = CASE_SHARD_THREADS):
+        import faiss
+
+        self.shards = shards
+        self.threads = threads or max(1, min(len(shards), os.cpu_count() or 1))
+        self._pool = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="case-shard")
+
+        self._owner = {}
+        for label, index in shards.items():
+            for cid in faiss.vector_to_array(index.id_map).tolist():
+                self._owner[cid] = label
+
+        self.d = next(iter(shards.values())).d if shards else 0
+
+    @property
+    def ntotal(self) -> int:
+        return sum(index.ntotal for index in self.shards.values())
+
+    def search(self, query_vecs: np.ndarray, k: int):
+        query_vecs = np.ascontiguousarray(query_vecs, dtype="float32")
+        nq = len(query_vecs)
+
+        futures = [
+            self._pool.submit(index.search, query_vecs, k)
+            for index in self.shards.values()
+            if index.ntotal
+        ]
+        results = [future.result() for future in futures]
+
+        distances = np.full((nq, k), np.inf, dtype="float32")
+        labels = np.full((nq, k), -1, dtype="int64")
+
+        for q in range(nq):
+            merged = heapq.nsmallest(
+                k,
+                (
+                    (float(dist), int(cid))
+                    for shard_dist, shard_ids in results
+                    for dist, cid in zip(shard_dist[q], shard_ids[q])
+                    if cid >= 0
+                ),
+            )
+            for rank, (dist, cid) in enumerate(merged):
+                distances[q, rank] = dist
+                labels[q, rank] = cid
+
+        return distances, labels
+
+    def reconstruct(self, caseid: int) -> np.ndarray:
+        label = self._owner.get(int(caseid))
+        if label is None:
+            raise KeyError(f"caseid {caseid} not in any shard")
+        return self.shards[label].reconstruct(int(caseid))
+
+    def close(self):
+        self._pool.shutdown(wait=False)
@@ -0,0 +1,205 @@
+import argparse
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from core.config import CASE_DATA_FILES, DATA_DIR, case_store_path
+from services.ingest import load_cases
+
+# Lookup columns added next to the source columns
+OWNER_KEY = "owner_key"  # str(currentowner).lower(), as the pandas backend groups
+AGING_NUM = "aging_num"  # aging days, missing -> 0
+
+INDEXES = {
+    "idx_cases_caseid": "caseid",
+    # Owner rows come out aging-sorted, and summaries never touch the table
+    "idx_cases_owner": f"{OWNER_KEY}, {AGING_NUM} DESC, closedate, statuscode",
+    "idx_cases_status": "statuscode",
+    "idx_cases_reportedon": "reportedon",
+    "idx_cases_closedate": "closedate",  # reported / closed trends scan the index, not the table
+}
+
+
+def quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def source_version(source: Path) -> str:
+    stat = Path(source).stat()
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+# ---------------------------
+# Build
+# ---------------------------
+def _sql_columns(df: pd.DataFrame):
+    """
+    (name, SQLite type, values) per column; dates become ISO day strings,
+    flags 0/1, missing values None.
+    """
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            kind, series = "TEXT", series.dt.strftime("%Y-%m-%d")
+        elif pd.api.types.is_bool_dtype(series):
+            kind, series = "INTEGER", series.astype("Int8")
+        elif pd.api.types.is_integer_dtype(series):
+            kind = "INTEGER"
+        elif pd.api.types.is_float_dtype(series):
+            kind, series = "REAL", series.astype("float64")
+        else:
+            kind = "TEXT"
+        yield col, kind, series.to_numpy(dtype=object, na_value=None)
+
+
+def build_store(source, path: Path = None) -> Path:
+    """
+    Loads a cases file (CSV or Parquet, through the typed ingestion)
+    into an indexed SQLite table. Written to a temp file and swapped in,
+    so readers in other processes see the old store or the new one.
+    """
+    source = Path(source)
+    path = Path(path or case_store_path(source))
+    start = time.time()
+
+    df = load_cases(source)
+    df[OWNER_KEY] = df["currentowner"].astype(str).str.lower()
+    df[AGING_NUM] = pd.to_numeric(df["aging"], errors="coerce").fillna(0).astype("int32")
+
+    columns = list(_sql_columns(df))
+    names = ", ".join(quote(name) for name, _, _ in columns)
+    placeholders = ", ".join("?" for _ in columns)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.unlink(missing_ok=True)
+
+    conn = sqlite3.connect(tmp_path)
+    try:
+        # Scratch file until the swap: no journal needed
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+
+        conn.execute(f"CREATE TABLE cases ({', '.join(f'{quote(n)} {k}' for n, k, _ in columns)})")
+        conn.executemany(
+            f"INSERT INTO cases ({names}) VALUES ({placeholders})",
+            zip(*(values for _, _, values in columns)),
+        )
+
+        # After the load: one sorted build per index instead of per-row updates
+        for name, cols in INDEXES.items():
+            conn.execute(f"CREATE INDEX {name} ON cases ({cols})")
+
+        conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+        conn.executemany("INSERT INTO meta VALUES (?, ?)", [
+            ("source", str(source)),
+            ("source_version", source_version(source)),
+            ("rows", str(len(df))),
+        ])
+        conn.execute("ANALYZE")
+        conn.commit()
+    finally:
+        conn.close()
+
+    tmp_path.replace(path)
+    print(f"[case_store] {len(df)} rows -> {path} in {round(time.time() - start, 2)}s")
+    return path
+
+
+# ---------------------------
+# Read side
+# ---------------------------
+class CaseStore:
+    """
+    Read-only view of a built store. Each thread keeps its own
+    connection and reopens it when the file is swapped by a rebuild.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.source_version = None  # of the cases file it was last checked against
+        self._local = threading.local()
+
+    def version(self) -> str:
+        return source_version(self.path)
+
+    def _connection(self) -> sqlite3.Connection:
+        version = self.version()
+        local = self._local
+        if getattr(local, "version", None) != version:
+            if getattr(local, "conn", None) is not None:
+                local.conn.close()
+            # immutable: the file is only ever replaced, never written
+            local.conn = sqlite3.connect(f"{self.path.as_uri()}?mode=ro&immutable=1", uri=True)
+            local.conn.row_factory = sqlite3.Row
+            local.columns = ", ".join(
+                quote(row["name"])
+                for row in local.conn.execute("PRAGMA table_info(cases)")
+                if row["name"] != OWNER_KEY
+            )
+            local.version = version
+        return local.conn
+
+    def query(self, sql: str, params=()) -> list:
+        """
+        Rows as dicts.
+        """
+        return [dict(row) for row in self._connection().execute(sql, params)]
+
+    def scalar(self, sql: str, params=()):
+        row = self._connection().execute(sql, params).fetchone()
+        return row[0] if row is not None else None
+
+    def meta(self) -> dict:
+        return {row["key"]: row["value"] for row in self.query("SELECT key, value FROM meta")}
+
+    def record_columns(self) -> str:
+        """
+        SELECT list of the source columns plus aging_num (what a row of
+        the pandas owner frames holds).
+        """
+        self._connection()
+        return self._local.columns
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(source) -> CaseStore:
+    """
+    The store for a cases file, (re)built first when it is missing or
+    was built from an older version of the file.
+    """
+    source = Path(source)
+    path = case_store_path(source)
+
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = CaseStore(path)
+
+        current = source_version(source)
+        if store.source_version != current:
+            if not path.exists() or store.meta().get("source_version") != current:
+                build_store(source, path)
+            store.source_version = current
+
+    return store
+
+
+# Entry Point
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the SQLite insights store for a cases file")
+    parser.add_argument("scale", nargs="?", default="2k", choices=sorted(CASE_DATA_FILES))
+    args = parser.parse_args()
+
+    build_store(DATA_DIR / CASE_DATA_FILES[args.scale])
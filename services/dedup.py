@@ -0,0 +1,159 @@
+import hashlib
+import re
+
+import numpy as np
+import pandas as pd
+
+from core.config import DEDUP_BANDS, DEDUP_NUM_PERM, DEDUP_THRESHOLD
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+# ---------------------------
+# Text normalization
+# ---------------------------
+def dedup_texts(df: pd.DataFrame, cols: dict) -> pd.Series:
+    """
+    What the case index embeds, minus the caseid: two cases with equal
+    dedup text get the same vector.
+    """
+    text = (
+        df[cols["category"]].astype(str) + " | "
+        + df[cols["summary"]].astype(str) + " | "
+        + df[cols["resolution"]].astype(str)
+    )
+    return text.str.lower().str.replace(r"\s+", " ", regex=True).str.strip()
+
+
+def shingles(text: str, n: int = 3) -> np.ndarray:
+    """
+    64-bit hashes of word n-grams (the whole text when shorter).
+    """
+    words = WORD_RE.findall(text)
+    if len(words) < n:
+        grams = [" ".join(words)]
+    else:
+        grams = [" ".join(words[i:i + n]) for i in range(len(words) - n + 1)]
+    return np.fromiter(
+        {int.from_bytes(hashlib.blake2b(g.encode("utf-8"), digest_size=8).digest(), "little") for g in grams},
+        dtype="uint64",
+    )
+
+
+# ---------------------------
+# MinHash / LSH
+# ---------------------------
+class MinHasher:
+    """
+    num_perm multiply-add-shift hashes ((a*x + b) mod 2**64) >> 32; the
+    signature agreement between two texts estimates the Jaccard
+    similarity of their shingle sets.
+    """
+
+    def __init__(self, num_perm: int = DEDUP_NUM_PERM, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.a = rng.integers(0, np.iinfo("uint64").max, num_perm, dtype="uint64", endpoint=True) | np.uint64(1)
+        self.b = rng.integers(0, np.iinfo("uint64").max, num_perm, dtype="uint64", endpoint=True)
+
+    def signature(self, text: str) -> np.ndarray:
+        x = shingles(text)
+        hashed = (self.a[:, None] * x[None, :] + self.b[:, None]) >> np.uint64(32)  # wraps mod 2**64
+        return hashed.min(axis=1)
+
+    def signatures(self, texts) -> np.ndarray:
+        out = np.empty((len(texts), self.num_perm), dtype="uint64")
+        for i, text in enumerate(texts):
+            out[i] = self.signature(text)
+        return out
+
+
+class _UnionFind:
+    def __init__(self, n: int):
+        self.parent = np.arange(n)
+
+    def find(self, i: int) -> int:
+        root = i
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[i] != root:
+            self.parent[i], i = root, self.parent[i]
+        return root
+
+    def union(self, i: int, j: int):
+        ri, rj = self.find(i), self.find(j)
+        if ri != rj:
+            self.parent[max(ri, rj)] = min(ri, rj)
+
+
+def near_duplicate_labels(signatures: np.ndarray, threshold: float = DEDUP_THRESHOLD, bands: int = DEDUP_BANDS, groups=None) -> np.ndarray:
+    """
+    Cluster label per row. Rows sharing an LSH band bucket (and group,
+    when given) are checked against the bucket's first row and merged
+    when their estimated Jaccard similarity reaches the threshold.
+    """
+    n, num_perm = signatures.shape
+    rows = num_perm // bands
+    uf = _UnionFind(n)
+    groups = np.zeros(n, dtype="int64") if groups is None else np.asarray(groups, dtype="int64")
+
+    for band in range(bands):
+        block = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+        keys = [(int(g), hashlib.blake2b(row.tobytes(), digest_size=8).digest()) for g, row in zip(groups, block)]
+
+        buckets = {}
+        for i, key in enumerate(keys):
+            buckets.setdefault(key, []).append(i)
+
+        for members in buckets.values():
+            if len(members) < 2:
+                continue
+            leader = members[0]
+            others = np.array(members[1:])
+            similarity = (signatures[others] == signatures[leader]).mean(axis=1)
+            for j in others[similarity >= threshold]:
+                uf.union(leader, int(j))
+
+    return np.array([uf.find(i) for i in range(n)])
+
+
+# ---------------------------
+# Case clustering
+# ---------------------------
+def cluster_cases(df: pd.DataFrame, cols: dict, ids: np.ndarray, threshold: float = DEDUP_THRESHOLD):
+    """
+    Groups exact and near-duplicate cases; near duplicates must share
+    category and status. Returns (keep mask, members) where keep marks
+    one representative row per cluster (the newest caseid) and members
+    maps representative caseid -> all member caseids.
+    """
+    texts = dedup_texts(df, cols)
+
+    # Exact duplicates first: MinHash only runs on distinct texts
+    codes, unique_texts = pd.factorize(texts)
+
+    if threshold < 1.0 and len(unique_texts) > 1:
+        first = pd.Series(np.arange(len(df))).groupby(codes).first().to_numpy()
+        groups, _ = pd.factorize(
+            df[cols["category"]].astype(str).iloc[first] + "|" + df[cols["resolution"]].astype(str).iloc[first]
+        )
+        signatures = MinHasher().signatures(unique_texts.tolist())
+        cluster = near_duplicate_labels(signatures, threshold, groups=groups)[codes]
+    else:
+        cluster = codes
+
+    order = pd.DataFrame({"cluster": cluster, "id": ids})
+    rep_pos = order.groupby("cluster")["id"].idxmax().to_numpy()
+
+    keep = np.zeros(len(df), dtype=bool)
+    keep[rep_pos] = True
+
+    rep_of_cluster = pd.Series(ids[rep_pos], index=order["cluster"].to_numpy()[rep_pos])
+    members = (
+        order.assign(rep=rep_of_cluster.reindex(order["cluster"]).to_numpy())
+        .groupby("rep")["id"]
+        .agg(lambda s: sorted(s.tolist()))
+        .to_dict()
+    )
+
+    return keep, members
@@ -0,0 +1,224 @@
+import hashlib
+import json
+import re
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+from core.config import EMBED_CACHE, EMBED_CACHE_DIR, EMBED_MODEL
+
+KEY_BYTES = 16  # blake2b digest size per text
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+@contextmanager
+def file_lock(path: Path):
+    """
+    Exclusive lock on `path` shared by every process on the machine
+    (flock, or msvcrt's byte-range lock on Windows); blocks until held.
+    """
+    with open(path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+# ---------------------------
+# Content-addressed store
+# ---------------------------
+class EmbeddingCache:
+    """
+    Append-only store of raw (un-normalized) embeddings for one model.
+
+    vectors.f32 holds the rows back to back and is read through a
+    memory map; keys.npy holds the 16-byte text hash of each row, in row
+    order.
+    """
+
+    def __init__(self, model_name: str, root: Path = EMBED_CACHE_DIR):
+        safe_name = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+        self.dir = Path(root) / safe_name
+        self.vectors_path = self.dir / "vectors.f32"
+        self.keys_path = self.dir / "keys.npy"
+        self.meta_path = self.dir / "meta.json"
+        self.lock_path = self.dir / ".lock"
+
+        self.dim = None
+        self._rows = {}
+        self._keys = np.empty((0, KEY_BYTES), dtype="uint8")
+        self._vectors = None
+
+        self._load()
+
+    @staticmethod
+    def text_key(text: str) -> bytes:
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=KEY_BYTES).digest()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def _load(self):
+        if not self.meta_path.exists() or not self.keys_path.exists():
+            return
+
+        self.dim = json.loads(self.meta_path.read_text())["dim"]
+        self._keys = np.load(self.keys_path)
+        raw = self._keys.tobytes()
+        self._rows = {
+            raw[row * KEY_BYTES:(row + 1) * KEY_BYTES]: row
+            for row in range(len(self._keys))
+        }
+        self._map_vectors()
+
+    def _map_vectors(self):
+        if len(self._keys):
+            self._vectors = np.memmap(
+                self.vectors_path,
+                dtype="float32",
+                mode="r",
+                shape=(len(self._keys), self.dim),
+            )
+
+    def lookup(self, keys):
+        """
+        Returns (row positions, hit mask) for a list of text keys.
+        """
+        rows = np.fromiter(
+            (self._rows.get(key, -1) for key in keys),
+            dtype="int64",
+            count=len(keys),
+        )
+        return rows, rows >= 0
+
+    def vectors(self, rows: np.ndarray) -> np.ndarray:
+        return np.asarray(self._vectors[rows], dtype="float32")
+
+    def append(self, keys, vectors: np.ndarray):
+        """
+        Vectors are written before keys, so a crash mid-append leaves
+        extra unreferenced rows at worst, never keys without vectors.
+
+        Runs under an exclusive file lock and starts from the keys on
+        disk, so concurrent builders (other processes) append after each
+        other's rows instead of overwriting them.
+        """
+        if not len(keys):
+            return
+
+        vectors = np.ascontiguousarray(vectors, dtype="float32")
+        self.dir.mkdir(parents=True, exist_ok=True)
+
+        with file_lock(self.lock_path):
+            self._load()
+
+            # Another process may have cached some of these meanwhile
+            fresh = [i for i, key in enumerate(keys) if key not in self._rows]
+            if not fresh:
+                return
+            keys = [keys[i] for i in fresh]
+            vectors = vectors[fresh]
+
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+
+            # Drop any tail rows left behind by an interrupted append
+            with open(self.vectors_path, "ab") as f:
+                f.truncate(len(self._keys) * self.dim * 4)
+                f.write(vectors.tobytes())
+
+            start = len(self._keys)
+            new_keys = np.frombuffer(b"".join(keys), dtype="uint8").reshape(-1, KEY_BYTES)
+            self._keys = np.concatenate([self._keys, new_keys])
+            for offset, key in enumerate(keys):
+                self._rows[key] = start + offset
+
+            self._replace(self.meta_path, lambda path: path.write_text(json.dumps({"dim": self.dim})))
+            self._replace(self.keys_path, lambda path: np.save(path, self._keys))
+
+            self._map_vectors()
+
+    @staticmethod
+    def _replace(path: Path, write):
+        """
+        Writes through a temp file and swaps it in, so readers never see
+        a partial file.
+        """
+        tmp_path = path.with_name(f".{path.stem}.tmp{path.suffix}")
+        write(tmp_path)
+        tmp_path.replace(path)
+
+
+_caches = {}
+
+
+def get_cache(model_name: str = EMBED_MODEL) -> EmbeddingCache:
+    if model_name not in _caches:
+        _caches[model_name] = EmbeddingCache(model_name)
+    return _caches[model_name]
+
+
+# ---------------------------
+# Cached encode
+# ---------------------------
+def cached_encode(model, texts, model_name: str = EMBED_MODEL, normalize: bool = False, **encode_kwargs):
+    """
+    model.encode() that only encodes texts whose hash is not cached yet.
+    Vectors are cached raw and normalized on the way out when asked,
+    so builders with and without normalize_embeddings share entries.
+    """
+    texts = list(texts)
+
+    if not EMBED_CACHE:
+        return model.encode(
+            texts,
+            normalize_embeddings=normalize,
+            convert_to_numpy=True,
+            **encode_kwargs
+        ).astype("float32")
+
+    cache = get_cache(model_name)
+    keys = [EmbeddingCache.text_key(t) for t in texts]
+    rows, hits = cache.lookup(keys)
+
+    # Encode each distinct missing text once
+    missing = {}
+    for i in np.flatnonzero(~hits):
+        missing.setdefault(keys[i], texts[i])
+
+    if missing:
+        fresh = model.encode(
+            list(missing.values()),
+            convert_to_numpy=True,
+            **encode_kwargs
+        ).astype("float32")
+        cache.append(list(missing.keys()), fresh)
+        rows, hits = cache.lookup(keys)
+
+    print(f"[embed_cache] {len(texts) - len(missing)} reused, {len(missing)} encoded")
+
+    if not texts:
+        return np.empty((0, cache.dim or 0), dtype="float32")
+
+    vectors = cache.vectors(rows)
+
+    if normalize:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.maximum(norms, 1e-12)
+
+    return vectors.astype("float32")
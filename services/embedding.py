@@ -0,0 +1,206 @@
+import multiprocessing as mp
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from core.config import (
+    EMBED_MAX_BATCH,
+    EMBED_MODEL,
+    EMBED_THREADS,
+    EMBED_TOKEN_BUDGET,
+    EMBED_WORKERS,
+)
+
+# ---------------------------
+# Length-bucketed batching
+# ---------------------------
+def token_lengths(model, texts) -> np.ndarray:
+    """
+    Token count per text (capped at the model's max_seq_length), from
+    the model's own tokenizer when it has one.
+    """
+    tokenizer = getattr(model, "tokenizer", None)
+    max_len = getattr(model, "max_seq_length", None) or 512
+
+    if tokenizer is None:
+        return np.array([min(len(t.split()) * 4 // 3 + 2, max_len) for t in texts])
+
+    encoded = tokenizer(list(texts), add_special_tokens=True, truncation=True, max_length=max_len)
+    return np.array([len(ids) for ids in encoded["input_ids"]])
+
+
+def make_buckets(lengths: np.ndarray, token_budget: int = EMBED_TOKEN_BUDGET, max_batch: int = EMBED_MAX_BATCH):
+    """
+    Groups text positions (longest first) into batches whose padded
+    size, batch_len x longest_in_batch, stays within the token budget.
+    """
+    order = np.argsort(-lengths, kind="stable")
+    buckets = []
+
+    start = 0
+    while start < len(order):
+        longest = max(int(lengths[order[start]]), 1)
+        size = max(1, min(max_batch, token_budget // longest))
+        buckets.append(order[start:start + size])
+        start += size
+
+    return buckets
+
+
+def encode_bucketed(model, texts, token_budget: int = EMBED_TOKEN_BUDGET, max_batch: int = EMBED_MAX_BATCH, **encode_kwargs):
+    """
+    Encodes length-sorted buckets sized from a token budget instead of
+    a fixed batch size, then restores the input order.
+    """
+    texts = list(texts)
+    encode_kwargs.pop("batch_size", None)
+    encode_kwargs.pop("show_progress_bar", None)
+    encode_kwargs.pop("convert_to_numpy", None)
+
+    if not texts:
+        return np.empty((0, 0), dtype="float32")
+
+    out = None
+    for bucket in make_buckets(token_lengths(model, texts), token_budget, max_batch):
+        vectors = model.encode(
+            [texts[i] for i in bucket],
+            batch_size=len(bucket),
+            convert_to_numpy=True,
+            show_progress_bar=False,
+            **encode_kwargs
+        ).astype("float32")
+
+        if out is None:
+            out = np.empty((len(texts), vectors.shape[1]), dtype="float32")
+        out[bucket] = vectors
+
+    return out
+
+
+class BucketedEncoder:
+    """
+    encode()-compatible wrapper that applies length-bucketed batching
+    to a single in-process SentenceTransformer.
+    """
+
+    def __init__(self, model, token_budget: int = EMBED_TOKEN_BUDGET):
+        self.model = model
+        self.token_budget = token_budget
+
+    def encode(self, texts, **encode_kwargs):
+        return encode_bucketed(self.model, texts, self.token_budget, **encode_kwargs)
+
+
+# ---------------------------
+# Worker process state
+# ---------------------------
+_worker_model = None
+
+
+def _init_worker(model_name: str, threads: int):
+    """
+    Pins BLAS/torch threads before the model loads, so N workers x T
+    threads does not oversubscribe the cores.
+    """
+    global _worker_model
+
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(threads)
+
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    torch.set_num_threads(threads)
+    _worker_model = SentenceTransformer(model_name, device="cpu")
+
+
+def _encode_shard(shard_id: int, texts, encode_kwargs: dict):
+    start = time.perf_counter()
+    vectors = encode_bucketed(_worker_model, texts, **encode_kwargs)
+    return shard_id, vectors, time.perf_counter() - start
+
+
+# ---------------------------
+# Multi-process encoder
+# ---------------------------
+class ParallelEncoder:
+    """
+    Drop-in for SentenceTransformer.encode() that shards texts across a
+    pool of worker processes, each holding its own copy of the model.
+
+    Texts are length-sorted and dealt round-robin, so every shard gets a
+    similar token load; each worker then batches by token budget.
+    """
+
+    def __init__(self, model_name: str = EMBED_MODEL, workers: int = EMBED_WORKERS, threads: int = EMBED_THREADS):
+        self.model_name = model_name
+        self.workers = max(1, workers)
+        self.threads = threads or max(1, (os.cpu_count() or 1) // self.workers)
+        self._pool = None
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=mp.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.model_name, self.threads),
+            )
+        return self._pool
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def encode(self, texts, convert_to_numpy=True, show_progress_bar=False, **encode_kwargs):
+        texts = list(texts)
+        if not texts:
+            return np.empty((0, 0), dtype="float32")
+
+        order = np.argsort([len(t) for t in texts], kind="stable")
+        shards = [order[i::self.workers] for i in range(self.workers)]
+        shards = [s for s in shards if len(s)]
+
+        pool = self._get_pool()
+        futures = [
+            pool.submit(_encode_shard, shard_id, [texts[i] for i in shard], encode_kwargs)
+            for shard_id, shard in enumerate(shards)
+        ]
+
+        out = None
+        for future in futures:
+            shard_id, vectors, seconds = future.result()
+            shard = shards[shard_id]
+
+            if out is None:
+                out = np.empty((len(texts), vectors.shape[1]), dtype="float32")
+            out[shard] = vectors
+
+            print(
+                f"[embedding] shard {shard_id}: {len(shard)} texts in "
+                f"{seconds:.2f}s ({len(shard) / max(seconds, 1e-9):.1f} texts/s, "
+                f"{self.threads} threads)"
+            )
+
+        return out
+
+
+def load_encoder(model_name: str = EMBED_MODEL, workers: int = EMBED_WORKERS):
+    """
+    In-process bucketed encoder, or a ParallelEncoder when more than
+    one worker is configured.
+    """
+    if workers > 1:
+        return ParallelEncoder(model_name, workers)
+
+    from sentence_transformers import SentenceTransformer
+    return BucketedEncoder(SentenceTransformer(model_name))
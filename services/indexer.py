@@ -1,132 +1,371 @@
-﻿import time
+﻿import argparse
+import time
 import sys
 import pickle
 from pathlib import Path
 import pandas as pd
 import numpy as np
-from sentence_transformers import SentenceTransformer
 import faiss
 
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from core.config import (
+    DATA_DIR,
+    CASE_DATA_FILES,
+    EMBED_MODEL,
+    EMBED_WORKERS,
+    CASE_DEDUP,
+    CASE_SHARD_BY,
+    CASE_KNN,
+    case_bm25_path,
+    case_index_paths,
+    case_knn_path,
+    case_shard_dir,
+    case_snapshot_path,
+)
+from services.bm25 import BM25Index
+from services.case_graph import build_knn_graph, member_aliases
+from services.case_shards import load_sharded, read_manifest, shard_digest, shard_labels, shard_paths, write_manifest
+from services.dedup import cluster_cases
+from services.embed_cache import cached_encode
+from services.embedding import ParallelEncoder, load_encoder
+from services.ingest import load_cases
+
 # =============================
-# Paths
+# Column detection
 # =============================
-BASE_DIR = Path(__file__).resolve().parents[1]
+def find_case_columns(df: pd.DataFrame) -> dict:
+    """
+    Flexible column detection, so Redash exports and training CSVs
+    with different headers index the same way.
+    """
+    def find_col(keywords):
+        for col in df.columns:
+            for kw in keywords:
+                if kw.lower() in col.lower():
+                    return col
+        return None
+
+    return {
+        "case": find_col(["case", "id"]) or df.columns[0],
+        "category": find_col(["category", "type"]) or df.columns[1],
+        "summary": find_col(["summary", "issue", "description", "details", "subject"]) or df.columns[2],
+        "resolution": find_col(["resolution", "status", "fix", "solution"]) or df.columns[3],
+    }
+
+
+def prepare_case_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Plain-object copy of the typed frame with "" for missing values,
+    as stored in the case metadata.
+    """
+    return df.astype(object).where(df.notna(), "")
+
+
+def build_case_texts(df: pd.DataFrame, cols: dict) -> pd.Series:
+    return (
+        "Case ID: " + df[cols["case"]].astype(str) + " | "
+        "Category: " + df[cols["category"]].astype(str) + " | "
+        "Issue: " + df[cols["summary"]].astype(str) + " | "
+        "Resolution: " + df[cols["resolution"]].astype(str)
+    )
+
+
+def case_ids(df: pd.DataFrame, cols: dict) -> np.ndarray:
+    """
+    FAISS ids for the case index: the numeric caseid, or the row
+    position when the id column is not numeric.
+    """
+    ids = pd.to_numeric(df[cols["case"]], errors="coerce")
+    if ids.isna().any():
+        return np.arange(len(df), dtype="int64")
+    return ids.to_numpy(dtype="int64")
+
+
+def first_row_per_case(df: pd.DataFrame, ids: np.ndarray):
+    """
+    One row per caseid (the Redash export has a row per kit item, all
+    sharing the case's id); the first row is kept.
+    """
+    keep = ~pd.Index(ids).duplicated(keep="first")
+    return df[keep].copy(), ids[keep]
+
+
+def text_hashes(texts) -> np.ndarray:
+    """
+    Per-case content hash for the delta sync: only the embedded text
+    (which carries the status), so daily-moving fields such as ageing
+    do not make every open case look changed.
+    """
+    return pd.util.hash_pandas_object(pd.Series(list(texts), dtype=object), index=False).to_numpy(dtype="uint64")
 
-# Scale can be: "2k" or "25k"
-SCALE = sys.argv[1] if len(sys.argv) > 1 else "2k"
 
-DATA_MAP = {
-    "2k": "cases_training.csv",
-    "25k": "cases_training_25k.csv"
-}
+def save_snapshot(scale: str, ids: np.ndarray, hashes: np.ndarray):
+    """
+    caseid -> text hash of what the index holds, for services/case_delta.py.
+    """
+    path = case_snapshot_path(scale)
+    tmp_path = path.with_suffix(".tmp.npz")
+    np.savez(tmp_path, ids=np.asarray(ids, dtype="int64"), hashes=hashes)
+    tmp_path.replace(path)
+
+
+def new_case_index(dim: int):
+    return faiss.IndexIDMap2(faiss.IndexFlatL2(dim))
+
+
+def save_case_index(index, metadata: dict, index_path: Path, meta_path: Path):
+    """
+    Writes the index and its caseid -> record metadata via temp files,
+    so a concurrent reader never loads a half-written pair.
+    """
+    tmp_index = index_path.with_suffix(".faiss.tmp")
+    tmp_meta = meta_path.with_suffix(".pkl.tmp")
+
+    faiss.write_index(index, str(tmp_index))
+    with open(tmp_meta, "wb") as f:
+        pickle.dump(metadata, f)
+
+    tmp_index.replace(index_path)
+    tmp_meta.replace(meta_path)
 
-DATA_PATH = BASE_DIR / "data" / DATA_MAP[SCALE]
-INDEX_PATH = BASE_DIR / "data" / f"case_index_{SCALE}.faiss"
-META_PATH = BASE_DIR / "data" / f"case_meta_{SCALE}.pkl"
 
 # =============================
-# Robust CSV Loader
+# Build steps
 # =============================
-def load_csv_with_fallback(path: Path) -> pd.DataFrame:
-    encodings = ["utf-8", "utf-8-sig", "cp1252", "latin1"]
+def collapse_duplicates(df: pd.DataFrame, cols: dict, ids: np.ndarray):
+    """
+    One row per duplicate cluster (see services/dedup.py); returns the
+    kept rows, their ids and representative -> member caseids.
+    """
+    if not CASE_DEDUP or not len(df):
+        return df, ids, {}
+
+    dedup_start = time.time()
+    keep, members = cluster_cases(df, cols, ids)
+    print(f"Dedup: {len(keep)} cases -> {keep.sum()} clusters "
+          f"({1 - keep.sum() / max(len(keep), 1):.0%} smaller) in {time.time() - dedup_start:.2f}s")
+    return df[keep], ids[keep], members
+
+
+def encode_cases(model, texts):
+    encode_start = time.time()
+    embeddings = cached_encode(
+        model,
+        texts,
+        model_name=EMBED_MODEL,
+        show_progress_bar=True
+    )
+
+    encode_secs = time.time() - encode_start
+    print(f"Encoded {len(texts)} cases in {encode_secs:.2f}s ({len(texts) / max(encode_secs, 1e-9):.1f} texts/s)")
+    return embeddings
+
 
-    for enc in encodings:
-        try:
-            df = pd.read_csv(path, encoding=enc)
-            print(f"Loaded CSV with encoding: {enc}")
-            return df
-        except UnicodeDecodeError:
-            print(f"Failed with encoding: {enc}")
+def case_metadata(df: pd.DataFrame, ids: np.ndarray, members: dict) -> dict:
+    metadata = dict(zip(ids.tolist(), df.to_dict(orient="records")))
+    for cid, member_ids in members.items():
+        if len(member_ids) > 1 and cid in metadata:
+            metadata[cid]["member_caseids"] = member_ids
+    return metadata
 
-    raise RuntimeError("Failed to load CSV with known encodings")
 
 # =============================
 # Index Builder
 # =============================
-def build_index():
+def build_index(scale: str = "2k", workers: int = EMBED_WORKERS, shard_by: str = CASE_SHARD_BY, rebuild=(), knn: int = CASE_KNN):
     print("=== Build Index Started ===")
     start_time = time.time()
 
-    if not DATA_PATH.exists():
-        raise FileNotFoundError(f"CSV not found at {DATA_PATH}")
+    data_path = DATA_DIR / CASE_DATA_FILES[scale]
+    index_path, meta_path = case_index_paths(scale)
+
+    if not data_path.exists():
+        raise FileNotFoundError(f"CSV not found at {data_path}")
 
     print("Loading CSV...")
-    df = load_csv_with_fallback(DATA_PATH)
+    df = load_cases(data_path)
 
     print("Detected columns:", df.columns.tolist())
-    df = df.fillna("")
+    df = prepare_case_frame(df)
+
+    cols = find_case_columns(df)
+
+    print("Using columns:")
+    print("Case ID:", cols["case"])
+    print("Category:", cols["category"])
+    print("Summary:", cols["summary"])
+    print("Resolution:", cols["resolution"])
 
     # -----------------------------
-    # Flexible column detection
+    # Combine text for embeddings
     # -----------------------------
-    def find_col(keywords):
-        for col in df.columns:
-            for kw in keywords:
-                if kw.lower() in col.lower():
-                    return col
-        return None
+    df, ids = first_row_per_case(df, case_ids(df, cols))
+    df["combined_text"] = build_case_texts(df, cols)
 
-    case_col = find_col(["case", "id"]) or df.columns[0]
-    cat_col  = find_col(["category", "type"]) or df.columns[1]
-    sum_col  = find_col(["summary", "issue", "description", "details", "subject"]) or df.columns[2]
-    res_col  = find_col(["resolution", "status", "fix", "solution"]) or df.columns[3]
+    print(f"Loading embedding model ({workers} worker(s))...")
+    model = load_encoder(EMBED_MODEL, workers)
 
-    print("Using columns:")
-    print("Case ID:", case_col)
-    print("Category:", cat_col)
-    print("Summary:", sum_col)
-    print("Resolution:", res_col)
+    try:
+        if shard_by:
+            build_shards(scale, df, cols, ids, model, shard_by, rebuild)
+        else:
+            build_single(scale, df, cols, ids, model)
+    finally:
+        if isinstance(model, ParallelEncoder):
+            model.close()
+
+    # Baseline for the next delta sync, so it only embeds what changes
+    save_snapshot(scale, ids, text_hashes(df["combined_text"]))
+
+    if knn:
+        build_knn(scale, knn, shard_by)
 
     # -----------------------------
-    # Combine text for embeddings
+    # Timing End
     # -----------------------------
-    df["combined_text"] = (
-        "Case ID: " + df[case_col].astype(str) + " | "
-        "Category: " + df[cat_col].astype(str) + " | "
-        "Issue: " + df[sum_col].astype(str) + " | "
-        "Resolution: " + df[res_col].astype(str)
-    )
+    end_time = time.time()
+
+    print("\n✅ Index built successfully")
+    print(f"\n⏱️ Index build time ({len(df)} records): {round(end_time - start_time, 2)} seconds")
+
+
+def build_single(scale: str, df: pd.DataFrame, cols: dict, ids: np.ndarray, model):
+    index_path, meta_path = case_index_paths(scale)
 
+    # -----------------------------
+    # Collapse duplicates: one vector per cluster
+    # -----------------------------
+    df, ids, members = collapse_duplicates(df, cols, ids)
     texts = df["combined_text"].tolist()
 
     # -----------------------------
     # Embedding
     # -----------------------------
-    print("Loading embedding model...")
-    model = SentenceTransformer("all-MiniLM-L6-v2")
-
     print("Encoding cases...")
-    embeddings = model.encode(
-        texts,
-        show_progress_bar=True,
-        convert_to_numpy=True
-    ).astype("float32")
+    embeddings = encode_cases(model, texts)
 
     # -----------------------------
-    # FAISS Index
+    # FAISS Index (ids = caseid)
     # -----------------------------
     print("Building FAISS index...")
-    index = faiss.IndexFlatL2(embeddings.shape[1])
-    index.add(embeddings)
+    index = new_case_index(embeddings.shape[1])
+    index.add_with_ids(embeddings, ids)
 
-    faiss.write_index(index, str(INDEX_PATH))
+    save_case_index(index, case_metadata(df, ids, members), index_path, meta_path)
 
-    with open(META_PATH, "wb") as f:
-        pickle.dump(df.to_dict(orient="records"), f)
+    # Lexical index next to FAISS, for exact module names / codes
+    print("Building BM25 index...")
+    BM25Index.build(texts, ids).save(case_bm25_path(scale))
 
-    # -----------------------------
-    # Timing End
-    # -----------------------------
-    end_time = time.time()
+    print("Saved:", index_path)
+    print("Saved:", meta_path)
+    print("Saved:", case_bm25_path(scale))
 
-    print("\n✅ Index built successfully")
-    print("Saved:", INDEX_PATH)
-    print("Saved:", META_PATH)
-    print(f"\n⏱️ Index build time (25k records): {round(end_time - start_time, 2)} seconds")
 
+def build_shards(scale: str, df: pd.DataFrame, cols: dict, ids: np.ndarray, model, shard_by: str, rebuild=()):
+    """
+    One index per reportedon period / caseid range under
+    data/case_shards_<scale>/. Shards whose input is unchanged since
+    the last build stay frozen; only new or changed periods (plus any
+    named in `rebuild`) are re-embedded and rewritten. Duplicates are
+    collapsed within a shard, so new cases never alter a frozen one.
+    """
+    shard_dir = case_shard_dir(scale)
+    shard_dir.mkdir(parents=True, exist_ok=True)
+
+    previous = read_manifest(shard_dir)["shards"]
+    manifest = {"shard_by": shard_by, "shards": {}}
+
+    labels = shard_labels(df, ids, shard_by)
+    texts_by_id = {}
+
+    for label in sorted(set(labels)):
+        mask = labels == label
+        shard_df, shard_ids = df[mask], ids[mask]
+        digest = shard_digest(shard_ids, shard_df["combined_text"].tolist())
+        index_path, meta_path = shard_paths(shard_dir, label)
+
+        frozen = (
+            label not in rebuild
+            and previous.get(label, {}).get("digest") == digest
+            and index_path.exists()
+            and meta_path.exists()
+        )
+
+        if frozen:
+            with open(meta_path, "rb") as f:
+                metadata = pickle.load(f)
+            print(f"Shard {label}: unchanged ({len(metadata)} vectors), kept")
+        else:
+            shard_df, shard_ids, members = collapse_duplicates(shard_df, cols, shard_ids)
+            print(f"Shard {label}: encoding {len(shard_df)} cases...")
+            embeddings = encode_cases(model, shard_df["combined_text"].tolist())
+
+            index = new_case_index(embeddings.shape[1])
+            index.add_with_ids(embeddings, shard_ids)
+            metadata = case_metadata(shard_df, shard_ids, members)
+            save_case_index(index, metadata, index_path, meta_path)
+
+        manifest["shards"][label] = {"digest": digest, "cases": int(mask.sum()), "vectors": len(metadata)}
+        texts_by_id.update((cid, record.get("combined_text", "")) for cid, record in metadata.items())
+
+    # Shards for periods that no longer have cases
+    for label in set(previous) - set(manifest["shards"]):
+        for path in shard_paths(shard_dir, label):
+            path.unlink(missing_ok=True)
+
+    # BM25 statistics are global, so one lexical index covers all shards
+    print("Building BM25 index...")
+    BM25Index.build(list(texts_by_id.values()), list(texts_by_id.keys())).save(case_bm25_path(scale))
+
+    write_manifest(shard_dir, manifest)
+    print(f"Saved: {len(manifest['shards'])} shards in {shard_dir}")
+
+
+def build_knn(scale: str, k: int, shard_by: str = CASE_SHARD_BY):
+    """
+    Precomputes the k nearest neighbours of every indexed case, so
+    "related cases" is a lookup instead of a search per request.
+    """
+    if shard_by:
+        index, metadata = load_sharded(case_shard_dir(scale))
+    else:
+        index_path, meta_path = case_index_paths(scale)
+        index = faiss.read_index(str(index_path))
+        with open(meta_path, "rb") as f:
+            metadata = pickle.load(f)
+
+    print(f"Building kNN graph (k={k}, {index.ntotal} vectors)...")
+    start = time.time()
+    try:
+        graph = build_knn_graph(index, k, member_aliases(metadata))
+    finally:
+        if hasattr(index, "close"):
+            index.close()
+
+    graph.save(case_knn_path(scale))
+    print(f"Saved: {case_knn_path(scale)} ({round(time.time() - start, 2)} seconds)")
 
 
 # Entry Poi
 
 if __name__ == "__main__":
-    build_index()
+    parser = argparse.ArgumentParser(description="Build the case FAISS index")
+    parser.add_argument("scale", nargs="?", default="2k", choices=sorted(CASE_DATA_FILES))
+    parser.add_argument("--workers", type=int, default=EMBED_WORKERS, help="embedding worker processes")
+    parser.add_argument("--shard-by", default=CASE_SHARD_BY, choices=["", "year", "quarter", "month", "caseid"],
+                        help="build one index per period / caseid range")
+    parser.add_argument("--rebuild", default="", help="comma-separated shards to rebuild even if unchanged")
+    parser.add_argument("--knn", type=int, default=CASE_KNN, help="also precompute k related cases per case (0 = off)")
+    args = parser.parse_args()
+
+    build_index(
+        args.scale,
+        workers=args.workers,
+        shard_by=args.shard_by,
+        rebuild=set(filter(None, args.rebuild.split(","))),
+        knn=args.knn,
+    )
@@ -1,28 +1,30 @@
 import json
 import hashlib
 import pickle
+import re
+from collections import deque
 from datetime import datetime
 from pathlib import Path
 
-import fitz  # PyMuPDF
 import faiss
 import numpy as np
-from sentence_transformers import SentenceTransformer
 
 from core.config import (
     PDF_DIR,
     PDF_INDEX,
     PDF_META,
     PDF_REGISTRY,
+    PDF_BM25,
+    PDF_CHUNK_TOKENS,
+    PDF_CHUNK_OVERLAP,
     EMBED_MODEL
 )
+from services.bm25 import BM25Index
+from services.embed_cache import cached_encode
+from services.embedding import load_encoder
 
-# ---------------------------
-# Load Embedding Model
-# ---------------------------
-model = SentenceTransformer(EMBED_MODEL)
-print(f"Embedding model loaded: {EMBED_MODEL}")
-  # should be all-MiniLM-L6-v2
+
+ENCODE_GROUP = 256  # chunks per encode call while streaming a PDF
 
 
 # ---------------------------
@@ -46,22 +48,76 @@ def save_registry(registry):
     PDF_REGISTRY.write_text(json.dumps(registry, indent=2))
 
 
-def extract_text_chunks(pdf_path: Path, chunk_size=500):
-    doc = fitz.open(pdf_path)
-    full_text = []
+def iter_text_chunks(pdf_path: Path, chunk_size=PDF_CHUNK_TOKENS, overlap=PDF_CHUNK_OVERLAP):
+    """
+    Streams chunks of `chunk_size` whitespace tokens, with `overlap`
+    tokens carried into the next chunk, reading one page at a time.
+
+    Each chunk records where it came from: 1-based page_start/page_end
+    and char_start/char_end offsets within those pages' text. Only the
+    current page and one window of tokens are held in memory.
+    """
+    import fitz  # PyMuPDF
+
+    overlap = min(overlap, chunk_size - 1)
+    window = deque()  # (word, page_no, char_start, char_end)
+    fresh = 0  # tokens in the window not yet emitted
+
+    def emit():
+        first, last = window[0], window[-1]
+        return {
+            "text": " ".join(token[0] for token in window),
+            "page_start": first[1],
+            "page_end": last[1],
+            "char_start": first[2],
+            "char_end": last[3],
+        }
+
+    with fitz.open(pdf_path) as doc:
+        for page_no, page in enumerate(doc, start=1):
+            text = page.get_text()
+
+            for match in re.finditer(r"\S+", text):
+                window.append((match.group(), page_no, match.start(), match.end()))
+                fresh += 1
+
+                if len(window) == chunk_size:
+                    yield emit()
+                    while len(window) > overlap:
+                        window.popleft()
+                    fresh = 0
+
+    # Tail chunk: kept however short, as long as it adds new tokens
+    if fresh:
+        yield emit()
+
+
+def extract_text_chunks(pdf_path: Path, chunk_size=PDF_CHUNK_TOKENS):
+    return [chunk["text"] for chunk in iter_text_chunks(pdf_path, chunk_size)]
 
-    for page in doc:
-        text = page.get_text()
-        if text:
-            full_text.append(text)
 
-    words = " ".join(full_text).split()
+def _batched(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
 
-    return [
-        " ".join(words[i:i + chunk_size])
-        for i in range(0, len(words), chunk_size)
-        if len(words[i:i + chunk_size]) > 20
-    ]
+
+def _drop_source(index, metadata, source):
+    """
+    Removes a re-indexed PDF's old vectors; IndexFlat compacts on
+    removal, so metadata positions shift the same way.
+    """
+    stale = [i for i, m in enumerate(metadata) if m.get("source") == source]
+    if not stale:
+        return metadata
+
+    index.remove_ids(np.array(stale, dtype="int64"))
+    return [m for m in metadata if m.get("source") != source]
 
 
 # ---------------------------
@@ -84,6 +140,9 @@ def incremental_index():
         print("No new or modified PDFs found")
         return
 
+    model = load_encoder(EMBED_MODEL, workers=1)
+    print(f"Embedding model loaded: {EMBED_MODEL}")
+
     # Load or create index
     if PDF_INDEX.exists() and PDF_META.exists():
         index = faiss.read_index(str(PDF_INDEX))
@@ -97,26 +156,29 @@ def incremental_index():
 
         print(f"Processing PDF: {pdf.name}")
 
-        chunks = extract_text_chunks(pdf)
+        metadata = _drop_source(index, metadata, pdf.name)
+        added = 0
 
-        if not chunks:
-            print(f"⚠️ No text extracted from {pdf.name}")
-            continue
+        # Encode in bounded groups so memory does not grow with PDF size
+        for chunks in _batched(iter_text_chunks(pdf), ENCODE_GROUP):
+            vectors = cached_encode(
+                model,
+                [chunk["text"] for chunk in chunks],
+                model_name=EMBED_MODEL,
+                normalize=True,
+                show_progress_bar=True
+            )
 
-        vectors = model.encode(
-            chunks,
-            normalize_embeddings=True,
-            batch_size=32,
-            show_progress_bar=True
-        ).astype("float32")
+            index.add(vectors)
 
-        index.add(vectors)
+            for chunk in chunks:
+                metadata.append({**chunk, "source": pdf.name})
 
-        for chunk in chunks:
-            metadata.append({
-                "text": chunk,
-                "source": pdf.name
-            })
+            added += len(chunks)
+
+        if not added:
+            print(f"⚠️ No text extracted from {pdf.name}")
+            continue
 
         registry["indexed_files"][pdf.name] = {
             "hash": h,
@@ -128,6 +190,8 @@ def incremental_index():
     with open(PDF_META, "wb") as f:
         pickle.dump(metadata, f)
 
+    BM25Index.build([m.get("text", "") for m in metadata]).save(PDF_BM25)
+
     save_registry(registry)
 
     print("✅ PDF indexing completed successfully")
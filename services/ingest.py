@@ -0,0 +1,303 @@
+import hashlib
+import io
+import os
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+from core.config import CACHE_DIR, CSV_ENGINE
+
+# ---------------------------
+# Case table schema
+# ---------------------------
+# Bump when the parsed schema changes so stale binary caches are ignored
+SCHEMA_VERSION = 4
+
+# utf-8-sig also reads plain utf-8; latin1 never fails, so it goes last
+ENCODINGS = ["utf-8-sig", "cp1252", "latin1"]
+
+CATEGORY_COLUMNS = [
+    "currentowner",
+    "statuscode",
+    "category",
+    "channel",
+    "casetype",
+    "Cops-Rops",
+    "cops_rops",
+    "kit_category",
+    "kit_subcategory",
+    "action",
+]
+
+# Yes/No (or 1/0 in the Redash export) approval and SQL flags
+BOOL_COLUMNS = [
+    "sqlrequired",
+    "L1 Doc Approval",
+    "L2 Doc Approval",
+    "L3 Doc Approval",
+    "l1_doc_approval",
+    "l2_doc_approval",
+    "l3_doc_approval",
+]
+
+FLOAT_COLUMNS = [
+    "ConfigurationEffort[Hr]",
+    "PM Effort [Hr]",
+    "TestingEffort [Hr]",
+    "TotalEffort [Hr]",
+    "configurationeffort",
+    "testingeffort",
+    "totaleffort",
+    "kit_total_effort",
+]
+
+# Days open: "189 D" in cases_training.csv, plain ints in the Redash export
+AGING_COLUMNS = ["aging", "ageing"]
+
+BOOL_VALUES = {"yes": True, "no": False, "1": True, "0": False}
+
+# cases_training.csv uses dd-mm-yyyy, the Redash export uses ISO names/values
+DATE_COLUMNS = [
+    "reportedon",
+    "expclosedate",
+    "closedate",
+    "expcloseddate",
+    "closeddate",
+]
+
+# Nullable Int64: read as text, parsed after (a blank or non-numeric
+# caseid drops the row instead of failing the whole pull)
+ID_COLUMNS = ["caseid", "mprid"]
+
+TEXT_COLUMNS = ["subject", "details", "mpr_subject"] + BOOL_COLUMNS + AGING_COLUMNS + ID_COLUMNS
+
+# Redash export spellings -> the names cases_training.csv (and everything
+# downstream: insights, the SQLite store) uses
+COLUMN_ALIASES = {
+    "ageing": "aging",
+    "closeddate": "closedate",
+    "expcloseddate": "expclosedate",
+}
+
+
+# ---------------------------
+# Helpers
+# ---------------------------
+def detect_encoding(raw: bytes) -> str:
+    """
+    Picks the first encoding that decodes the whole payload. Decoding
+    is done once on the raw bytes instead of re-parsing the CSV per try.
+    """
+    for enc in ENCODINGS:
+        try:
+            raw.decode(enc)
+            return enc
+        except UnicodeDecodeError:
+            continue
+
+    raise RuntimeError("Failed to decode CSV with known encodings")
+
+
+def _csv_engine(engine=None):
+    engine = engine or CSV_ENGINE
+    if engine == "pyarrow":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            return "c"
+    return engine
+
+
+def _schema_dtypes(columns):
+    dtypes = {}
+    for col in columns:
+        if col in CATEGORY_COLUMNS:
+            dtypes[col] = "category"
+        elif col in FLOAT_COLUMNS:
+            dtypes[col] = "float32"
+        elif col in TEXT_COLUMNS:
+            dtypes[col] = str
+    return dtypes
+
+
+def parse_dates(series: pd.Series) -> pd.Series:
+    parsed = pd.to_datetime(series, format="%d-%m-%Y", errors="coerce")
+    missing = parsed.isna() & series.notna()
+    if missing.any():
+        parsed[missing] = pd.to_datetime(
+            series[missing], format="ISO8601", errors="coerce"
+        )
+    return parsed
+
+
+def parse_flags(series: pd.Series) -> pd.Series:
+    return (
+        series.str.strip()
+        .str.lower()
+        .map(BOOL_VALUES)
+        .astype("boolean")
+    )
+
+
+def parse_ids(series: pd.Series) -> pd.Series:
+    return pd.to_numeric(series.str.strip(), errors="coerce").astype("Int64")
+
+
+def parse_aging(series: pd.Series) -> pd.Series:
+    days = series.str.extract(r"(-?\d+)", expand=False)
+    return pd.to_numeric(days, errors="coerce").astype("Int32")
+
+
+def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
+    return df.rename(columns={k: v for k, v in COLUMN_ALIASES.items() if v not in df.columns})
+
+
+def _cache_prefix(path: Path) -> str:
+    """
+    Per source file: the stem for readability plus a hash of the full
+    resolved path, so same-named files in other directories keep their
+    own caches.
+    """
+    path_hash = hashlib.md5(str(path.resolve()).encode("utf-8")).hexdigest()[:8]
+    return f"{path.stem}-{path_hash}"
+
+
+def _cache_path(path: Path, digest: str) -> Path:
+    return CACHE_DIR / f"{_cache_prefix(path)}-v{SCHEMA_VERSION}-{digest[:16]}.parquet"
+
+
+# resolved path -> (size, mtime_ns, md5) of the last read, so a cache hit
+# on an unchanged file costs a stat instead of reading and hashing it
+_digests = {}
+
+
+def _source_digest(path: Path):
+    """
+    (md5 of the file, its bytes or None). The bytes are only read when
+    size or mtime changed since this process last hashed the file.
+    """
+    stat = path.stat()
+    key = str(path.resolve())
+    known = _digests.get(key)
+    if known is not None and known[:2] == (stat.st_size, stat.st_mtime_ns):
+        return known[2], None
+
+    raw = path.read_bytes()
+    digest = hashlib.md5(raw).hexdigest()
+    _digests[key] = (stat.st_size, stat.st_mtime_ns, digest)
+    return digest, raw
+
+
+def _can_cache() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+# ---------------------------
+# Public API
+# ---------------------------
+def parse_cases_csv(raw: bytes, engine=None) -> pd.DataFrame:
+    """
+    Parses a cases CSV payload into the compact schema: categoricals for
+    low-cardinality fields, nullable booleans for flags, float32 efforts,
+    Int32 aging days and datetime64 dates.
+    """
+    encoding = detect_encoding(raw)
+    engine = _csv_engine(engine)
+
+    header = pd.read_csv(io.BytesIO(raw), encoding=encoding, nrows=0)
+
+    df = pd.read_csv(
+        io.BytesIO(raw),
+        encoding=encoding,
+        engine=engine,
+        dtype=_schema_dtypes(header.columns),
+    )
+
+    for col in DATE_COLUMNS:
+        if col in df.columns:
+            df[col] = parse_dates(df[col])
+
+    for col in BOOL_COLUMNS:
+        if col in df.columns:
+            df[col] = parse_flags(df[col])
+
+    for col in AGING_COLUMNS:
+        if col in df.columns:
+            df[col] = parse_aging(df[col])
+
+    for col in ID_COLUMNS:
+        if col in df.columns:
+            df[col] = parse_ids(df[col])
+
+    if "caseid" in df.columns:
+        bad = df["caseid"].isna()
+        if bad.any():
+            print(f"[ingest] Dropped {int(bad.sum())} row(s) with a blank or non-numeric caseid")
+            df = df[~bad].reset_index(drop=True)
+
+    print(f"[ingest] Parsed CSV with encoding: {encoding} (engine={engine})")
+    return normalize_columns(df)
+
+
+def read_cases_parquet(path: Path) -> pd.DataFrame:
+    """
+    Typed Parquet cases (e.g. from scripts/generate_cases.py), coerced
+    to the same dtypes parse_cases_csv produces.
+    """
+    df = pd.read_parquet(path)
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.StringDtype):
+            df[col] = df[col].astype(object).where(df[col].notna(), None)
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    return normalize_columns(df)
+
+
+def load_cases(path, use_cache: bool = True, engine=None) -> pd.DataFrame:
+    """
+    Loads a cases CSV through the binary cache. The cache file is keyed
+    by the source content hash, so an edited CSV is re-parsed once and
+    every later load is a Parquet read; the hash itself is only redone
+    when the file's size or mtime changes. Parquet sources are read as is.
+    """
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"CSV not found at {path}")
+
+    if path.suffix == ".parquet":
+        return read_cases_parquet(path)
+
+    digest, raw = _source_digest(path)
+    cache_file = _cache_path(path, digest)
+
+    use_cache = use_cache and _can_cache()
+
+    if use_cache and cache_file.exists():
+        return pd.read_parquet(cache_file)
+
+    df = parse_cases_csv(raw if raw is not None else path.read_bytes(), engine=engine)
+
+    if use_cache:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+        # Drop caches written for older versions of this source
+        for stale in CACHE_DIR.glob(f"{_cache_prefix(path)}-v*.parquet"):
+            stale.unlink(missing_ok=True)
+
+        # Unique temp name: concurrent loaders never write the same file
+        with tempfile.NamedTemporaryFile(dir=CACHE_DIR, prefix=f".{path.stem}-", suffix=".tmp", delete=False) as f:
+            tmp_file = Path(f.name)
+        try:
+            df.to_parquet(tmp_file, index=False)
+            os.replace(tmp_file, cache_file)
+        except BaseException:
+            tmp_file.unlink(missing_ok=True)
+            raise
+
+    return df
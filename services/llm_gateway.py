@@ -0,0 +1,333 @@
+import hashlib
+import heapq
+import itertools
+import json
+import logging
+import threading
+import time
+
+from core.config import LLM_BATCH_TIMEOUT_S, LLM_KEEP_ALIVE, LLM_MAX_IN_FLIGHT, LLM_QUEUE_SIZE, LLM_TIMEOUT_S
+from services import telemetry
+
+logger = logging.getLogger("mpr.llm")
+
+INTERACTIVE = 0
+BATCH = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BATCH: "batch"}
+DEFAULT_TIMEOUTS = {INTERACTIVE: LLM_TIMEOUT_S, BATCH: LLM_BATCH_TIMEOUT_S}
+
+
+class LLMBusy(RuntimeError):
+    """
+    Turned away before generating: queue full, evicted by an interactive
+    request, or the expected queue wait already exceeds the deadline.
+    """
+
+
+class LLMTimeout(TimeoutError):
+    """
+    Deadline (queue wait + generation) passed before the reply finished.
+    """
+
+
+# ---------------------------
+# One generation, shared
+# ---------------------------
+class _Flight:
+    """
+    A queued or running generation. Every caller that asks for the same
+    request while it is in flight follows the same token stream.
+    """
+
+    def __init__(self, key: str, request: dict, priority: int, deadline: float):
+        self.key = key
+        self.request = request
+        self.priority = priority
+        self.deadline = deadline
+        self.enqueued = time.monotonic()
+        self.started = None
+        self.followers = 0
+        self.tokens = []
+        self.done = False
+        self.error = None
+        self.cond = threading.Condition()
+
+    def publish(self, token: str):
+        with self.cond:
+            self.tokens.append(token)
+            self.cond.notify_all()
+
+    def finish(self, error: Exception = None):
+        with self.cond:
+            if not self.done:
+                self.done = True
+                self.error = error
+            self.cond.notify_all()
+
+    def abandoned(self) -> bool:
+        with self.cond:
+            return self.followers == 0
+
+
+# ---------------------------
+# Gateway
+# ---------------------------
+class LLMGateway:
+    """
+    Sits between callers and the Ollama server:
+
+    - at most max_in_flight generations run at once (worker threads);
+    - up to queue_size requests wait, interactive ahead of batch; a full
+      queue evicts the newest batch request for an interactive one;
+    - each request has a deadline covering queue wait and generation,
+      and is refused up front when the expected wait already exceeds it;
+    - identical requests in flight are coalesced into one generation.
+    """
+
+    def __init__(self, max_in_flight: int = LLM_MAX_IN_FLIGHT, queue_size: int = LLM_QUEUE_SIZE, chat=None):
+        self.max_in_flight = max_in_flight
+        self.queue_size = queue_size
+
+        if chat is None:
+            import ollama
+
+            chat = ollama.chat
+        self._chat = chat
+
+        self._lock = threading.Condition()
+        self._queue = []  # (priority, seq, flight)
+        self._seq = itertools.count()
+        self._flights = {}  # key -> queued or running flight
+        self._running = 0
+        self._workers = []
+
+        self.generation_s = None  # EWMA of completed generation time
+        self.counts = {"completed": 0, "coalesced": 0, "rejected": 0, "evicted": 0, "timeouts": 0, "errors": 0}
+
+    # ---- public API ----
+    def stream(self, model: str, messages: list, options: dict = None, priority: int = INTERACTIVE, timeout: float = None):
+        """
+        Queues the request (or joins an identical one in flight) and
+        returns an iterator over reply chunks. Raises LLMBusy right away
+        when the request cannot be admitted.
+        """
+        request = {"model": model, "messages": messages, "options": options or {}, "keep_alive": LLM_KEEP_ALIVE}
+        key = hashlib.blake2b(json.dumps(request, sort_keys=True).encode("utf-8"), digest_size=16).hexdigest()
+        deadline = time.monotonic() + (timeout or DEFAULT_TIMEOUTS[priority])
+
+        with self._lock:
+            self._start_workers()
+
+            flight = self._flights.get(key)
+            if flight is not None:
+                self.counts["coalesced"] += 1
+                flight.deadline = max(flight.deadline, deadline)
+                if priority < flight.priority and flight.started is None:
+                    self._promote(flight, priority)
+            else:
+                flight = self._admit(key, request, priority, deadline)
+
+            with flight.cond:
+                flight.followers += 1
+
+        return self._follow(flight, deadline, time.monotonic())
+
+    def chat(self, model: str, messages: list, options: dict = None, priority: int = INTERACTIVE, timeout: float = None) -> str:
+        return "".join(self.stream(model, messages, options, priority, timeout))
+
+    def stats(self) -> dict:
+        with self._lock:
+            depth = {name: 0 for name in PRIORITY_NAMES.values()}
+            for priority, _, _ in self._queue:
+                depth[PRIORITY_NAMES[priority]] += 1
+            return {
+                "in_flight": self._running,
+                "queued": depth,
+                "generation_s": round(self.generation_s, 3) if self.generation_s else None,
+                **self.counts,
+            }
+
+    def metrics(self):
+        stats = self.stats()
+        rows = [("mpr_llm_in_flight", "gauge", {}, stats["in_flight"])]
+        rows += [("mpr_llm_queue_depth", "gauge", {"priority": p}, n) for p, n in stats["queued"].items()]
+        rows += [
+            ("mpr_llm_requests_total", "counter", {"outcome": outcome}, stats[outcome])
+            for outcome in self.counts
+        ]
+        return rows
+
+    # ---- admission ----
+    def _admit(self, key, request, priority, deadline) -> _Flight:
+        """
+        Called with the lock held.
+        """
+        if len(self._queue) >= self.queue_size and not self._evict_for(priority):
+            self.counts["rejected"] += 1
+            raise LLMBusy(f"LLM queue full ({len(self._queue)} waiting)")
+
+        ahead = sum(1 for p, _, _ in self._queue if p <= priority) + self._running
+        if self.generation_s is not None and ahead >= self.max_in_flight:
+            expected = (ahead - self.max_in_flight + 1) / self.max_in_flight * self.generation_s
+            if time.monotonic() + expected > deadline:
+                self.counts["rejected"] += 1
+                raise LLMBusy(f"Expected LLM queue wait {expected:.0f}s exceeds the deadline")
+
+        flight = _Flight(key, request, priority, deadline)
+        self._flights[key] = flight
+        heapq.heappush(self._queue, (priority, next(self._seq), flight))
+        self._lock.notify()
+        return flight
+
+    def _promote(self, flight: _Flight, priority: int):
+        """
+        A queued flight joined by a more urgent caller moves up. Lock held.
+        """
+        self._queue = [entry for entry in self._queue if entry[2] is not flight]
+        flight.priority = priority
+        self._queue.append((priority, next(self._seq), flight))
+        heapq.heapify(self._queue)
+
+    def _evict_for(self, priority) -> bool:
+        """
+        Drops the newest lower-priority waiter to make room. Lock held.
+        """
+        victims = [entry for entry in self._queue if entry[0] > priority]
+        if not victims:
+            return False
+
+        victim = max(victims, key=lambda entry: (entry[0], entry[1]))
+        self._queue.remove(victim)
+        heapq.heapify(self._queue)
+        self._flights.pop(victim[2].key, None)
+        self.counts["evicted"] += 1
+        victim[2].finish(LLMBusy("Evicted from the LLM queue by an interactive request"))
+        return True
+
+    # ---- workers ----
+    def _start_workers(self):
+        while len(self._workers) < self.max_in_flight:
+            worker = threading.Thread(target=self._work, name=f"llm-gateway-{len(self._workers)}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def _next_flight(self) -> _Flight:
+        with self._lock:
+            while True:
+                while not self._queue:
+                    self._lock.wait()
+                _, _, flight = heapq.heappop(self._queue)
+
+                # Every caller gave up or timed out while it waited
+                if flight.abandoned() or time.monotonic() >= flight.deadline:
+                    self._flights.pop(flight.key, None)
+                    flight.finish(LLMTimeout("Deadline passed while queued"))
+                    continue
+
+                self._running += 1
+                return flight
+
+    def _work(self):
+        while True:
+            flight = self._next_flight()
+            flight.started = time.monotonic()
+            error = None
+
+            completed = False
+
+            try:
+                completed = self._generate(flight)
+            except Exception as e:
+                error = e
+                if not isinstance(e, LLMTimeout):
+                    logger.warning(f"LLM generation failed: {e}")
+
+            elapsed = time.monotonic() - flight.started
+            with self._lock:
+                self._running -= 1
+                self._flights.pop(flight.key, None)
+                if completed:
+                    self.counts["completed"] += 1
+                    self.generation_s = elapsed if self.generation_s is None else 0.8 * self.generation_s + 0.2 * elapsed
+                elif error is not None and not isinstance(error, LLMTimeout):
+                    self.counts["errors"] += 1
+            flight.finish(error)
+
+    def _generate(self, flight: _Flight) -> bool:
+        """
+        Publishes the reply chunk by chunk; False when every caller left
+        and generation was cut short.
+        """
+        stream = self._chat(**flight.request, stream=True)
+        try:
+            for chunk in stream:
+                content = chunk["message"]["content"]
+                if content:
+                    flight.publish(content)
+                if flight.abandoned():
+                    return False
+                if time.monotonic() >= flight.deadline:
+                    raise LLMTimeout("Deadline passed during generation")
+            return True
+        finally:
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close()
+
+    # ---- callers ----
+    def _follow(self, flight: _Flight, deadline: float, joined: float):
+        """
+        Yields the flight's chunks as they arrive; records queue wait,
+        time-to-first-token and total time under the caller's span.
+        """
+        seen = 0
+        first = True
+
+        try:
+            while True:
+                with flight.cond:
+                    while seen == len(flight.tokens) and not flight.done:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        flight.cond.wait(remaining)
+                    new = flight.tokens[seen:]
+                    seen = len(flight.tokens)
+                    done, error = flight.done, flight.error
+
+                if not new and not done:
+                    error, done = LLMTimeout("LLM reply did not finish before the deadline"), True
+
+                if new and first:
+                    now = time.monotonic()
+                    started = flight.started or now
+                    telemetry.record("llm.queue_wait", max(0.0, started - joined), priority=PRIORITY_NAMES[flight.priority])
+                    telemetry.record("llm.ttft", now - joined)
+                    first = False
+
+                yield from new
+
+                if done:
+                    if error is not None:
+                        if isinstance(error, LLMTimeout):
+                            with self._lock:
+                                self.counts["timeouts"] += 1
+                        raise error
+                    return
+        finally:
+            with flight.cond:
+                flight.followers -= 1
+            telemetry.record("llm.total", time.monotonic() - joined, model=flight.request["model"])
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway() -> LLMGateway:
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            _gateway = LLMGateway()
+            telemetry.REGISTRY.add_gauges(_gateway.metrics)
+        return _gateway
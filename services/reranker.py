@@ -0,0 +1,159 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from core.config import RERANK_BUDGET_MS, RERANK_CACHE_SIZE, RERANK_MODEL
+
+
+# ---------------------------
+# Cross-encoder re-ranker
+# ---------------------------
+class Reranker:
+    """
+    Re-scores (query, passage) pairs with a cross-encoder in one batched
+    CPU call. Scores are cached per (query, passage) in an LRU.
+
+    budget_ms caps the time re-ranking may add to a request: the cost of
+    the uncached pairs is predicted from earlier calls, and the stage is
+    skipped (input order kept) when it would not fit, or when another
+    request is already scoring. None disables the budget.
+    """
+
+    def __init__(self, model_name: str = RERANK_MODEL, budget_ms=RERANK_BUDGET_MS, cache_size: int = RERANK_CACHE_SIZE):
+        self.model_name = model_name
+        self.budget_ms = budget_ms
+        self.cache_size = cache_size
+
+        self._model = None
+        self._scores = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._predict_lock = threading.Lock()
+
+        self.ms_per_pair = None  # running estimate of predict() cost
+        self.skipped = 0
+
+    @property
+    def model(self):
+        if self._model is None:
+            from sentence_transformers import CrossEncoder
+            self._model = CrossEncoder(self.model_name, device="cpu")
+        return self._model
+
+    @staticmethod
+    def pair_key(query: str, text: str) -> bytes:
+        return hashlib.blake2b(f"{query}\x00{text}".encode("utf-8"), digest_size=16).digest()
+
+    def clear(self):
+        with self._cache_lock:
+            self._scores.clear()
+
+    def _cached(self, keys):
+        scores = np.zeros(len(keys), dtype="float32")
+        missing = []
+
+        with self._cache_lock:
+            for i, key in enumerate(keys):
+                score = self._scores.get(key)
+                if score is None:
+                    missing.append(i)
+                else:
+                    scores[i] = score
+                    self._scores.move_to_end(key)
+
+        return scores, missing
+
+    def _store(self, keys, scores):
+        with self._cache_lock:
+            for key, score in zip(keys, scores):
+                self._scores[key] = float(score)
+            while len(self._scores) > self.cache_size:
+                self._scores.popitem(last=False)
+
+    def _fits(self, n_pairs: int, remaining_ms) -> bool:
+        if remaining_ms is None or self.ms_per_pair is None:
+            return True
+
+        if n_pairs * self.ms_per_pair <= remaining_ms:
+            return True
+
+        # Decay the estimate on every skip, so one slow call under load
+        # does not switch re-ranking off for good
+        self.ms_per_pair *= 0.9
+        return False
+
+    def score(self, query: str, texts, started: float = None):
+        """
+        One score per text (higher = more relevant), or None when the
+        call was skipped. `started` is the request's perf_counter() start;
+        time already spent counts against the budget.
+        """
+        keys = [self.pair_key(query, t) for t in texts]
+        scores, missing = self._cached(keys)
+
+        if not missing:
+            return scores
+
+        remaining_ms = None
+        if self.budget_ms is not None:
+            spent_ms = (time.perf_counter() - started) * 1000 if started else 0.0
+            remaining_ms = self.budget_ms - spent_ms
+
+        if not self._fits(len(missing), remaining_ms) or not self._predict_lock.acquire(blocking=False):
+            self.skipped += 1
+            return None
+
+        try:
+            model = self.model
+            start = time.perf_counter()
+            fresh = model.predict(
+                [(query, texts[i]) for i in missing],
+                batch_size=len(missing),
+                show_progress_bar=False,
+                convert_to_numpy=True,
+            )
+            elapsed_ms = (time.perf_counter() - start) * 1000
+        finally:
+            self._predict_lock.release()
+
+        per_pair = elapsed_ms / len(missing)
+        self.ms_per_pair = per_pair if self.ms_per_pair is None else 0.8 * self.ms_per_pair + 0.2 * per_pair
+
+        fresh = np.asarray(fresh, dtype="float32").reshape(-1)
+        scores[missing] = fresh
+        self._store([keys[i] for i in missing], fresh)
+
+        return scores
+
+    def rerank(self, query: str, texts, keep: int, started: float = None):
+        """
+        Positions of the best `keep` texts, best first; the first `keep`
+        positions in input order when the call was skipped.
+        """
+        texts = list(texts)
+        if len(texts) <= 1:
+            return list(range(len(texts)))[:keep]
+
+        scores = self.score(query, texts, started)
+        if scores is None:
+            return list(range(min(keep, len(texts))))
+
+        return np.argsort(-scores, kind="stable")[:keep].tolist()
+
+
+_reranker = None
+
+
+def get_reranker():
+    """
+    Shared Reranker, or None when RERANK_MODEL is not set.
+    """
+    global _reranker
+
+    if not RERANK_MODEL:
+        return None
+    if _reranker is None:
+        _reranker = Reranker()
+    return _reranker
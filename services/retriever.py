@@ -1,62 +1,349 @@
 ﻿import pickle
-import faiss
-from sentence_transformers import SentenceTransformer
+import threading
+import time
+import numpy as np
 
-from core.config import PDF_INDEX, PDF_META, EMBED_MODEL, TOP_K
+from core.config import (
+    PDF_INDEX,
+    PDF_META,
+    PDF_BM25,
+    EMBED_MODEL,
+    TOP_K,
+    CASE_SCALE,
+    HYBRID_SEARCH,
+    HYBRID_CANDIDATES,
+    RRF_K,
+    RERANK_CANDIDATES,
+    case_bm25_path,
+    case_index_paths,
+    case_knn_path,
+    case_shard_dir,
+)
+from services.bm25 import load_bm25, reciprocal_rank_fusion
+from services.case_graph import KnnGraph
+from services.case_shards import MANIFEST, load_sharded
+from services.reranker import get_reranker
+from services import telemetry
 
 # ---------------------------
-# Load Resources
+# Load Resources (lazily: importing this module stays cheap)
 # ---------------------------
-MODEL = SentenceTransformer(EMBED_MODEL)
+_load_lock = threading.Lock()
+_model = None
+_docs = None  # (INDEX, METADATA, LEXICAL)
 
-INDEX = faiss.read_index(str(PDF_INDEX))
 
-with open(PDF_META, "rb") as f:
-    METADATA = pickle.load(f)
+def get_model():
+    global _model
+    if _model is None:
+        with _load_lock:
+            if _model is None:
+                from sentence_transformers import SentenceTransformer
 
-print("Retriever loaded ✅")
+                _model = SentenceTransformer(EMBED_MODEL)
+    return _model
+
+
+def _load_docs():
+    global _docs
+    if _docs is None:
+        with _load_lock:
+            if _docs is None:
+                import faiss
+
+                for path in (PDF_INDEX, PDF_META):
+                    if not path.exists():
+                        raise FileNotFoundError(f"PDF index file not found: {path}")
+
+                index = faiss.read_index(str(PDF_INDEX))
+                with open(PDF_META, "rb") as f:
+                    metadata = pickle.load(f)
+                _docs = (index, metadata, load_bm25(PDF_BM25))
+    return _docs
+
+
+def __getattr__(name):
+    # retriever.MODEL / INDEX / METADATA / LEXICAL load on first access
+    if name == "MODEL":
+        return get_model()
+    if name in ("INDEX", "METADATA", "LEXICAL"):
+        return dict(zip(("INDEX", "METADATA", "LEXICAL"), _load_docs()))[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Case index (ids = caseid); reloaded when the delta sync rewrites it.
+# A sharded build (data/case_shards_<scale>/) is used when it is newer.
+CASE_INDEX_PATH, CASE_META_PATH = case_index_paths(CASE_SCALE)
+CASE_BM25_PATH = case_bm25_path(CASE_SCALE)
+CASE_SHARD_MANIFEST = case_shard_dir(CASE_SCALE) / MANIFEST
+CASE_KNN_PATH = case_knn_path(CASE_SCALE)
+
+_case_index = None
+_case_metadata = {}
+_case_lexical = None
+_case_index_mtime = None
+_case_index_lock = threading.Lock()
+_case_graph = None
+_case_graph_mtime = None
+
+
+def _case_index_source():
+    """
+    ("shards" | "single", mtime) of the newest case index on disk.
+    """
+    candidates = []
+    if CASE_SHARD_MANIFEST.exists():
+        candidates.append((CASE_SHARD_MANIFEST.stat().st_mtime, "shards"))
+    if CASE_INDEX_PATH.exists() and CASE_META_PATH.exists():
+        candidates.append((CASE_INDEX_PATH.stat().st_mtime, "single"))
+
+    if not candidates:
+        return None, None
+    mtime, kind = max(candidates)
+    return kind, mtime
+
+
+def case_index_version():
+    """
+    Changes when the case index on disk is rebuilt or delta-synced.
+    """
+    kind, mtime = _case_index_source()
+    return f"{CASE_INDEX_PATH.stem}:{kind}:{mtime}"
+
+
+def _load_case_index():
+    global _case_index, _case_metadata, _case_lexical, _case_index_mtime
+
+    kind, mtime = _case_index_source()
+    if kind is None:
+        return None, {}, None
+
+    with _case_index_lock:
+        if mtime != _case_index_mtime:
+            # The old index is not closed: searches already holding it
+            # finish on it, and it (with a sharded index's thread pool)
+            # is freed once the last of them lets go
+            if kind == "shards":
+                index, metadata = load_sharded(CASE_SHARD_MANIFEST.parent)
+            else:
+                import faiss
+
+                index = faiss.read_index(str(CASE_INDEX_PATH))
+                with open(CASE_META_PATH, "rb") as f:
+                    metadata = pickle.load(f)
+
+            _case_index, _case_metadata = index, metadata
+            _case_lexical = load_bm25(CASE_BM25_PATH)
+            _case_index_mtime = mtime
+
+        return _case_index, _case_metadata, _case_lexical
+
+
+def set_case_scale(scale):
+    """
+    Points find_similar_cases at another case index (2k, 25k, live...);
+    it is loaded on the next search.
+    """
+    global CASE_INDEX_PATH, CASE_META_PATH, CASE_BM25_PATH, CASE_SHARD_MANIFEST, CASE_KNN_PATH
+    global _case_index_mtime, _case_graph_mtime
+
+    CASE_INDEX_PATH, CASE_META_PATH = case_index_paths(scale)
+    CASE_BM25_PATH = case_bm25_path(scale)
+    CASE_SHARD_MANIFEST = case_shard_dir(scale) / MANIFEST
+    CASE_KNN_PATH = case_knn_path(scale)
+    _case_index_mtime = None
+    _case_graph_mtime = None
+
+
+def _load_case_graph():
+    """
+    The precomputed related-cases graph, or None when it was not built.
+    """
+    global _case_graph, _case_graph_mtime
+
+    if not CASE_KNN_PATH.exists():
+        return None
+
+    mtime = CASE_KNN_PATH.stat().st_mtime
+    if mtime != _case_graph_mtime:
+        _case_graph = KnnGraph.load(CASE_KNN_PATH)
+        _case_graph_mtime = mtime
+    return _case_graph
+
+
+# ---------------------------
+# Hybrid (BM25 + FAISS) ranking
+# ---------------------------
+def _search_depth(top_k):
+    return max(top_k, HYBRID_CANDIDATES) if HYBRID_SEARCH else top_k
+
+
+def _hybrid_ids(query, vector_ids, lexical, top_k):
+    """
+    Fuses the FAISS ranking with the BM25 ranking by reciprocal rank;
+    falls back to FAISS order when hybrid search is off or no BM25
+    index has been built.
+    """
+    if not HYBRID_SEARCH or lexical is None:
+        return vector_ids[:top_k]
+
+    lexical_ids, _ = lexical.search(query, _search_depth(top_k))
+    return reciprocal_rank_fusion(
+        [vector_ids, lexical_ids.tolist()],
+        k=RRF_K,
+        limit=top_k,
+    )
 
 
 # ---------------------------
 # RAG Context Retrieval
 # ---------------------------
+@telemetry.span("retrieve")
+def retrieve_chunks(query, top_k=TOP_K, reranker=None):
+    """
+    Chunk metadata for the best top_k PDF chunks. With a reranker, a
+    wider fused candidate set is re-scored and cut down to top_k.
+    """
+    started = time.perf_counter()
+
+    depth = max(top_k, RERANK_CANDIDATES) if reranker is not None else top_k
+    index, metadata, lexical = _load_docs()
+
+    with telemetry.span("retrieve.embed"):
+        query_vec = get_model().encode([query]).astype("float32")
+
+    with telemetry.span("retrieve.search"):
+        _, indices = index.search(query_vec, _search_depth(depth))
+        vector_ids = [int(i) for i in indices[0] if i >= 0]
+        ranked = _hybrid_ids(query, vector_ids, lexical, depth)
+
+    with telemetry.span("retrieve.fetch"):
+        candidates = [
+            metadata[i]
+            for i in ranked
+            if 0 <= i < len(metadata) and metadata[i].get("text")
+        ]
+
+    if reranker is None:
+        return candidates[:top_k]
+
+    with telemetry.span("retrieve.rerank", candidates=len(candidates)):
+        order = reranker.rerank(query, [c["text"] for c in candidates], top_k, started)
+    return [candidates[i] for i in order]
+
+
 def retrieve_context(query):
 
     if not query.strip():
         return ""
 
-    query_vec = MODEL.encode([query]).astype("float32")
-    _, indices = INDEX.search(query_vec, TOP_K)
+    chunks = [
+        f"[{cite(meta)}] {meta['text']}"
+        for meta in retrieve_chunks(query, TOP_K, get_reranker())
+    ]
 
-    chunks = []
+    return "\n".join(chunks)
 
-    for i in indices[0]:
-        if i < len(METADATA):
-            text = METADATA[i].get("text", "")
-            if text:
-                chunks.append(text)
 
-    return "\n".join(chunks)
+def cite(meta):
+    """
+    "RMG - Allocation.pdf p.2" / "pp.2-3"; chunks indexed before page
+    provenance existed cite the source only.
+    """
+    source = meta.get("source", "document")
+    start, end = meta.get("page_start"), meta.get("page_end")
 
+    if start is None:
+        return source
+    if end is None or end == start:
+        return f"{source} p.{start}"
+    return f"{source} pp.{start}-{end}"
 
+
+@telemetry.span("cases")
 def find_similar_cases(query, top_k=5):
 
     if not query.strip():
         return []
 
-    query_vec = MODEL.encode([query]).astype("float32")
-    distances, indices = INDEX.search(query_vec, top_k)
+    case_index, case_metadata, case_lexical = _load_case_index()
+
+    if case_index is None:
+        return []
+
+    with telemetry.span("cases.embed"):
+        query_vec = get_model().encode([query]).astype("float32")
+
+    with telemetry.span("cases.search"):
+        distances, ids = case_index.search(query_vec, _search_depth(top_k))
+
+        vector_dist = {
+            int(case_id): float(dist)
+            for case_id, dist in zip(ids[0], distances[0])
+            if case_id >= 0
+        }
+        ranked = _hybrid_ids(query, list(vector_dist), case_lexical, top_k)
+
+    with telemetry.span("cases.fetch"):
+        return _case_results(query_vec, ranked, vector_dist, case_index, case_metadata)
+
+
+@telemetry.span("cases.related")
+def related_cases(caseid, top_k=5):
+    """
+    Cases most similar to an indexed case, shaped like
+    find_similar_cases(). A lookup in the precomputed kNN graph; without
+    one (or for a case added since it was built) the case's own vector
+    is searched instead.
+    """
+    caseid = int(caseid)
+    case_index, case_metadata, _ = _load_case_index()
+    if case_index is None:
+        return []
+
+    graph = _load_case_graph()
+    if graph is not None and graph.position(caseid) is not None:
+        neighbors = graph.related(caseid, top_k)
+    else:
+        try:
+            vec = case_index.reconstruct(caseid)
+        except (KeyError, RuntimeError):
+            return []
+        dist, ids = case_index.search(vec.reshape(1, -1).astype("float32"), top_k + 1)
+        neighbors = [
+            (int(cid), float(d))
+            for cid, d in zip(ids[0], dist[0])
+            if cid >= 0 and cid != caseid
+        ][:top_k]
+
+    results = []
+    for cid, dist in neighbors:
+        if cid not in case_metadata:
+            continue
+        case = case_metadata[cid].copy()
+        case["confidence"] = round(max(0, 100 - dist), 2)
+        results.append(case)
+
+    return results
+
+
+def _case_results(query_vec, ranked, vector_dist, case_index, case_metadata):
 
     results = []
 
-    for rank, idx in enumerate(indices[0]):
+    for case_id in ranked:
 
-        if idx < 0 or idx >= len(METADATA):
+        if case_id not in case_metadata:
             continue
 
-        case = METADATA[idx].copy()
+        # BM25-only hits get the same L2 distance FAISS would report
+        dist = vector_dist.get(case_id)
+        if dist is None:
+            vec = case_index.reconstruct(int(case_id))
+            dist = float(np.sum((vec - query_vec[0]) ** 2))
+
+        case = case_metadata[case_id].copy()
 
-        confidence = max(0, 100 - float(distances[0][rank]))
+        confidence = max(0, 100 - dist)
         case["confidence"] = round(confidence, 2)
 
         results.append(case)
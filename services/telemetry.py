@@ -0,0 +1,262 @@
+import contextvars
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+from core.config import TELEMETRY_SINKS, TELEMETRY_WINDOW
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+logger = logging.getLogger("mpr.telemetry")
+
+
+# ---------------------------
+# Spans
+# ---------------------------
+class Span:
+    """
+    One timed stage. Spans opened inside another span become its
+    children, so a request's root span holds its full stage breakdown.
+    """
+
+    __slots__ = ("name", "attrs", "parent", "children", "start", "start_ns", "duration", "extra")
+
+    def __init__(self, name: str, attrs: dict, parent=None):
+        self.name = name
+        self.attrs = attrs
+        self.parent = parent
+        self.children = []
+        self.start = time.perf_counter()
+        self.start_ns = time.time_ns()
+        self.duration = None
+        self.extra = {}  # per-sink state
+
+    @property
+    def ms(self) -> float:
+        return (self.duration or 0.0) * 1000
+
+    def walk(self):
+        for child in self.children:
+            yield child
+            yield from child.walk()
+
+
+_current = contextvars.ContextVar("telemetry_span", default=None)
+
+
+# ---------------------------
+# Aggregation
+# ---------------------------
+class Registry:
+    """
+    Per-stage running count/sum plus a sliding window of recent
+    durations, from which percentiles are computed.
+    """
+
+    def __init__(self, window: int = TELEMETRY_WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        self._stages = {}
+        self._gauges = []
+
+    def observe(self, name: str, seconds: float):
+        with self._lock:
+            stage = self._stages.get(name)
+            if stage is None:
+                stage = self._stages[name] = {"count": 0, "sum": 0.0, "recent": deque(maxlen=self.window)}
+            stage["count"] += 1
+            stage["sum"] += seconds
+            stage["recent"].append(seconds)
+
+    def add_gauges(self, fn):
+        """
+        fn() -> [(metric, "gauge" | "counter", {label: value}, number)],
+        read at scrape time (queue depths, in-flight counts, ...).
+        """
+        self._gauges.append(fn)
+
+    def _snapshot(self):
+        with self._lock:
+            return {
+                name: (stage["count"], stage["sum"], np.array(stage["recent"]))
+                for name, stage in self._stages.items()
+            }
+
+    def summary(self) -> dict:
+        """
+        {stage: {count, mean_ms, p50_ms, p95_ms, p99_ms}}
+        """
+        out = {}
+        for name, (count, total, recent) in sorted(self._snapshot().items()):
+            quantiles = np.quantile(recent, QUANTILES) * 1000
+            out[name] = {
+                "count": count,
+                "mean_ms": round(total / count * 1000, 2),
+                **{f"p{int(q * 100)}_ms": round(float(v), 2) for q, v in zip(QUANTILES, quantiles)},
+            }
+        return out
+
+    def prometheus(self) -> str:
+        """
+        Prometheus text exposition: one summary, labelled by stage.
+        """
+        lines = [
+            "# HELP mpr_stage_seconds Time spent per request stage.",
+            "# TYPE mpr_stage_seconds summary",
+        ]
+        for name, (count, total, recent) in sorted(self._snapshot().items()):
+            stage = name.replace("\\", "\\\\").replace('"', '\\"')
+            for q, v in zip(QUANTILES, np.quantile(recent, QUANTILES)):
+                lines.append(f'mpr_stage_seconds{{stage="{stage}",quantile="{q}"}} {v:.6f}')
+            lines.append(f'mpr_stage_seconds_sum{{stage="{stage}"}} {total:.6f}')
+            lines.append(f'mpr_stage_seconds_count{{stage="{stage}"}} {count}')
+
+        typed = set()
+        for fn in self._gauges:
+            for metric, kind, labels, value in fn():
+                if metric not in typed:
+                    lines.append(f"# TYPE {metric} {kind}")
+                    typed.add(metric)
+                label_text = ",".join(f'{k}="{v}"' for k, v in labels.items())
+                lines.append(f"{metric}{{{label_text}}} {value}" if label_text else f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+
+
+REGISTRY = Registry()
+
+
+# ---------------------------
+# Sinks
+# ---------------------------
+class LogSink:
+    """
+    One line per finished root span, with its stage breakdown:
+    agent 2431 ms | agent.retrieve 18 | retrieve.embed 12 | ... | llm.total 2390
+    """
+
+    def __init__(self, log: logging.Logger = logger):
+        self.log = log
+        if not self.log.handlers and not logging.getLogger().handlers:
+            handler = logging.StreamHandler()
+            handler.setFormatter(logging.Formatter("[telemetry] %(message)s"))
+            self.log.addHandler(handler)
+            self.log.setLevel(logging.INFO)
+
+    def on_start(self, span: Span):
+        pass
+
+    def on_end(self, span: Span):
+        if span.parent is not None:
+            return
+        stages = "".join(f" | {child.name} {child.ms:.0f}" for child in span.walk())
+        self.log.info(f"{span.name} {span.ms:.0f} ms{stages}")
+
+
+class OTelSink:
+    """
+    Mirrors spans into OpenTelemetry (exporter setup is left to the
+    opentelemetry SDK / environment). Needs opentelemetry-api.
+    """
+
+    def __init__(self):
+        from opentelemetry import trace
+
+        self.trace = trace
+        self.tracer = trace.get_tracer("mprbot")
+
+    def on_start(self, span: Span):
+        context = None
+        if span.parent is not None and self in span.parent.extra:
+            context = self.trace.set_span_in_context(span.parent.extra[self])
+
+        attrs = {k: v for k, v in span.attrs.items() if isinstance(v, (str, int, float, bool))}
+        span.extra[self] = self.tracer.start_span(
+            span.name, context=context, attributes=attrs, start_time=span.start_ns
+        )
+
+    def on_end(self, span: Span):
+        otel_span = span.extra.pop(self, None)
+        if otel_span is not None:
+            otel_span.end(end_time=span.start_ns + int(span.duration * 1e9))
+
+
+_sinks = []
+
+
+def add_sink(sink):
+    _sinks.append(sink)
+
+
+def _notify(event: str, span: Span):
+    for sink in _sinks:
+        try:
+            getattr(sink, event)(span)
+        except Exception:
+            logger.exception(f"telemetry sink {type(sink).__name__} failed")
+
+
+def _configure(names):
+    for name in names:
+        if name == "log":
+            add_sink(LogSink())
+        elif name == "otel":
+            try:
+                add_sink(OTelSink())
+            except ImportError:
+                logger.warning("opentelemetry not installed, OTel sink disabled")
+
+
+_configure(TELEMETRY_SINKS)
+
+
+# ---------------------------
+# Public API
+# ---------------------------
+@contextmanager
+def span(name: str, **attrs):
+    """
+    with span("retrieve.embed"): ...
+    Times the block, feeds the registry and the configured sinks.
+    """
+    parent = _current.get()
+    current = Span(name, attrs, parent)
+    token = _current.set(current)
+    _notify("on_start", current)
+
+    try:
+        yield current
+    finally:
+        current.duration = time.perf_counter() - current.start
+        _current.reset(token)
+        _finish(current)
+
+
+def record(name: str, seconds: float, **attrs):
+    """
+    Records a duration that is not shaped like a block (e.g. LLM
+    time-to-first-token), as a child of the current span.
+    """
+    current = Span(name, attrs, _current.get())
+    current.start_ns -= int(seconds * 1e9)
+    current.duration = seconds
+    _notify("on_start", current)
+    _finish(current)
+
+
+def _finish(current: Span):
+    if current.parent is not None:
+        current.parent.children.append(current)
+    REGISTRY.observe(current.name, current.duration)
+    _notify("on_end", current)
+
+
+def summary() -> dict:
+    return REGISTRY.summary()
@@ -1,5 +1,12 @@
-﻿import pandas as pd
-from pathlib import Path
+﻿import bisect
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from core.config import CASE_DATA_FILES, DATA_DIR, INSIGHTS_BACKEND, INSIGHTS_SCALE
+from services.case_store import AGING_NUM, OWNER_KEY, get_store
+from services.ingest import load_cases
 
 # -----------------------------
 # Helpers
@@ -11,35 +18,62 @@ def _to_int(val):
         return 0
 
 
+def _to_text(val):
+    if pd.isna(val):
+        return ""
+    if isinstance(val, pd.Timestamp):
+        return val.date().isoformat()
+    return str(val)
+
+
 # -----------------------------
 # Load data ONCE (cached)
 # -----------------------------
-BASE_DIR = Path(__file__).resolve().parents[1]
-DATA_PATH = BASE_DIR / "data" / "cases_training.csv"
+DATA_PATH = DATA_DIR / CASE_DATA_FILES[INSIGHTS_SCALE]
 
 _df = None
+_df_version = None
 
 
-def load_cases_df():
-    global _df
-    if _df is not None:
-        return _df
+def _store():
+    """
+    The SQLite store built from DATA_PATH when INSIGHTS_BACKEND is
+    "sqlite"; None for the in-memory pandas backend.
+    """
+    if INSIGHTS_BACKEND != "sqlite":
+        return None
+    return get_store(DATA_PATH)
 
-    encodings = ["utf-8", "utf-8-sig", "cp1252", "latin1"]
-    last_err = None
 
-    for enc in encodings:
-        try:
-            _df = pd.read_csv(DATA_PATH, encoding=enc)
-            _df = _df.fillna("")
-            print(f"[user_insights] Loaded CSV with encoding: {enc}")
-            return _df
-        except Exception as e:
-            last_err = e
+def data_version() -> str:
+    """
+    Changes whenever the cases file is rewritten; callers caching
+    results key on it so they never serve an older file's answers.
+    """
+    store = _store()
+    if store is not None:
+        return store.version()
 
-    raise RuntimeError(
-        f"Failed to load CSV with known encodings. Last error: {last_err}"
-    )
+    stat = DATA_PATH.stat()
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def load_cases_df():
+    """
+    Reloads (and drops the derived indexes) when the file changes.
+    """
+    global _df, _df_version, _case_index, _owner_frames, _owner_index
+
+    version = data_version()
+    if _df is not None and version == _df_version:
+        return _df
+
+    _df = load_cases(DATA_PATH)
+    _df_version = version
+    _case_index = None
+    _owner_frames = None
+    _owner_index = None
+    return _df
 
 
 # -----------------------------
@@ -50,64 +84,278 @@ def is_case_id(value: str) -> bool:
 
 
 # -----------------------------
-# Case-level details
+# caseid -> row position index (built ONCE)
 # -----------------------------
-def get_case_details(case_id: str):
+_case_index = None
+
+
+def _load_case_index():
+    """
+    Maps each caseid to its row position so lookups are a dict hit
+    instead of a boolean scan. The first row wins for duplicate ids.
+    """
+    global _case_index
     df = load_cases_df()
+    if _case_index is not None:
+        return _case_index
+
+    caseids = pd.to_numeric(df["caseid"], errors="coerce")
+    positions = range(len(caseids) - 1, -1, -1)
+    _case_index = {
+        int(cid): pos
+        for cid, pos in zip(caseids.to_numpy()[::-1], positions)
+        if not pd.isna(cid)
+    }
+    return _case_index
+
+
+def _case_record(row):
+    return {
+        "caseid": int(row["caseid"]),
+        "currentowner": _to_text(row["currentowner"]),
+        "category": _to_text(row["category"]),
+        "statuscode": _to_text(row["statuscode"]),
+        "aging": _to_int(row["aging"]),
+        "reportedon": _to_text(row["reportedon"]),
+        "closedate": _to_text(row["closedate"]),
+        "subject": _to_text(row.get("subject", "")),
+        "details": _to_text(row.get("details", "")),
+    }
 
+
+def _case_records(df: pd.DataFrame):
+    return [_case_record(row) for _, row in df.iterrows()]
+
+
+# -----------------------------
+# Case-level details
+# -----------------------------
+def get_case_details(case_id: str):
     try:
         case_id = int(case_id)
     except Exception:
         return None
 
-    case_df = df[df["caseid"] == case_id]
+    store = _store()
+    if store is not None:
+        return _sql_case_details(store, case_id)
 
-    if case_df.empty:
+    pos = _load_case_index().get(case_id)
+
+    if pos is None:
         return None
 
-    row = case_df.iloc[0]
+    return _case_record(load_cases_df().iloc[pos])
 
-    return {
-        "caseid": row["caseid"],
-        "currentowner": row["currentowner"],
-        "category": row["category"],
-        "statuscode": row["statuscode"],
-        "aging": _to_int(row["aging"]),
-        "reportedon": row["reportedon"],
-        "closedate": row["closedate"],
-        "subject": row.get("subject", ""),
-        "details": row.get("details", ""),
+
+def get_cases_details(case_ids):
+    """
+    Bulk lookup. Returns one entry per requested id, in input order,
+    with None for ids that are unknown or not numeric.
+    """
+    return [get_case_details(case_id) for case_id in case_ids]
+
+
+# -----------------------------
+# Per-owner layout (built ONCE, aging-sorted)
+# -----------------------------
+OVERDUE_DAYS = 7
+CRITICAL_DAYS = 21
+
+_owner_frames = None
+
+
+def _load_owner_frames():
+    """
+    Splits the cases table by lowercased owner, each frame already
+    sorted by aging (oldest first), so top-N lookups never re-sort.
+    """
+    global _owner_frames
+    df = load_cases_df()
+    if _owner_frames is not None:
+        return _owner_frames
+
+    df = df.copy()
+    df["aging_num"] = (
+        pd.to_numeric(df["aging"], errors="coerce").fillna(0).astype("int32")
+    )
+    df = df.sort_values(by="aging_num", ascending=False, kind="stable")
+
+    owner_keys = df["currentowner"].astype(str).str.lower()
+    _owner_frames = {
+        owner: group
+        for owner, group in df.groupby(owner_keys, sort=False)
     }
+    return _owner_frames
+
+
+# -----------------------------
+# Owner typeahead (prefix + trigram index, built ONCE)
+# -----------------------------
+SUGGEST_MIN_SIMILARITY = 0.3
+PREFIX_SCAN_LIMIT = 500
+
+_owner_index = None
+_owner_index_version = None
+
+
+def _normalize_name(text: str) -> str:
+    return " ".join(str(text).lower().split())
+
+
+def _trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class _OwnerIndex:
+    """
+    Distinct owners with two lookups: a sorted list of the full name and
+    each of its words (prefix search by bisect), and trigram postings
+    (fuzzy search for typos).
+    """
+
+    def __init__(self, owners):
+        """
+        owners: (owner key, display name, case count) per owner
+        """
+        self.keys, self.names, self.cases = [], [], []
+        for key, name, cases in owners:
+            key = _normalize_name(key)
+            if key in ("", "nan", "none"):
+                continue
+            self.keys.append(key)
+            self.names.append(_to_text(name).strip())
+            self.cases.append(int(cases))
+
+        entries = sorted(
+            (token, i)
+            for i, key in enumerate(self.keys)
+            for token in {key, *key.split()}
+        )
+        self.tokens = [token for token, _ in entries]
+        self.token_owner = [i for _, i in entries]
+
+        self.grams = [_trigrams(key) for key in self.keys]
+        self.postings = {}
+        for i, grams in enumerate(self.grams):
+            for gram in grams:
+                self.postings.setdefault(gram, []).append(i)
+
+    def prefix(self, query: str) -> list:
+        """
+        Owners whose full name or any word starts with query; full-name
+        matches first.
+        """
+        start = bisect.bisect_left(self.tokens, query)
+        found = set()
+        for pos in range(start, min(start + PREFIX_SCAN_LIMIT, len(self.tokens))):
+            if not self.tokens[pos].startswith(query):
+                break
+            found.add(self.token_owner[pos])
+        return sorted(found, key=lambda i: (not self.keys[i].startswith(query), self.keys[i]))
+
+    def fuzzy(self, query: str, limit: int) -> list:
+        """
+        (owner, Jaccard similarity of trigram sets) best first.
+        """
+        grams = _trigrams(query)
+        shared = Counter(i for gram in grams for i in self.postings.get(gram, ()))
+        scored = [
+            (i, n / (len(grams) + len(self.grams[i]) - n))
+            for i, n in shared.items()
+        ]
+        scored = [(i, score) for i, score in scored if score >= SUGGEST_MIN_SIMILARITY]
+        return sorted(scored, key=lambda item: -item[1])[:limit]
+
+
+def _load_owner_index():
+    global _owner_index, _owner_index_version
+    store = _store()
+    if store is None:
+        frames = _load_owner_frames()
+        if _owner_index is None:
+            _owner_index = _OwnerIndex(
+                (key, frame["currentowner"].iat[0], len(frame))
+                for key, frame in frames.items()
+            )
+        return _owner_index
+
+    # Keyed by store version: a rebuilt store brings new owners
+    version = store.version()
+    if _owner_index is None or _owner_index_version != version:
+        _owner_index = _OwnerIndex(_sql_owners(store))
+        _owner_index_version = version
+    return _owner_index
+
+
+def suggest_owners(text: str, limit: int = 10):
+    """
+    Typeahead over known owners: prefix matches on the full name or any
+    word ("kum", "sanu"), then trigram fuzzy matches for typos
+    ("kumar sanoo"). Returns [{"owner", "cases", "match"}].
+    """
+    query = _normalize_name(text)
+    if not query:
+        return []
+
+    index = _load_owner_index()
+    picks = [(i, "prefix") for i in index.prefix(query)[:limit]]
+
+    if len(picks) < limit and len(query) >= 3:
+        seen = {i for i, _ in picks}
+        picks += [
+            (i, "fuzzy")
+            for i, _ in index.fuzzy(query, limit)
+            if i not in seen
+        ][:limit - len(picks)]
+
+    return [
+        {"owner": index.names[i], "cases": index.cases[i], "match": match}
+        for i, match in picks
+    ]
+
+
+# -----------------------------
+# Internal helper for case lists
+# -----------------------------
+def _get_user_cases(owner_name: str):
+    user_df = _load_owner_frames().get(owner_name.strip().lower())
+
+    if user_df is None:
+        return pd.DataFrame()
+
+    return user_df
+
+
+def _is_pending(user_df: pd.DataFrame):
+    return user_df["closedate"].isna()
 
 
 # -----------------------------
 # User-level summary
 # -----------------------------
 def get_user_summary(owner_name: str):
-    df = load_cases_df()
+    store = _store()
+    if store is not None:
+        return _sql_user_summary(store, owner_name)
 
-    user_df = df[
-        df["currentowner"].str.lower() == owner_name.lower()
-    ].copy()
+    user_df = _get_user_cases(owner_name)
 
     if user_df.empty:
         return None
 
-    # Ensure numeric aging
-    user_df["aging_num"] = user_df["aging"].apply(_to_int)
-
     total_cases = len(user_df)
 
-    pending_cases = user_df[
-        (user_df["closedate"] == "") | (user_df["closedate"].isna())
-    ]
+    pending_cases = user_df[_is_pending(user_df)]
 
-    overdue_cases = user_df[user_df["aging_num"] > 7]
-    critical_cases = user_df[user_df["aging_num"] > 21]
+    overdue_cases = user_df[user_df["aging_num"] > OVERDUE_DAYS]
+    critical_cases = user_df[user_df["aging_num"] > CRITICAL_DAYS]
 
     status_counts = (
         user_df["statuscode"]
         .value_counts()
+        .loc[lambda counts: counts > 0]
         .to_dict()
     )
 
@@ -122,82 +370,180 @@ def get_user_summary(owner_name: str):
 
 
 # -----------------------------
-# Internal helper for case lists
+# Focused case buckets (ALWAYS return list)
 # -----------------------------
-def _get_user_cases(owner_name: str):
-    df = load_cases_df()
+def get_case_buckets(owner_name: str, top_n: int = 3):
+    """
+    Returns the top-N pending, overdue and critical cases for an owner
+    in one pass over the owner's pre-sorted frame. Cases come back as
+    _case_record dicts (plain ints and ISO strings) from either backend.
+    """
+    store = _store()
+    if store is not None:
+        return _sql_case_buckets(store, owner_name, top_n)
 
-    user_df = df[
-        df["currentowner"].str.lower() == owner_name.lower()
-    ].copy()
+    user_df = _get_user_cases(owner_name)
 
     if user_df.empty:
-        return pd.DataFrame()
+        return {"pending": [], "overdue": [], "critical": []}
 
-    user_df["aging_num"] = user_df["aging"].apply(_to_int)
-    return user_df
+    # Aging is sorted descending, so overdue / critical are prefixes
+    neg_aging = -user_df["aging_num"].to_numpy()
+    n_overdue = int(np.searchsorted(neg_aging, -OVERDUE_DAYS, side="left"))
+    n_critical = int(np.searchsorted(neg_aging, -CRITICAL_DAYS, side="left"))
+
+    pending_pos = np.flatnonzero(_is_pending(user_df).to_numpy())[:top_n]
+
+    return {
+        "pending": _case_records(user_df.iloc[pending_pos]),
+        "overdue": _case_records(user_df.iloc[:min(n_overdue, top_n)]),
+        "critical": _case_records(user_df.iloc[:min(n_critical, top_n)]),
+    }
 
 
-# -----------------------------
-# Focused case buckets (ALWAYS return list)
-# -----------------------------
 def get_pending_cases(owner_name: str, top_n: int = 3):
-    user_df = _get_user_cases(owner_name)
+    return get_case_buckets(owner_name, top_n)["pending"]
 
-    if user_df.empty:
-        return []
 
-    pending_df = user_df[
-        (user_df["closedate"] == "") | (user_df["closedate"].isna())
-    ]
+def get_overdue_cases(owner_name: str, top_n: int = 3):
+    return get_case_buckets(owner_name, top_n)["overdue"]
 
-    if pending_df.empty:
-        return []
 
-    pending_df = pending_df.sort_values(
-        by="aging_num",
-        ascending=False
-    )
+def get_critical_cases(owner_name: str, top_n: int = 3):
+    return get_case_buckets(owner_name, top_n)["critical"]
 
-    return pending_df.head(top_n).to_dict(orient="records")
 
+# -----------------------------
+# Trends (reported / closed per period)
+# -----------------------------
+PERIOD_WIDTHS = {"year": 4, "month": 7, "day": 10}  # prefix of the ISO date
 
-def get_overdue_cases(owner_name: str, top_n: int = 3):
-    user_df = _get_user_cases(owner_name)
 
-    if user_df.empty:
-        return []
+def get_case_trend(owner_name: str = None, period: str = "month", since: str = None):
+    """
+    Cases reported and closed per period, for all owners or one;
+    `since` (ISO date) drops earlier dates.
+    Returns [{"period", "reported", "closed"}] oldest first.
+    """
+    if period not in PERIOD_WIDTHS:
+        raise ValueError(f"Unknown period {period!r}: use year, month or day")
 
-    overdue_df = user_df[user_df["aging_num"] > 7]
+    store = _store()
+    if store is not None:
+        counts = _sql_trend_counts(store, owner_name, period, since)
+    else:
+        df = load_cases_df() if owner_name is None else _get_user_cases(owner_name)
+        counts = {}
+        for kind, col in (("reported", "reportedon"), ("closed", "closedate")):
+            dates = df[col].dropna() if col in df.columns else pd.Series(dtype="datetime64[ns]")
+            if since:
+                dates = dates[dates >= pd.Timestamp(since)]
+            counts[kind] = (
+                dates.dt.strftime("%Y-%m-%d").str[:PERIOD_WIDTHS[period]]
+                .value_counts()
+                .to_dict()
+            )
+
+    periods = sorted(set(counts["reported"]) | set(counts["closed"]))
+    return [
+        {
+            "period": p,
+            "reported": int(counts["reported"].get(p, 0)),
+            "closed": int(counts["closed"].get(p, 0)),
+        }
+        for p in periods
+    ]
 
-    if overdue_df.empty:
-        return []
 
-    overdue_df = overdue_df.sort_values(
-        by="aging_num",
-        ascending=False
-    )
+# -----------------------------
+# SQLite backend (INSIGHTS_BACKEND=sqlite): the same answers as SQL
+# -----------------------------
+def _sql_case_details(store, case_id: int):
+    rows = store.query("SELECT * FROM cases WHERE caseid = ? ORDER BY rowid LIMIT 1", (case_id,))
+    return _case_record(rows[0]) if rows else None
+
+
+def _sql_owners(store):
+    # Display name from the owner's oldest case, as the aging-sorted frames give
+    return [
+        (row["owner"], row["name"], row["cases"])
+        for row in store.query(f"""
+            SELECT {OWNER_KEY} AS owner, COUNT(*) AS cases,
+                   (SELECT currentowner FROM cases AS c
+                    WHERE c.{OWNER_KEY} = o.{OWNER_KEY}
+                    ORDER BY c.{AGING_NUM} DESC, c.rowid LIMIT 1) AS name
+            FROM cases AS o
+            GROUP BY {OWNER_KEY}
+        """)
+    ]
 
-    return overdue_df.head(top_n).to_dict(orient="records")
 
+def _sql_user_summary(store, owner_name: str):
+    key = owner_name.strip().lower()
+    totals = store.query(f"""
+        SELECT COUNT(*) AS total,
+               SUM(closedate IS NULL) AS pending,
+               SUM({AGING_NUM} > ?) AS overdue,
+               SUM({AGING_NUM} > ?) AS critical
+        FROM cases WHERE {OWNER_KEY} = ?
+    """, (OVERDUE_DAYS, CRITICAL_DAYS, key))[0]
 
-def get_critical_cases(owner_name: str, top_n: int = 3):
-    user_df = _get_user_cases(owner_name)
+    if not totals["total"]:
+        return None
 
-    if user_df.empty:
-        return []
+    statuses = store.query(f"""
+        SELECT statuscode, COUNT(*) AS n FROM cases
+        WHERE {OWNER_KEY} = ? AND statuscode IS NOT NULL
+        GROUP BY statuscode ORDER BY n DESC
+    """, (key,))
 
-    critical_df = user_df[user_df["aging_num"] > 21]
+    return {
+        "owner": owner_name,
+        "total_cases": totals["total"],
+        "pending_cases": totals["pending"],
+        "overdue_cases": totals["overdue"],
+        "critical_cases": totals["critical"],
+        "status_breakdown": {row["statuscode"]: row["n"] for row in statuses},
+    }
 
-    if critical_df.empty:
-        return []
 
-    critical_df = critical_df.sort_values(
-        by="aging_num",
-        ascending=False
-    )
+def _sql_case_buckets(store, owner_name: str, top_n: int):
+    """
+    Each bucket is one walk of the (owner, aging DESC) index, stopping
+    after top_n rows.
+    """
+    key = owner_name.strip().lower()
+    conditions = {
+        "pending": ("closedate IS NULL", ()),
+        "overdue": (f"{AGING_NUM} > ?", (OVERDUE_DAYS,)),
+        "critical": (f"{AGING_NUM} > ?", (CRITICAL_DAYS,)),
+    }
+    return {
+        bucket: [
+            _case_record(row)
+            for row in store.query(f"""
+                SELECT {store.record_columns()} FROM cases
+                WHERE {OWNER_KEY} = ? AND {condition}
+                ORDER BY {AGING_NUM} DESC, rowid LIMIT ?
+            """, (key, *params, top_n))
+        ]
+        for bucket, (condition, params) in conditions.items()
+    }
+
 
-    return critical_df.head(top_n).to_dict(orient="records")
+def _sql_trend_counts(store, owner_name, period: str, since):
+    counts = {}
+    for kind, col in (("reported", "reportedon"), ("closed", "closedate")):
+        sql = f"SELECT substr({col}, 1, ?) AS period, COUNT(*) AS n FROM cases WHERE {col} IS NOT NULL"
+        params = [PERIOD_WIDTHS[period]]
+        if owner_name is not None:
+            sql += f" AND {OWNER_KEY} = ?"
+            params.append(owner_name.strip().lower())
+        if since:
+            sql += f" AND {col} >= ?"
+            params.append(since)
+        counts[kind] = {row["period"]: row["n"] for row in store.query(sql + " GROUP BY period", params)}
+    return counts
 
 
 # -----------------------------
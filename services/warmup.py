@@ -0,0 +1,118 @@
+import logging
+import threading
+import time
+from datetime import datetime
+
+from core.config import (
+    LLM_BUSINESS_DAYS,
+    LLM_BUSINESS_HOURS,
+    LLM_HEARTBEAT_S,
+    LLM_KEEP_ALIVE,
+    OLLAMA_MODEL,
+    WARMUP_LLM,
+)
+from services import telemetry
+
+logger = logging.getLogger("mpr.warmup")
+
+WARMUP_QUERY = "unable to allocate resource to project"
+
+
+# ---------------------------
+# Warm-up
+# ---------------------------
+def preload_llm(keep_alive: str = LLM_KEEP_ALIVE):
+    """
+    Loads the model into Ollama without generating (empty prompt) and
+    (re)starts its keep_alive timer.
+    """
+    import ollama
+
+    ollama.generate(model=OLLAMA_MODEL, prompt="", keep_alive=keep_alive)
+
+
+def warm_up(llm: bool = WARMUP_LLM) -> dict:
+    """
+    Pays the first-request costs up front: encoder forward pass, FAISS /
+    BM25 search over both indexes (loading the case index), and the
+    Ollama model load. Returns seconds per step; failures are logged and
+    do not stop start-up.
+    """
+    from services import retriever
+
+    steps = {
+        "encode": lambda: retriever.get_model().encode([WARMUP_QUERY]),
+        "search.docs": lambda: retriever.retrieve_chunks(WARMUP_QUERY),
+        "search.cases": lambda: retriever.find_similar_cases(WARMUP_QUERY),
+    }
+    if llm:
+        steps["llm"] = preload_llm
+
+    timings = {}
+    with telemetry.span("warmup"):
+        for name, step in steps.items():
+            start = time.perf_counter()
+            try:
+                with telemetry.span(f"warmup.{name}"):
+                    step()
+            except Exception as e:
+                logger.warning(f"warm-up step {name} failed: {e}")
+                continue
+            timings[name] = round(time.perf_counter() - start, 3)
+
+    return timings
+
+
+# ---------------------------
+# Keep-alive heartbeat
+# ---------------------------
+def _parse_days(spec: str) -> set:
+    """
+    "0-4" -> {0, 1, 2, 3, 4}; "0,2,4" -> {0, 2, 4}
+    """
+    days = set()
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        if "-" in part:
+            lo, hi = part.split("-")
+            days.update(range(int(lo), int(hi) + 1))
+        else:
+            days.add(int(part))
+    return days
+
+
+def in_business_hours(now: datetime = None, hours: str = LLM_BUSINESS_HOURS, days: str = LLM_BUSINESS_DAYS) -> bool:
+    now = now or datetime.now()
+    start, end = (datetime.strptime(t.strip(), "%H:%M").time() for t in hours.split("-"))
+    return now.weekday() in _parse_days(days) and start <= now.time() < end
+
+
+_heartbeat = None
+_heartbeat_lock = threading.Lock()
+
+
+def _beat(interval: int):
+    while True:
+        time.sleep(interval)
+        if not in_business_hours():
+            continue
+        try:
+            preload_llm()
+        except Exception as e:
+            logger.warning(f"LLM keep-alive failed: {e}")
+
+
+def start_heartbeat(interval: int = LLM_HEARTBEAT_S):
+    """
+    Re-arms the model's keep_alive every `interval` seconds during
+    business hours; outside them Ollama unloads it after keep_alive.
+    Idempotent, so every Streamlit rerun / API worker can call it.
+    """
+    global _heartbeat
+    if interval <= 0:
+        return None
+
+    with _heartbeat_lock:
+        if _heartbeat is None:
+            _heartbeat = threading.Thread(target=_beat, args=(interval,), name="llm-keepalive", daemon=True)
+            _heartbeat.start()
+        return _heartbeat
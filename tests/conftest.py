@@ -0,0 +1,21 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+
+@pytest.fixture(autouse=True)
+def parquet_cache(tmp_path, monkeypatch):
+    """
+    Parquet copies written by load_cases go to the test's tmp dir, not
+    the repo's data/.cache.
+    """
+    from services import ingest
+
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setattr(ingest, "CACHE_DIR", cache_dir)
+    return cache_dir
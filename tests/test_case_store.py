@@ -0,0 +1,47 @@
+import sqlite3
+
+import pandas as pd
+
+from services.case_store import AGING_NUM, build_store
+
+# Header and value shapes of the Redash export (redash_latest.csv)
+REDASH_ROWS = [
+    {
+        "caseid": 488065, "mprid": 488065, "reportedon": "2024-12-22T18:30:00",
+        "category": "Configuration", "currentowner": "Niharika Verma",
+        "sqlrequired": "0", "expcloseddate": "2025-01-10T18:30:00",
+        "closeddate": "2025-02-10T18:30:00", "mpr_subject": "Kit setup",
+        "ageing": "0", "statuscode": "Resolved", "subject": "creation of kit",
+    },
+    {
+        "caseid": 491075, "mprid": 491075, "reportedon": "2025-01-26T18:30:00",
+        "category": "Configuration", "currentowner": "Niharika Verma",
+        "sqlrequired": "1", "expcloseddate": "", "closeddate": "",
+        "mpr_subject": "Report change", "ageing": "42", "statuscode": "Open",
+        "subject": "report change",
+    },
+]
+
+
+def test_build_store_from_redash_export(tmp_path):
+    source = tmp_path / "redash_latest.csv"
+    pd.DataFrame(REDASH_ROWS).to_csv(source, index=False)
+
+    path = build_store(source, tmp_path / "store.sqlite")
+
+    conn = sqlite3.connect(path)
+    try:
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(cases)")}
+        rows = conn.execute(
+            f"SELECT caseid, aging, {AGING_NUM}, closedate, expclosedate FROM cases ORDER BY caseid"
+        ).fetchall()
+    finally:
+        conn.close()
+
+    # Redash spellings are normalised at ingest
+    assert {"aging", "closedate", "expclosedate"} <= columns
+    assert not {"ageing", "closeddate", "expcloseddate"} & columns
+    assert rows == [
+        (488065, 0, 0, "2025-02-10", "2025-01-10"),
+        (491075, 42, 42, None, None),
+    ]
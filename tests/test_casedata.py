@@ -0,0 +1,114 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+import Casedata
+
+OLD_CSV = "caseid,subject\n1,old case\n"
+NEW_CSV = "caseid,subject\n1,old case\n2,new case\n"
+
+
+class RedashStub(BaseHTTPRequestHandler):
+    """
+    Serves results.csv as configured on the server: `status`, `body` and
+    the Content-Length to announce (larger than the body = truncated).
+    """
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append((self.path, self.headers["Authorization"]))
+        body = server.body.encode()
+
+        self.send_response(server.status)
+        self.send_header("Content-Type", "text/csv")
+        self.send_header("Content-Length", str(server.content_length or len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.close_connection = True
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def redash(tmp_path, monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RedashStub)
+    server.requests = []
+    server.status, server.body, server.content_length = 200, NEW_CSV, None
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    csv_path = tmp_path / "redash_latest.csv"
+    csv_path.write_text(OLD_CSV)
+    monkeypatch.setattr(Casedata, "REDASH_URL", f"http://127.0.0.1:{server.server_port}")
+    monkeypatch.setattr(Casedata, "REDASH_API_KEY", "secret")
+    monkeypatch.setattr(Casedata, "REDASH_QUERY_ID", 305)
+    monkeypatch.setattr(Casedata, "REDASH_CSV", csv_path)
+    monkeypatch.setattr(Casedata, "REDASH_LOG", tmp_path / "redash_cron.log")
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+def leftovers(tmp_path):
+    return sorted(p.name for p in tmp_path.iterdir() if p.name.startswith(".redash_"))
+
+
+def test_sync_replaces_csv(redash, tmp_path):
+    assert Casedata.sync() == 2
+
+    assert Casedata.REDASH_CSV.read_text() == NEW_CSV
+    assert redash.requests == [("/api/queries/305/results.csv", "Key secret")]
+    assert "Rows fetched: 2" in Casedata.REDASH_LOG.read_text()
+    assert leftovers(tmp_path) == []
+
+
+def test_http_error_keeps_old_csv(redash, tmp_path):
+    redash.status, redash.body = 500, "Internal Server Error"
+
+    with pytest.raises(RuntimeError, match="Status 500"):
+        Casedata.sync()
+
+    assert Casedata.REDASH_CSV.read_text() == OLD_CSV
+    assert leftovers(tmp_path) == []
+
+
+def test_truncated_body_keeps_old_csv(redash, tmp_path):
+    redash.content_length = len(NEW_CSV) + 100
+
+    with pytest.raises(requests.exceptions.ChunkedEncodingError):
+        Casedata.sync()
+
+    assert Casedata.REDASH_CSV.read_text() == OLD_CSV
+    assert leftovers(tmp_path) == []
+
+
+def test_empty_result_keeps_old_csv(redash, tmp_path):
+    redash.body = "caseid,subject\n"
+
+    assert Casedata.sync() == 0
+
+    assert Casedata.REDASH_CSV.read_text() == OLD_CSV
+    assert leftovers(tmp_path) == []
+
+
+def test_refresh_failures_are_logged_as_sync_errors(redash, monkeypatch):
+    import services.case_delta
+    import services.case_store
+
+    def broken(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(services.case_delta, "apply_delta", broken)
+    monkeypatch.setattr(services.case_store, "build_store", broken)
+    monkeypatch.setattr(Casedata, "INSIGHTS_BACKEND", "sqlite")
+
+    assert Casedata.refresh_derived() is False
+
+    log = Casedata.REDASH_LOG.read_text()
+    assert "Sync failed: case index delta: disk full" in log
+    assert "Sync failed: case store rebuild: disk full" in log
@@ -0,0 +1,49 @@
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.config import BASE_DIR
+
+sys.path.insert(0, str(BASE_DIR / "scripts"))
+
+import generate_cases  # noqa: E402
+from generate_cases import CaseProfile, TextPerturber, check_text_variety, generate_chunks  # noqa: E402
+from services.ingest import load_cases  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def seed():
+    return load_cases(generate_cases.SEED_CSV)
+
+
+def test_synonyms_only_replace_whole_words(seed, monkeypatch):
+    monkeypatch.setattr(TextPerturber, "_recombine_subject", lambda self, subject, category: subject)
+    monkeypatch.setattr(TextPerturber, "_qualifier", lambda self, subject, name: "")
+    perturb = TextPerturber(np.random.default_rng(0), CaseProfile(seed, 1000))
+
+    for _ in range(50):
+        subject, _ = perturb(["Want Updated Time Sheet", "updates UPDATE"], pd.Timestamp("2025-01-10"))
+        assert subject == "Want Updated Time Sheet"
+
+    swapped = {perturb(["Update email", None], pd.Timestamp("2025-01-10"))[0] for _ in range(50)}
+    assert swapped == {"Update email", "Modify email", "Change email"}
+
+
+def test_generated_texts_are_varied(seed):
+    profile = CaseProfile(seed, 5000)
+    chunk = next(generate_chunks(profile, 5000, chunk_size=5000))
+
+    texts = chunk["subject"].astype(str) + "|" + chunk["details"].astype(str)
+    seed_texts = set(seed["subject"].astype(str) + "|" + seed["details"].astype(str))
+
+    assert texts.nunique() / len(texts) >= generate_cases.MIN_DISTINCT_TEXT_RATIO
+    assert texts.isin(seed_texts).mean() < 0.1
+
+
+def test_repeated_texts_are_rejected():
+    texts = pd.DataFrame({"subject": ["User Creation"] * 200, "details": ["x"] * 200})
+
+    with pytest.raises(RuntimeError, match="distinct"):
+        check_text_variety(texts)
@@ -0,0 +1,41 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from services import ingest
+
+
+def test_bad_caseids_are_dropped_not_fatal():
+    raw = (
+        "caseid,mprid,statuscode,ageing\n"
+        "1001,1001,Open,3\n"
+        ",1002,Open,4\n"
+        "not-an-id,,Open,5\n"
+        "1004,,Resolved,6\n"
+    ).encode("utf-8")
+
+    df = ingest.parse_cases_csv(raw)
+
+    assert df["caseid"].tolist() == [1001, 1004]
+    assert str(df["caseid"].dtype) == "Int64"
+    assert df["mprid"].isna().tolist() == [False, True]
+
+
+@pytest.mark.skipif(not ingest._can_cache(), reason="Parquet cache needs pyarrow")
+def test_unchanged_file_is_not_reread(tmp_path, monkeypatch):
+    path = tmp_path / "cases.csv"
+    path.write_text("caseid,statuscode\n1001,Open\n")
+
+    reads = []
+    read_bytes = Path.read_bytes
+    monkeypatch.setattr(Path, "read_bytes", lambda self: reads.append(self) or read_bytes(self))
+
+    first = ingest.load_cases(path)
+    second = ingest.load_cases(path)
+    assert len(reads) == 1
+    pd.testing.assert_frame_equal(first, second)
+
+    path.write_text("caseid,statuscode\n1001,Open\n1002,New\n")
+    assert ingest.load_cases(path)["caseid"].tolist() == [1001, 1002]
+    assert len(reads) == 2
@@ -0,0 +1,139 @@
+import threading
+import time
+
+import pytest
+
+from services.llm_gateway import BATCH, INTERACTIVE, LLMBusy, LLMGateway, LLMTimeout
+
+
+class FakeChat:
+    """
+    Stands in for ollama.chat(stream=True): replies "<prompt> ok" in two
+    chunks. While `gate` is clear every generation waits on it, which
+    keeps the workers busy so requests pile up in the queue.
+    """
+
+    def __init__(self, delay: float = 0.0):
+        self.gate = threading.Event()
+        self.gate.set()
+        self.delay = delay
+        self.calls = []
+        self.started = threading.Semaphore(0)
+
+    def __call__(self, model, messages, options, keep_alive, stream):
+        prompt = messages[-1]["content"]
+        self.calls.append(prompt)
+        self.started.release()
+
+        def chunks():
+            self.gate.wait(5)
+            time.sleep(self.delay)
+            yield {"message": {"content": prompt}}
+            yield {"message": {"content": " ok"}}
+
+        return chunks()
+
+
+def ask(gateway, prompt, **kwargs):
+    return gateway.stream("model", [{"role": "user", "content": prompt}], **kwargs)
+
+
+@pytest.fixture
+def chat():
+    return FakeChat()
+
+
+def busy_gateway(chat, **kwargs) -> tuple:
+    """
+    A one-worker gateway whose worker is stuck on a "running" request
+    until chat.gate is set.
+    """
+    gateway = LLMGateway(max_in_flight=1, chat=chat, **kwargs)
+    chat.gate.clear()
+    running = ask(gateway, "running")
+    assert chat.started.acquire(timeout=5)
+    return gateway, running
+
+
+def test_identical_prompts_share_one_generation(chat):
+    gateway, running = busy_gateway(chat)
+
+    first = ask(gateway, "same question")
+    second = ask(gateway, "same question")
+    chat.gate.set()
+
+    assert "".join(first) == "same question ok"
+    assert "".join(second) == "same question ok"
+    assert "".join(running) == "running ok"
+    assert chat.calls.count("same question") == 1
+    assert gateway.stats()["coalesced"] == 1
+
+
+def test_interactive_requests_run_before_batch(chat):
+    gateway, running = busy_gateway(chat, queue_size=10)
+
+    replies = [
+        ask(gateway, "batch 1", priority=BATCH),
+        ask(gateway, "batch 2", priority=BATCH),
+        ask(gateway, "interactive", priority=INTERACTIVE),
+    ]
+    chat.gate.set()
+
+    for reply in [running, *replies]:
+        "".join(reply)
+    assert chat.calls == ["running", "interactive", "batch 1", "batch 2"]
+
+
+def test_full_queue_evicts_the_newest_batch_request(chat):
+    gateway, running = busy_gateway(chat, queue_size=2)
+
+    older = ask(gateway, "batch 1", priority=BATCH)
+    newer = ask(gateway, "batch 2", priority=BATCH)
+    urgent = ask(gateway, "interactive", priority=INTERACTIVE)
+    chat.gate.set()
+
+    with pytest.raises(LLMBusy, match="Evicted"):
+        "".join(newer)
+    assert "".join(urgent) == "interactive ok"
+    assert "".join(older) == "batch 1 ok"
+    assert "".join(running) == "running ok"
+    assert "batch 2" not in chat.calls
+    assert gateway.stats()["evicted"] == 1
+
+
+def test_full_queue_turns_requests_away(chat):
+    gateway, running = busy_gateway(chat, queue_size=1)
+
+    queued = ask(gateway, "interactive 1")
+    with pytest.raises(LLMBusy, match="queue full"):
+        ask(gateway, "batch", priority=BATCH)
+    with pytest.raises(LLMBusy, match="queue full"):
+        ask(gateway, "interactive 2")
+    chat.gate.set()
+
+    assert "".join(queued) == "interactive 1 ok"
+    "".join(running)
+    assert gateway.stats()["rejected"] == 2
+
+
+def test_request_times_out_while_queued(chat):
+    gateway, running = busy_gateway(chat)
+
+    late = ask(gateway, "late", timeout=0.1)
+    with pytest.raises(LLMTimeout):
+        "".join(late)
+
+    chat.gate.set()
+    "".join(running)
+    time.sleep(0.1)  # the worker drops the expired flight without generating
+    assert "late" not in chat.calls
+    assert gateway.stats()["timeouts"] == 1
+
+
+def test_generation_past_the_deadline_times_out():
+    chat = FakeChat(delay=0.5)
+    gateway = LLMGateway(max_in_flight=1, chat=chat)
+
+    with pytest.raises(LLMTimeout):
+        "".join(ask(gateway, "slow", timeout=0.1))
+    assert gateway.stats()["timeouts"] == 1
@@ -0,0 +1,87 @@
+import pandas as pd
+import pytest
+
+from services import case_store, user_insights
+
+# cases_training.csv shapes: dd-mm-yyyy dates, "N D" aging, Yes/No flags
+CASES = [
+    # caseid, owner, status, reportedon, closedate, aging
+    (1001, "Asha Rao", "New", "02-01-2025", "", "3 D"),
+    (1002, "Asha Rao", "In Progress", "05-01-2025", "", "12 D"),
+    (1003, "asha rao", "On Hold", "10-12-2024", "", "40 D"),
+    (1004, "Asha Rao", "Resolved", "15-11-2024", "20-11-2024", "5 D"),
+    (1005, "Asha Rao", "Resolved", "01-10-2024", "30-12-2024", "90 D"),
+    (1006, "Asha Rao", "Invalid", "03-01-2025", "04-01-2025", ""),
+    (1007, "Asha Rao", "", "20-01-2025", "", "25 D"),
+    (1008, "Vikram Shah", "New", "21-01-2025", "", "1 D"),
+    (1009, "Vikram Shah", "Resolved", "22-12-2024", "02-01-2025", "11 D"),
+    (1010, "Vikram Shah", "In Progress", "08-01-2025", "", "22 D"),
+    (1010, "Vikram Shah", "Resolved", "08-01-2025", "09-01-2025", "1 D"),  # duplicate id: first row wins
+]
+
+
+@pytest.fixture
+def cases_csv(tmp_path):
+    path = tmp_path / "cases_training.csv"
+    pd.DataFrame(
+        [
+            {
+                "caseid": cid, "reportedon": reported, "category": "Configuration",
+                "statuscode": status, "casetype": "CR", "sqlrequired": "No",
+                "expclosedate": "", "closedate": closed, "aging": aging,
+                "currentowner": owner, "details": f"details {cid}", "subject": f"subject {cid}",
+            }
+            for cid, owner, status, reported, closed, aging in CASES
+        ]
+    ).to_csv(path, index=False)
+    return path
+
+
+@pytest.fixture
+def answers(cases_csv, tmp_path, monkeypatch):
+    """
+    answers(backend) -> every insight function's output over the fixture.
+    """
+    monkeypatch.setattr(user_insights, "DATA_PATH", cases_csv)
+    monkeypatch.setattr(case_store, "case_store_path", lambda source: tmp_path / "store.sqlite")
+
+    def run(backend):
+        monkeypatch.setattr(user_insights, "INSIGHTS_BACKEND", backend)
+        monkeypatch.setattr(user_insights, "_df", None)
+        monkeypatch.setattr(user_insights, "_owner_index", None)
+
+        owners = ["Asha Rao", "vikram shah", "No Such Owner"]
+        return {
+            "get_case_details": [
+                user_insights.get_case_details(c) for c in ["1001", "1006", "1010", "9999", "abc"]
+            ],
+            "get_user_summary": [user_insights.get_user_summary(o) for o in owners],
+            "get_case_buckets": [user_insights.get_case_buckets(o, top_n) for o in owners for top_n in (1, 3)],
+            "get_case_trend": [
+                user_insights.get_case_trend(owner, period, since)
+                for owner in (None, "Asha Rao")
+                for period in ("year", "month", "day")
+                for since in (None, "2025-01-01")
+            ],
+        }
+
+    return run
+
+
+@pytest.mark.parametrize("name", ["get_case_details", "get_user_summary", "get_case_buckets", "get_case_trend"])
+def test_sqlite_backend_matches_pandas(answers, name):
+    expected = answers("pandas")[name]
+    actual = answers("sqlite")[name]
+
+    assert actual == expected
+
+
+def test_case_buckets_are_plain_records(answers):
+    buckets = answers("pandas")["get_case_buckets"][1]
+
+    assert [case["caseid"] for case in buckets["pending"]] == [1003, 1007, 1002]
+    assert buckets["critical"][0] == {
+        "caseid": 1005, "currentowner": "Asha Rao", "category": "Configuration",
+        "statuscode": "Resolved", "aging": 90, "reportedon": "2024-10-01",
+        "closedate": "2024-12-30", "subject": "subject 1005", "details": "details 1005",
+    }